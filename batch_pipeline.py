@@ -0,0 +1,280 @@
+"""Lookup → scrape → convert → CREATE TABLE for many tables at once.
+
+Used by both the Streamlit batch mode and the command line. Workers never
+touch the UI; each table produces a plain result dict.
+"""
+import asyncio
+import math
+import re
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+import pandas as pd
+
+from conversion_engine import (
+    build_create_table,
+    build_post_load_script,
+    compare_row_width,
+    convert_oracle_types,
+    get_profile,
+    get_storage_profile,
+    row_width_summary,
+)
+from doc_cache import cache_contains, cache_get_entry, cache_put, cache_touch
+from doc_lookup import (
+    API_GROUP_SIZE,
+    CONFIDENCE_INDEXED,
+    CONFIDENCE_VERIFIED,
+    DocUrlResolver,
+    fetch_columns_table,
+    search_doc_page_api,
+    search_doc_page_scrape,
+    url_confidence,
+)
+from export_bundle import iter_sql_scripts
+from metrics import trace
+from name_index import record_table_name
+from oracle_doc_index import is_indexed, lookup_table_entry
+from quota import QuotaReservation, reserve_quota
+
+# ---------- CONFIGURATION ----------
+# Worker threads and maximum concurrent requests per host
+BATCH_MAX_WORKERS = 8
+HOST_CONCURRENCY_LIMITS = {
+    "www.google.com": 2,
+    "www.googleapis.com": 4,
+    "docs.oracle.com": 4,
+}
+# Per-table values kept for deploy/diff but not shown in the status report
+BATCH_HIDDEN_COLUMNS = ["SQL", "POST_LOAD_SQL", "CONVERTED", "KEYS", "TIMINGS", "COUNTERS"]
+
+
+def parse_table_list(text="", uploaded_file=None):
+    """Collect unique upper-case table names from pasted text and/or a CSV/Excel file (path or file object)"""
+    names = re.split(r"[\s,;]+", text or "")
+
+    if uploaded_file is not None:
+        file_name = str(getattr(uploaded_file, "name", uploaded_file))
+        if file_name.lower().endswith((".xlsx", ".xls")):
+            file_df = pd.read_excel(uploaded_file, dtype=str)
+        else:
+            file_df = pd.read_csv(uploaded_file, dtype=str)
+        if not file_df.empty:
+            # Prefer a TABLE_NAME column, otherwise take the first column
+            normalized = {str(c).strip().upper().replace(" ", "_"): c for c in file_df.columns}
+            source_col = normalized.get("TABLE_NAME", file_df.columns[0])
+            names.extend(file_df[source_col].dropna().tolist())
+
+    tables = []
+    for name in names:
+        name = str(name).strip().upper()
+        if name and name not in tables:
+            tables.append(name)
+    return tables
+
+
+def make_host_limits(limits=HOST_CONCURRENCY_LIMITS):
+    """One semaphore per host so a batch never floods Google or docs.oracle.com"""
+    return {host: threading.BoundedSemaphore(limit) for host, limit in limits.items()}
+
+
+def load_columns(table_name, url, entry=None, confidence=None):
+    """Fetch the columns and keys tables for a resolved URL and cache them; returns (DataFrame, page dict)
+
+    A stale cache entry for the same URL is revalidated with a conditional GET and
+    reused as-is when the server answers 304 Not Modified. confidence is the URL's
+    match confidence, kept with the cache entry.
+    """
+    validators = entry if entry and entry["url"] == url and entry["columns"] is not None else {}
+    page = fetch_columns_table(url, etag=validators.get("etag"), last_modified=validators.get("last_modified"))
+    if page["status"] == 304 and validators:
+        cache_touch(table_name, url)
+        page["keys"] = validators["keys"]
+        return validators["columns"], page
+    df = page["columns"] if page["columns"] is not None else pd.DataFrame()
+    cache_put(table_name, url, df, page["etag"], page["last_modified"], page["keys"], confidence)
+    return df, page
+
+
+def resolve_urls_with_api(table_names, api_key, cse_id, force_refresh=False, quota_wait=0, host_limits=None):
+    """Lookup stage: Custom Search URLs for the tables the index and cache cannot answer
+
+    The quota for every grouped query is reserved up front (as much as is left, waiting
+    up to quota_wait seconds for any at all) and unused calls are released afterwards.
+    Runs the coalescing DocUrlResolver; returns ({table: (pick_doc_url dict or None, error)}, queries used).
+    """
+    pending = [name for name in table_names if force_refresh or not (is_indexed(name) or cache_contains(name))]
+    if not pending:
+        return {}, 0
+
+    needed = math.ceil(len(pending) / API_GROUP_SIZE)
+    with QuotaReservation(needed, partial=True, wait_seconds=quota_wait) as reservation:
+        resolver = DocUrlResolver(api_key, cse_id, reserve=reservation.take,
+                                  host_limit=(host_limits or make_host_limits())["docs.oracle.com"])
+        resolved = asyncio.run(resolver.resolve_many(pending))
+    return resolved, resolver.queries
+
+
+def generate_table(table_name, prefix, use_api=False, host_limits=None, force_refresh=False,
+                   profile_name=None, api_key=None, cse_id=None, api_lookup=None, ddl_options=None,
+                   storage_profile=None, row_count=None):
+    """Run lookup → scrape → convert → generate for one table and return its result row
+
+    api_lookup is this table's (match, error) from resolve_urls_with_api, if that stage already ran.
+    CONFIDENCE is how sure the lookup is that URL is the table's own page (see doc_lookup).
+    ddl_options overrides conversion_engine.DDL_OPTIONS; POST_LOAD_SQL holds the key and
+    index script when they are deferred until after the load.
+    storage_profile names a storage profile; without one it is chosen by table name and
+    row_count (or the row hint in storage_profiles.json). ROW_BYTES is the declared maximum
+    row size and ROW_BYTES_SAVED how much smaller it is than with the default type profile.
+    TIMINGS (seconds per stage) and COUNTERS (bytes downloaded, cache hits, ...) cover this table only.
+    """
+    host_limits = host_limits or make_host_limits()
+    started = time.perf_counter()
+    result = {
+        "TABLE_NAME": table_name,
+        "TARGET_TABLE": f"{prefix}{table_name.upper()}",
+        "STATUS": "ERROR",
+        "COLUMNS": 0,
+        "URL": "",
+        "CONFIDENCE": None,
+        "SOURCE": "web",
+        "STORAGE": "",
+        "ROW_BYTES": 0,
+        "ROW_BYTES_SAVED": 0,
+        "MESSAGE": "",
+        "SECONDS": 0.0,
+        "SQL": "",
+        "POST_LOAD_SQL": "",
+        "CONVERTED": None,
+        "KEYS": None,
+        "TIMINGS": {},
+        "COUNTERS": {},
+    }
+    with trace() as run:
+        try:
+            url = None
+            match = None
+            df = None
+            keys = None
+            stale = None
+
+            # Offline index first, then the local cache, unless a refresh was requested
+            if not force_refresh:
+                cached = lookup_table_entry(table_name)
+                if cached:
+                    result["SOURCE"] = "index"
+                else:
+                    cached = cache_get_entry(table_name)
+                    if cached and cached["stale"]:
+                        # An expired entry still knows the URL; its page is revalidated below
+                        stale = cached
+                        cached = {"url": stale["url"], "columns": None, "keys": None, "confidence": stale["confidence"]}
+                    elif cached:
+                        result["SOURCE"] = "cache"
+                if cached:
+                    url, df, keys = cached["url"], cached["columns"], cached["keys"]
+                    # Index pages name the table themselves; entries cached before URL scoring are scored by URL
+                    confidence = CONFIDENCE_INDEXED if result["SOURCE"] == "index" else cached.get("confidence")
+                    result["CONFIDENCE"] = confidence if confidence is not None else url_confidence(table_name, url)
+
+            if not url and api_lookup:
+                match, api_error = api_lookup
+                if api_error:
+                    result["MESSAGE"] = f"{api_error}. "
+
+            # Without quota left the HTML scraping fallback below is used
+            if not (url or match) and use_api and reserve_quota(1):
+                try:
+                    with host_limits["www.googleapis.com"]:
+                        match = search_doc_page_api(table_name, api_key, cse_id, host_limits["docs.oracle.com"])
+                except Exception as e:
+                    result["MESSAGE"] = f"Google API search failed: {e}. "
+
+            if not (url or match):
+                with host_limits["www.google.com"]:
+                    match = search_doc_page_scrape(table_name, host_limit=host_limits["docs.oracle.com"])
+            if match:
+                url = match["url"]
+                result["CONFIDENCE"] = match["confidence"]
+
+            if not url:
+                result["STATUS"] = "NOT_FOUND"
+                result["MESSAGE"] += "No valid Oracle documentation link found."
+                return result
+            result["URL"] = url
+
+            if df is None:
+                with host_limits["docs.oracle.com"]:
+                    df, page = load_columns(table_name, url, stale, result["CONFIDENCE"])
+                keys = page["keys"]
+                if page["status"] == 304:
+                    result["SOURCE"] = "revalidated"
+            if df.empty:
+                result["STATUS"] = "NO_COLUMNS"
+                result["MESSAGE"] += "Could not find or parse the columns table on the page."
+                return result
+
+            profile = get_profile(profile_name, prefix=prefix)
+            conv = convert_oracle_types(df, profile)
+            if conv.empty:
+                result["STATUS"] = "NO_COLUMNS"
+                result["MESSAGE"] += "No valid columns were converted."
+                return result
+            width = row_width_summary(compare_row_width(df, conv, profile))
+            result["ROW_BYTES"] = width["ROW_BYTES"]
+            result["ROW_BYTES_SAVED"] = width["ROW_BYTES_SAVED"]
+
+            storage = get_storage_profile(storage_profile, table_name, row_count)
+            result["STORAGE"] = storage["name"]
+            result["SQL"] = build_create_table(table_name, conv, prefix, keys, ddl_options, storage)
+            result["POST_LOAD_SQL"] = build_post_load_script(table_name, conv, prefix, keys, ddl_options, storage)
+            result["CONVERTED"] = conv
+            result["KEYS"] = keys
+            result["COLUMNS"] = len(conv)
+            result["STATUS"] = "OK"
+            # Only names confirmed by their page are offered as suggestions later
+            if result["CONFIDENCE"] >= CONFIDENCE_VERIFIED:
+                record_table_name(table_name)
+            else:
+                result["MESSAGE"] += f"Low confidence ({result['CONFIDENCE']:.0%}) that the URL is this table's page - please verify."
+        except Exception as e:
+            result["MESSAGE"] += str(e)
+        finally:
+            result["SECONDS"] = round(time.perf_counter() - started, 2)
+            result["TIMINGS"] = run.totals()
+            result["COUNTERS"] = dict(run.counters)
+    return result
+
+
+def run_batch(table_names, prefix, use_api=False, max_workers=BATCH_MAX_WORKERS, force_refresh=False,
+              profile_name=None, api_key=None, cse_id=None, quota_wait=0, ddl_options=None,
+              storage_profile=None, row_hints=None):
+    """Generate many tables on a bounded thread pool, yielding each result as soon as it finishes
+
+    With use_api, URLs are looked up first in grouped Custom Search queries; tables the
+    API does not resolve fall back to HTML scraping rather than spending quota one by one.
+    row_hints ({TABLE: expected rows}) picks each table's storage profile unless
+    storage_profile is given.
+    """
+    row_hints = {k.upper(): v for k, v in (row_hints or {}).items()}
+    host_limits = make_host_limits()
+    resolved = {}
+    if use_api:
+        resolved, _ = resolve_urls_with_api(table_names, api_key, cse_id, force_refresh, quota_wait, host_limits)
+
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        futures = [
+            executor.submit(generate_table, name, prefix, False, host_limits, force_refresh,
+                            profile_name, api_key, cse_id, resolved.get(name.upper()), ddl_options,
+                            storage_profile, row_hints.get(name.upper()))
+            for name in table_names
+        ]
+        for future in as_completed(futures):
+            yield future.result()
+
+
+def combine_sql_scripts(results):
+    """Concatenate the generated CREATE TABLE scripts into one batch script"""
+    return "\n".join(iter_sql_scripts(results))
@@ -0,0 +1,194 @@
+"""Benchmark the vectorized conversion engine against the original iterrows implementation.
+
+    python benchmarks/bench_convert_datatypes.py --rows 10000 --repeat 5
+
+Both implementations run on the same synthetic Oracle "Columns" table; the
+outputs are compared before any timing is reported. The vectorized engine
+uses the "original" mapping profile, which reproduces the iterrows rules.
+"""
+import argparse
+import os
+import re
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from conversion_engine import build_create_table, convert_oracle_types, get_profile  # noqa: E402
+
+ORACLE_TYPES = ["VARCHAR2", "VARCHAR2(64)", "NVARCHAR2", "NUMBER", "NUMBER(10)", "NUMBER(18,2)",
+                "DATE", "TIMESTAMP", "TIMESTAMP(6)", "CLOB", "BLOB", "RAW(16)", "CHAR(1)"]
+
+
+# ---------- Reference Implementation ----------
+
+def convert_datatypes_iterrows(df):
+    """Original row-by-row conversion (debug output removed)"""
+    df.columns = [c.strip().upper().replace(" ", "_").replace("-", "_") for c in df.columns]
+
+    colname_col = "NAME"
+    dtype_col = "DATATYPE"
+    length_col = "LENGTH"
+    precision_col = "PRECISION"
+    notnull_col = "NOT_NULL"
+    comments_col = "COMMENTS"
+
+    if colname_col not in df.columns or dtype_col not in df.columns:
+        return pd.DataFrame()
+
+    converted = []
+    for _, row in df.iterrows():
+        colname = str(row.get(colname_col, "")).strip()
+        dtype = str(row.get(dtype_col, "")).strip().upper()
+        length = str(row.get(length_col, "")).strip() if length_col in df.columns else ""
+        precision = str(row.get(precision_col, "")).strip() if precision_col in df.columns else ""
+        notnull = str(row.get(notnull_col, "")).strip() if notnull_col in df.columns else ""
+        comments = str(row.get(comments_col, "")).strip() if comments_col in df.columns else ""
+
+        if not colname or colname == "NAN":
+            continue
+
+        sqltype = dtype
+
+        if "VARCHAR" in dtype:
+            n = None
+            if length and length.isdigit():
+                n = int(length)
+            else:
+                m = re.search(r"\((\d+)\)", dtype)
+                if m:
+                    n = int(m.group(1))
+
+            if n == 1:
+                sqltype = "VARCHAR(1)"
+            elif n and 2 <= n <= 240:
+                sqltype = "NVARCHAR(240)"
+            elif n and n > 240:
+                sqltype = f"NVARCHAR({n})"
+            else:
+                sqltype = "NVARCHAR(240)"
+
+        elif "NUMBER" in dtype:
+            prec = None
+            if precision and precision.isdigit():
+                prec = int(precision)
+            else:
+                m = re.search(r"\((\d+)", dtype)
+                if m:
+                    prec = int(m.group(1))
+
+            if prec and prec > 4:
+                sqltype = "BIGINT"
+            else:
+                sqltype = "FLOAT"
+
+        elif "DATE" in dtype:
+            sqltype = "DATETIME"
+
+        elif "TIMESTAMP" in dtype:
+            sqltype = "DATETIME"
+
+        else:
+            sqltype = dtype
+
+        converted.append({
+            "COLUMN_NAME": colname,
+            "ORACLE_TYPE": dtype,
+            "LENGTH": length if length else "",
+            "PRECISION": precision if precision else "",
+            "NOT_NULL": notnull if notnull else "",
+            "SQL_SERVER_TYPE": sqltype,
+            "COMMENTS": comments if comments else ""
+        })
+
+    return pd.DataFrame(converted)
+
+
+def generate_sql_iterrows(table_name, df, prefix):
+    """Original row-by-row CREATE TABLE builder"""
+    if df.empty:
+        return "-- No columns to generate"
+
+    lines = [f"CREATE TABLE {prefix}{table_name.upper()} ("]
+    for _, r in df.iterrows():
+        lines.append(f"    {r['COLUMN_NAME']} {r['SQL_SERVER_TYPE']},")
+    if len(lines) > 1:
+        lines[-1] = lines[-1].rstrip(",")
+    lines.append(");")
+    return "\n".join(lines)
+
+
+# ---------- Synthetic Input ----------
+
+def make_columns_table(rows, seed=0):
+    """Build a docs-style Columns table shaped like pd.read_html output"""
+    rng = np.random.default_rng(seed)
+    dtypes = rng.choice(ORACLE_TYPES, size=rows)
+    is_varchar = np.char.find(dtypes.astype(str), "VARCHAR") >= 0
+    is_number = np.char.find(dtypes.astype(str), "NUMBER") >= 0
+
+    length = np.where(is_varchar, rng.choice([1, 30, 240, 1000, 4000], size=rows), np.nan)
+    precision = np.where(is_number & (rng.random(rows) < 0.5), rng.choice([1, 4, 9, 18], size=rows), np.nan).astype(object)
+    # Some pages give NUMBER(p,s) columns a "p,s" Precision value
+    scaled = np.flatnonzero(is_number & (rng.random(rows) < 0.2))
+    precision[scaled] = [f"{p},{s}" for p, s in zip(rng.choice([5, 10, 18], size=len(scaled)),
+                                                    rng.choice([0, 2, 4], size=len(scaled)))]
+
+    return pd.DataFrame({
+        "Name": [f"COLUMN_{i:05d}" for i in range(rows)],
+        "Datatype": dtypes,
+        "Length": length,
+        "Precision": precision,
+        "Not-null": np.where(rng.random(rows) < 0.3, "Yes", None),
+        "Comments": [f"Synthetic column {i}" for i in range(rows)],
+    })
+
+
+# ---------- Runner ----------
+
+def best_time(func, make_args, repeat):
+    """Best wall time of func over repeat runs (inputs rebuilt each run)"""
+    timings = []
+    result = None
+    for _ in range(repeat):
+        args = make_args()
+        started = time.perf_counter()
+        result = func(*args)
+        timings.append(time.perf_counter() - started)
+    return min(timings), result
+
+
+# The iterrows builder predates NOT NULL / comments, so compare against plain column DDL
+PLAIN_DDL = {"not_null": False, "comments": False}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark convert_datatypes / generate_sql implementations")
+    parser.add_argument("--rows", type=int, default=10000, help="columns in the synthetic table")
+    parser.add_argument("--repeat", type=int, default=5, help="runs per implementation (best is reported)")
+    args = parser.parse_args(argv)
+
+    source = make_columns_table(args.rows)
+
+    old_conv_s, old_conv = best_time(convert_datatypes_iterrows, lambda: (source.copy(),), args.repeat)
+    profile = get_profile("original")
+    new_conv_s, new_conv = best_time(convert_oracle_types, lambda: (source.copy(), profile), args.repeat)
+    pd.testing.assert_frame_equal(old_conv, new_conv)
+
+    old_sql_s, old_sql = best_time(generate_sql_iterrows, lambda: ("BENCH_TABLE", old_conv, "ST_FN_"), args.repeat)
+    new_sql_s, new_sql = best_time(build_create_table, lambda: ("BENCH_TABLE", new_conv, "ST_FN_", None, PLAIN_DDL), args.repeat)
+    assert old_sql == new_sql, "generated SQL differs"
+
+    print(f"Synthetic columns table: {args.rows} rows, best of {args.repeat}")
+    print(f"{'stage':<18}{'iterrows (s)':>14}{'vectorized (s)':>16}{'speedup':>10}")
+    for stage, old_s, new_s in (("convert_datatypes", old_conv_s, new_conv_s), ("generate_sql", old_sql_s, new_sql_s)):
+        print(f"{stage:<18}{old_s:>14.4f}{new_s:>16.4f}{old_s / new_s:>9.1f}x")
+    print("Outputs identical: yes")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
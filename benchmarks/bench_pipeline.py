@@ -0,0 +1,282 @@
+"""Offline benchmark of every pipeline stage, for comparing commits without Google, docs.oracle.com or SQL Server.
+
+    python benchmarks/bench_pipeline.py                          # recorded fixtures, else synthetic pages
+    python benchmarks/bench_pipeline.py --synthetic 200 --rows 150 --wide-rows 5000
+    python benchmarks/bench_pipeline.py --json bench_results/$(git rev-parse --short HEAD).json
+    python benchmarks/bench_pipeline.py --compare bench_results/abc1234.json
+    python benchmarks/bench_pipeline.py --record AP_INVOICES_ALL GL_JE_LINES    # needs network
+
+Doc pages come from benchmarks/fixtures/*.html (saved with --record) or are
+generated, and are served from a local HTTP server so fetch and parse go
+through http_client and the streaming parser exactly as in production.
+SQL Server is fake_sqlserver (SQLite-backed) with --latency-ms per round
+trip. Stage times come from the metrics module; peak memory is traced with
+tracemalloc in a second pass so it does not skew the timings.
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import tracemalloc
+from functools import partial
+from http.server import SimpleHTTPRequestHandler, ThreadingHTTPServer
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.dirname(BENCH_DIR))
+
+import fake_sqlserver  # noqa: E402
+from bench_convert_datatypes import make_columns_table  # noqa: E402
+from bench_scrape_columns import make_page  # noqa: E402
+from conversion_engine import SKIPPED_ALTER_MARKER, build_create_table, convert_oracle_types, get_profile  # noqa: E402
+from doc_lookup import fetch_columns_table  # noqa: E402
+from export_bundle import build_exports  # noqa: E402
+from metrics import STAGES, metrics  # noqa: E402
+from sql_deploy import bulk_apply_alters, bulk_create_tables, bulk_diff_tables  # noqa: E402
+from sql_pool import ConnectionPool  # noqa: E402
+
+FIXTURES_DIR = os.path.join(BENCH_DIR, "fixtures")
+PREFIX = "ST_FN_"
+
+
+# ---------- Fixtures ----------
+
+def record_fixtures(table_names, fixtures_dir=FIXTURES_DIR):
+    """Save the live doc page of each table as <TABLE>.html (index / cache first, then Google)"""
+    from doc_cache import cache_get
+    from doc_lookup import search_doc_url_scrape
+    from http_client import http_get
+    from oracle_doc_index import lookup_table
+
+    os.makedirs(fixtures_dir, exist_ok=True)
+    manifest_path = os.path.join(fixtures_dir, "manifest.json")
+    manifest = {}
+    if os.path.exists(manifest_path):
+        with open(manifest_path, encoding="utf-8") as f:
+            manifest = json.load(f)
+    for name in table_names:
+        name = name.upper()
+        known = lookup_table(name) or cache_get(name)
+        url = known[0] if known else search_doc_url_scrape(name)
+        if not url:
+            print(f"skip {name}: no doc page found")
+            continue
+        res = http_get(url, timeout=30)
+        res.raise_for_status()
+        with open(os.path.join(fixtures_dir, f"{name}.html"), "wb") as f:
+            f.write(res.content)
+        manifest[name] = url
+        print(f"saved {name} ({len(res.content) / 1024:.0f} KB) from {url}")
+    with open(manifest_path, "w", encoding="utf-8") as f:
+        json.dump(manifest, f, indent=2, sort_keys=True)
+
+
+def load_pages(args):
+    """{TABLE: html bytes} from the fixtures directory, or synthetic pages"""
+    pages = {}
+    if not args.synthetic and os.path.isdir(args.fixtures):
+        for file_name in sorted(os.listdir(args.fixtures)):
+            if file_name.lower().endswith(".html"):
+                with open(os.path.join(args.fixtures, file_name), "rb") as f:
+                    pages[os.path.splitext(file_name)[0].upper()] = f.read()
+    if not pages:
+        pages = {f"XX_BENCH_TABLE_{i}": make_page(i, args.rows) for i in range(args.synthetic or 100)}
+    return pages
+
+
+def serve_pages(pages):
+    """Serve the pages from a temp directory on a local port; returns (server, base URL)"""
+    root = tempfile.mkdtemp(prefix="bench_pages_")
+    for name, html in pages.items():
+        with open(os.path.join(root, f"{name}.html"), "wb") as f:
+            f.write(html)
+
+    class QuietHandler(SimpleHTTPRequestHandler):
+        def log_message(self, format, *args):
+            pass
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), partial(QuietHandler, directory=root))
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://127.0.0.1:{server.server_address[1]}"
+
+
+# ---------- Stages ----------
+
+def run_fetch(ctx):
+    """Download and parse every page through fetch_columns_table"""
+    ctx["columns"] = {}
+    ctx["keys"] = {}
+    for name in ctx["pages"]:
+        page = fetch_columns_table(f"{ctx['base_url']}/{name}.html")
+        if page["columns"] is not None:
+            ctx["columns"][name] = page["columns"]
+            ctx["keys"][name] = page["keys"]
+
+
+def run_convert(ctx):
+    """Convert and generate every parsed page plus the synthetic wide tables"""
+    profile = get_profile(prefix=PREFIX)
+    ctx["results"] = []
+    for name, df in list(ctx["columns"].items()) + ctx["wide"]:
+        conv = convert_oracle_types(df, profile)
+        sql = build_create_table(name, conv, PREFIX, ctx["keys"].get(name))
+        ctx["results"].append({
+            "TABLE_NAME": name, "TARGET_TABLE": f"{PREFIX}{name}", "STATUS": "OK", "COLUMNS": len(conv),
+            "SOURCE": "bench", "URL": "", "MESSAGE": "", "SQL": sql, "CONVERTED": conv,
+        })
+
+
+def run_export(ctx):
+    """Excel workbook, combined .sql and zip for all tables"""
+    with tempfile.TemporaryDirectory() as export_dir:
+        build_exports(ctx["results"], export_dir=export_dir)
+
+
+def run_deploy(ctx):
+    """Create every table on the fake SQL Server, then diff and alter them"""
+    fake_sqlserver.reset()
+    pool = ConnectionPool("DATABASE=BENCH")
+    try:
+        scripts = {r["TARGET_TABLE"]: r["SQL"] for r in ctx["results"]}
+        bulk_create_tables(pool, scripts, "BENCH")
+        # Every other table gets one widened column and a new Not-null column so the diff has work to do
+        converted = {}
+        for idx, r in enumerate(ctx["results"]):
+            conv = r["CONVERTED"]
+            if idx % 2 == 0 and len(conv):
+                conv = conv.copy()
+                conv.loc[conv.index[0], "SQL_SERVER_TYPE"] = "NVARCHAR(MAX)"
+                conv.loc[len(conv)] = {**conv.iloc[0].to_dict(), "COLUMN_NAME": "BENCH_ADDED", "NOT_NULL": "Yes",
+                                       "SQL_SERVER_TYPE": "INT"}
+            converted[r["TARGET_TABLE"]] = conv
+        diff = bulk_diff_tables(pool, converted, "BENCH")
+        # The tables may hold rows: new columns are added as NULL, NOT NULL is left as a manual step
+        for d in diff:
+            if "BENCH_ADDED" in d["ALTER_SQL"]:
+                added = [line.strip(" ,;") for line in d["ALTER_SQL"].splitlines() if line.startswith("    BENCH_ADDED ")]
+                assert added == ["BENCH_ADDED INT NULL"], f"new Not-null column added as {added}"
+                assert f"{SKIPPED_ALTER_MARKER}ALTER TABLE {d['TABLE_NAME']} ALTER COLUMN BENCH_ADDED INT NOT NULL;" \
+                    in d["ALTER_SQL"], "NOT NULL step for a new column missing"
+        bulk_apply_alters(pool, diff, "BENCH")
+    finally:
+        pool.close_all()
+
+
+BLOCKS = [("fetch", run_fetch), ("convert", run_convert), ("export", run_export), ("deploy", run_deploy)]
+
+
+# ---------- Runner ----------
+
+def measure(ctx):
+    """Time each block (stage seconds from the metrics module), then trace its peak memory"""
+    rows = {}
+    for block, func in BLOCKS:
+        metrics.reset()
+        round_trips = fake_sqlserver.stats["round_trips"]
+        started = time.perf_counter()
+        func(ctx)
+        wall = time.perf_counter() - started
+        snap = metrics.snapshot()
+        stages = snap["stages"] or {block: {"calls": 1, "seconds": wall}}
+        if block == "export":
+            stages = {"export": {"calls": len(ctx["results"]), "seconds": wall}}
+        for stage_name, s in stages.items():
+            rows[stage_name] = {"block": block, "items": s["calls"], "seconds": round(s["seconds"], 4)}
+        if block == "fetch":
+            mb = snap["counters"].get("bytes_downloaded", 0) / 1024 / 1024
+            for stage_name in ("fetch", "parse"):
+                if stage_name in rows:
+                    rows[stage_name]["mb_per_s"] = round(mb / max(rows[stage_name]["seconds"], 1e-9), 1)
+        if block == "deploy":
+            rows.setdefault("execute", {"block": block, "items": 0, "seconds": 0.0})
+            rows["execute"]["round_trips"] = fake_sqlserver.stats["round_trips"] - round_trips
+
+    for block, func in BLOCKS:
+        tracemalloc.start()
+        func(ctx)
+        peak_mb = tracemalloc.get_traced_memory()[1] / 1024 / 1024
+        tracemalloc.stop()
+        for row in rows.values():
+            if row["block"] == block:
+                row["peak_mb"] = round(peak_mb, 1)
+    order = {name: idx for idx, name in enumerate(STAGES + ["export"])}
+    return dict(sorted(rows.items(), key=lambda kv: (order.get(kv[0], len(order)), kv[0])))
+
+
+def git_commit():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=BENCH_DIR, capture_output=True,
+                              text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return ""
+
+
+def print_report(rows, baseline=None):
+    print(f"{'stage':<14}{'items':>7}{'seconds':>10}{'items/s':>10}{'MB/s':>8}{'peak MB':>9}" + ("   vs baseline" if baseline else ""))
+    for stage_name, row in rows.items():
+        per_second = row["items"] / row["seconds"] if row["seconds"] else float("inf")
+        line = (f"{stage_name:<14}{row['items']:>7}{row['seconds']:>10.4f}{per_second:>10.1f}"
+                f"{row.get('mb_per_s', ''):>8}{row.get('peak_mb', ''):>9}")
+        old = (baseline or {}).get(stage_name)
+        if old and old["seconds"]:
+            line += f"   {(row['seconds'] - old['seconds']) / old['seconds'] * 100:+.0f}% time"
+            if old.get("peak_mb"):
+                line += f", {(row.get('peak_mb', 0) - old['peak_mb']) / old['peak_mb'] * 100:+.0f}% memory"
+        print(line)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark fetch/parse/convert/generate/export/deploy offline")
+    parser.add_argument("--fixtures", default=FIXTURES_DIR, help="directory of recorded doc pages")
+    parser.add_argument("--record", nargs="+", metavar="TABLE", help="save these tables' live doc pages as fixtures and exit")
+    parser.add_argument("--synthetic", type=int, default=0, help="use this many synthetic pages instead of the fixtures")
+    parser.add_argument("--rows", type=int, default=150, help="columns per synthetic page")
+    parser.add_argument("--wide-rows", type=int, default=2000, help="columns of each synthetic wide table (0 = none)")
+    parser.add_argument("--wide-tables", type=int, default=3, help="synthetic wide tables added to convert/export/deploy")
+    parser.add_argument("--latency-ms", type=float, default=1.0, help="fake SQL Server round-trip latency")
+    parser.add_argument("--json", help="write the results here")
+    parser.add_argument("--compare", help="results JSON of an earlier run to compare against")
+    args = parser.parse_args(argv)
+
+    if args.record:
+        record_fixtures(args.record, args.fixtures)
+        return 0
+
+    fake_sqlserver.install(latency_ms=args.latency_ms)
+    pages = load_pages(args)
+    server, base_url = serve_pages(pages)
+    ctx = {
+        "pages": pages,
+        "base_url": base_url,
+        "wide": [(f"XX_WIDE_TABLE_{i}", make_columns_table(args.wide_rows, seed=i)) for i in range(args.wide_tables)]
+                if args.wide_rows else [],
+    }
+    try:
+        rows = measure(ctx)
+    finally:
+        server.shutdown()
+
+    baseline = None
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as f:
+            baseline = json.load(f)["stages"]
+
+    source = "synthetic" if args.synthetic or not os.path.isdir(args.fixtures) else f"fixtures in {args.fixtures}"
+    size_mb = sum(len(p) for p in pages.values()) / 1024 / 1024
+    print(f"Pages: {len(pages)} ({source}, {size_mb:.1f} MB); wide tables: {len(ctx['wide'])} x {args.wide_rows} columns; "
+          f"SQL Server latency {args.latency_ms} ms")
+    print_report(rows, baseline)
+
+    if args.json:
+        os.makedirs(os.path.dirname(os.path.abspath(args.json)), exist_ok=True)
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump({"commit": git_commit(), "created": time.strftime("%Y-%m-%dT%H:%M:%S"), "args": vars(args),
+                       "stages": rows}, f, indent=2)
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,180 @@
+"""Benchmark columns-table extraction: streaming lxml parser vs BeautifulSoup + pd.read_html.
+
+    python benchmarks/bench_scrape_columns.py --pages 200 --rows 150
+    python benchmarks/bench_scrape_columns.py --corpus ./docs.oracle.com/en/cloud/saas/financials/25a/oedmf
+
+Without --corpus, synthetic pages shaped like the Fusion "Tables and Views"
+pages are generated (navigation, details table, columns table, primary key
+and index tables, footer). Each implementation runs in its own process; peak
+memory is the largest RSS growth while parsing a single page (Linux only,
+via /proc/self/clear_refs).
+"""
+import argparse
+import multiprocessing
+import os
+import sys
+import time
+from io import StringIO
+
+import pandas as pd
+from bs4 import BeautifulSoup
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from doc_lookup import PAGE_CHUNK_SIZE, find_columns_table  # noqa: E402
+
+ORACLE_TYPES = [("VARCHAR2", "240", ""), ("VARCHAR2", "1", ""), ("NUMBER", "", "18"), ("NUMBER", "", ""),
+                ("DATE", "", ""), ("TIMESTAMP", "", ""), ("CLOB", "", ""), ("VARCHAR2", "4000", "")]
+
+
+# ---------- Reference Implementation ----------
+
+def extract_bs4(html):
+    """Original extraction: parse the whole page, then re-parse the matching table with pd.read_html"""
+    soup = BeautifulSoup(html.decode("utf-8"), "html.parser")
+    for t in soup.find_all("table"):
+        headers = [th.get_text().strip().upper() for th in t.find_all("th")]
+        if "NAME" in headers and "DATATYPE" in headers:
+            try:
+                return pd.read_html(StringIO(str(t)))[0]
+            except Exception:
+                continue
+    return None
+
+
+def extract_lxml(html):
+    """Streaming extraction, fed in the same chunk size used for downloads"""
+    chunks = (html[i:i + PAGE_CHUNK_SIZE] for i in range(0, len(html), PAGE_CHUNK_SIZE))
+    return find_columns_table(chunks, encoding="utf-8")[0]
+
+
+IMPLEMENTATIONS = {"bs4 + read_html": extract_bs4, "lxml streaming": extract_lxml}
+
+
+# ---------- Corpus ----------
+
+def make_page(index, rows):
+    """Synthetic doc page with a columns table of the given size"""
+    name = f"XX_BENCH_TABLE_{index}"
+    nav = "".join(f'<li><a href="t{i}.html">XX_OTHER_TABLE_{i}</a></li>' for i in range(400))
+    columns = "".join(
+        f"<tr><td>COLUMN_{r}</td><td>{t}</td><td>{length}</td><td>{precision}</td>"
+        f"<td>{'Yes' if r % 3 == 0 else ''}</td><td>Description of column {r} in {name}</td></tr>"
+        for r, (t, length, precision) in ((r, ORACLE_TYPES[r % len(ORACLE_TYPES)]) for r in range(rows))
+    )
+    footer = "".join(f"<p>Copyright and legal text paragraph {i}.</p>" for i in range(200))
+    return (
+        f"<!DOCTYPE html><html><head><meta charset=\"utf-8\"><title>{name}</title></head><body>"
+        f"<nav><ul>{nav}</ul></nav><h1>{name}</h1>"
+        "<table><tr><th>Object owner:</th><td>FUSION</td></tr><tr><th>Object type:</th><td>TABLE</td></tr></table>"
+        "<h2>Columns</h2><table><thead><tr><th>Name</th><th>Datatype</th><th>Length</th><th>Precision</th>"
+        f"<th>Not-null</th><th>Comments</th></tr></thead><tbody>{columns}</tbody></table>"
+        f"<h2>Primary Key</h2><table><tr><th>Name</th><th>Columns</th></tr><tr><td>{name}_PK</td><td>COLUMN_0</td></tr></table>"
+        "<h2>Indexes</h2><table><tr><th>Index</th><th>Uniqueness</th><th>Tablespace</th><th>Columns</th></tr>"
+        f"<tr><td>{name}_U1</td><td>Unique</td><td>Default</td><td>COLUMN_0</td></tr></table>"
+        f"<footer>{footer}</footer></body></html>"
+    ).encode("utf-8")
+
+
+def load_corpus(args):
+    """Pages as bytes, from --corpus or generated"""
+    if not args.corpus:
+        return [make_page(i, args.rows) for i in range(args.pages)]
+    pages = []
+    for root, _, files in os.walk(args.corpus):
+        for name in sorted(files):
+            if name.lower().endswith((".html", ".htm")):
+                with open(os.path.join(root, name), "rb") as f:
+                    pages.append(f.read())
+    return pages
+
+
+# ---------- Measurement ----------
+
+def _rss_kb(field):
+    """VmRSS / VmHWM of this process in kB"""
+    with open("/proc/self/status") as f:
+        for line in f:
+            if line.startswith(field + ":"):
+                return int(line.split()[1])
+    return 0
+
+
+def _reset_peak_rss():
+    """Reset VmHWM to the current RSS (Linux); returns the current RSS in kB"""
+    with open("/proc/self/clear_refs", "w") as f:
+        f.write("5")
+    return _rss_kb("VmRSS")
+
+
+def measure(impl_name, args, queue):
+    """Run one implementation over the corpus in this process and report timing and peak memory per page"""
+    pages = load_corpus(args)
+    extract = IMPLEMENTATIONS[impl_name]
+    extract(pages[0])  # warm up imports and caches
+
+    found = 0
+    seconds = 0.0
+    peak_kb = 0
+    for page in pages:
+        try:
+            base_kb = _reset_peak_rss()
+        except OSError:
+            base_kb = None
+        started = time.perf_counter()
+        found += extract(page) is not None
+        seconds += time.perf_counter() - started
+        if base_kb is not None:
+            peak_kb = max(peak_kb, _rss_kb("VmHWM") - base_kb)
+    queue.put((impl_name, len(pages), found, seconds, peak_kb / 1024))
+
+
+def check_outputs(pages):
+    """Count pages where both implementations find a table but the frames differ"""
+    mismatches = 0
+    for page in pages:
+        old, new = extract_bs4(page), extract_lxml(page)
+        if (old is None) != (new is None):
+            mismatches += 1
+        elif old is not None:
+            try:
+                pd.testing.assert_frame_equal(old, new)
+            except AssertionError:
+                mismatches += 1
+    return mismatches
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark columns-table extraction from Oracle doc pages")
+    parser.add_argument("--corpus", help="directory of saved doc pages (default: synthetic pages)")
+    parser.add_argument("--pages", type=int, default=200, help="synthetic pages to generate")
+    parser.add_argument("--rows", type=int, default=150, help="columns per synthetic table")
+    args = parser.parse_args(argv)
+
+    pages = load_corpus(args)
+    if not pages:
+        print(f"No .html pages found under {args.corpus}")
+        return 1
+    mismatches = check_outputs(pages)
+
+    context = multiprocessing.get_context("spawn")
+    queue = context.Queue()
+    results = []
+    for impl_name in IMPLEMENTATIONS:
+        proc = context.Process(target=measure, args=(impl_name, args, queue))
+        proc.start()
+        results.append(queue.get())
+        proc.join()
+
+    size_mb = sum(len(p) for p in pages) / 1024 / 1024
+    print(f"Corpus: {len(pages)} page(s), {size_mb:.1f} MB" + ("" if args.corpus else f", {args.rows} columns each"))
+    print(f"{'implementation':<18}{'found':>7}{'seconds':>10}{'pages/s':>10}{'peak MB/page':>14}")
+    for impl_name, count, found, seconds, rss_mb in results:
+        print(f"{impl_name:<18}{found:>7}{seconds:>10.3f}{count / seconds:>10.1f}{rss_mb:>14.1f}")
+    print(f"Speedup: {results[0][3] / results[1][3]:.1f}x")
+    print(f"Pages with different output: {mismatches}")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,331 @@
+"""pyodbc stand-in backed by SQLite, for benchmarking sql_deploy without a SQL Server.
+
+    import fake_sqlserver
+    fake_sqlserver.install(latency_ms=2)       # registered as the pyodbc module
+    pool = ConnectionPool("DATABASE=BENCH")
+
+Each DATABASE=... in the connection string is a shared in-memory SQLite
+database holding emulated INFORMATION_SCHEMA.TABLES / COLUMNS and
+sys.databases. CREATE TABLE and ALTER TABLE ADD / ALTER COLUMN scripts
+update that catalog (T-SQL types are parsed, not executed); SELECTs against
+the catalog run in SQLite. INSERT rows are only counted; a fast_executemany
+batch is one round trip. Other statements (indexes, extended properties,
+...) are accepted and ignored. latency_ms is added to every round trip to
+model the network between the app and the server.
+"""
+import re
+import sqlite3
+import sys
+import threading
+import time
+
+apilevel = "2.0"
+threadsafety = 1
+paramstyle = "qmark"
+
+
+class Error(Exception):
+    pass
+
+
+class InterfaceError(Error):
+    pass
+
+
+class OperationalError(Error):
+    pass
+
+
+class ProgrammingError(Error):
+    pass
+
+
+# ODBC type codes used with setinputsizes
+SQL_CHAR, SQL_NUMERIC, SQL_DECIMAL, SQL_INTEGER, SQL_SMALLINT, SQL_REAL, SQL_DOUBLE, SQL_VARCHAR = 1, 2, 3, 4, 5, 7, 8, 12
+SQL_TYPE_DATE, SQL_TYPE_TIMESTAMP = 91, 93
+SQL_WCHAR, SQL_WVARCHAR, SQL_BIT, SQL_TINYINT, SQL_BIGINT, SQL_BINARY, SQL_VARBINARY = -8, -9, -7, -6, -5, -2, -3
+
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS information_schema_tables (TABLE_NAME TEXT PRIMARY KEY COLLATE NOCASE);
+CREATE TABLE IF NOT EXISTS information_schema_columns (
+    TABLE_NAME TEXT COLLATE NOCASE, COLUMN_NAME TEXT COLLATE NOCASE, ORDINAL_POSITION INTEGER,
+    DATA_TYPE TEXT, CHARACTER_MAXIMUM_LENGTH INTEGER, NUMERIC_PRECISION INTEGER, NUMERIC_SCALE INTEGER,
+    DATETIME_PRECISION INTEGER, IS_NULLABLE TEXT,
+    PRIMARY KEY (TABLE_NAME, COLUMN_NAME)
+);
+CREATE TABLE IF NOT EXISTS sys_databases (name TEXT PRIMARY KEY);
+"""
+_CATALOG_NAMES = [
+    (re.compile(r"INFORMATION_SCHEMA\.TABLES", re.I), "information_schema_tables"),
+    (re.compile(r"INFORMATION_SCHEMA\.COLUMNS", re.I), "information_schema_columns"),
+    (re.compile(r"sys\.databases", re.I), "sys_databases"),
+]
+_CREATE_TABLE = re.compile(r"^CREATE\s+TABLE\s+([\w.\[\]]+)\s*\(", re.I)
+_ALTER_ADD = re.compile(r"^ALTER\s+TABLE\s+([\w.\[\]]+)\s+ADD\s+(?!CONSTRAINT\b)(.*)$", re.I | re.S)
+_ALTER_COLUMN = re.compile(r"^ALTER\s+TABLE\s+([\w.\[\]]+)\s+ALTER\s+COLUMN\s+(.*)$", re.I | re.S)
+_TYPE = re.compile(r"^(\w+)\s*(?:\(\s*(MAX|\d+)\s*(?:,\s*(\d+)\s*)?\))?", re.I)
+_NOT_COLUMN = ("CONSTRAINT", "PRIMARY", "UNIQUE", "INDEX", "FOREIGN", "CHECK", "PERIOD")
+_DEFAULT_PRECISION = {"BIGINT": (19, 0), "INT": (10, 0), "SMALLINT": (5, 0), "TINYINT": (3, 0),
+                      "FLOAT": (53, None), "REAL": (24, None), "BIT": (1, 0), "MONEY": (19, 4)}
+
+stats = {"connects": 0, "round_trips": 0, "statements": 0, "rows_inserted": 0}
+_stats_lock = threading.Lock()
+_latency = 0.0
+_keepalive = {}   # one open connection per database keeps the shared in-memory DB alive
+_databases = ["BENCH"]
+
+
+def _count(key, n=1):
+    with _stats_lock:
+        stats[key] += n
+
+
+def _split_top_level(text, sep):
+    """Split on sep outside parentheses"""
+    parts, depth, start = [], 0, 0
+    for idx, ch in enumerate(text):
+        if ch == "(":
+            depth += 1
+        elif ch == ")":
+            depth -= 1
+        elif ch == sep and depth == 0:
+            parts.append(text[start:idx])
+            start = idx + 1
+    parts.append(text[start:])
+    return [p.strip() for p in parts if p.strip()]
+
+
+def _paren_body(text, open_idx):
+    """Text between the parenthesis at open_idx and its matching close"""
+    depth = 0
+    for idx in range(open_idx, len(text)):
+        if text[idx] == "(":
+            depth += 1
+        elif text[idx] == ")":
+            depth -= 1
+            if depth == 0:
+                return text[open_idx + 1:idx]
+    raise ProgrammingError("Incorrect syntax near ')'.")
+
+
+def _strip_comments(sql):
+    return re.sub(r"--[^\n]*", "", sql)
+
+
+def _name(identifier):
+    return identifier.split(".")[-1].strip("[]").upper()
+
+
+def _parse_column(definition):
+    """(name, data_type, char_length, precision, scale, datetime_precision, nullable) from 'COL TYPE ...'"""
+    name, _, rest = definition.strip().partition(" ")
+    m = _TYPE.match(rest.strip())
+    if not m:
+        raise ProgrammingError(f"Column, parameter, or variable #1: Cannot find data type for '{name}'.")
+    base, arg1, arg2 = m.group(1).upper(), m.group(2), m.group(3)
+    char_len = precision = scale = dt_precision = None
+    if base in ("VARCHAR", "NVARCHAR", "CHAR", "NCHAR", "VARBINARY", "BINARY"):
+        char_len = -1 if (arg1 or "").upper() == "MAX" else int(arg1 or 1)
+    elif base in ("DECIMAL", "NUMERIC"):
+        precision, scale = int(arg1 or 18), int(arg2 or 0)
+    elif base in ("DATETIME2", "DATETIMEOFFSET", "TIME"):
+        dt_precision = int(arg1) if arg1 else 7
+    elif base in ("DATETIME", "SMALLDATETIME", "DATE"):
+        dt_precision = {"DATETIME": 3, "SMALLDATETIME": 0, "DATE": 0}[base]
+    elif base in _DEFAULT_PRECISION:
+        precision, scale = _DEFAULT_PRECISION[base]
+    nullable = "NO" if re.search(r"\bNOT\s+NULL\b", rest, re.I) else "YES"
+    return name.strip("[]").upper(), base.lower(), char_len, precision, scale, dt_precision, nullable
+
+
+class Cursor:
+    def __init__(self, connection):
+        self.connection = connection
+        self._rows = []
+        self.rowcount = -1
+        self.fast_executemany = False
+
+    def execute(self, sql, *params):
+        if len(params) == 1 and isinstance(params[0], (list, tuple)):
+            params = tuple(params[0])
+        self.connection._round_trip()
+        db = self.connection._db
+        try:
+            stripped = _strip_comments(sql).strip()
+            if re.match(r"^SELECT\b", stripped, re.I):
+                query = stripped
+                for pattern, table in _CATALOG_NAMES:
+                    query = pattern.sub(table, query)
+                self._rows = [tuple(r) for r in db.execute(query, params).fetchall()]
+                self.rowcount = len(self._rows)
+                _count("statements")
+            else:
+                self._rows = []
+                for statement in _split_top_level(stripped, ";"):
+                    self._apply(statement)
+        except sqlite3.Error as e:
+            raise ProgrammingError(str(e)) from e
+        return self
+
+    def executemany(self, sql, seq_of_params):
+        rows = list(seq_of_params)
+        if re.match(r"^\s*INSERT\b", sql, re.I):
+            # fast_executemany sends the whole parameter array at once
+            for _ in range(1 if self.fast_executemany else len(rows)):
+                self.connection._round_trip()
+            _count("statements")
+            _count("rows_inserted", len(rows))
+            return self
+        for params in rows:
+            self.execute(sql, *params)
+        return self
+
+    def setinputsizes(self, sizes):
+        self.input_sizes = sizes
+
+    def nextset(self):
+        # Every script runs as one SQLite step, so there is never a further result set
+        return False
+
+    def _apply(self, statement):
+        db = self.connection._db
+        _count("statements")
+        m = _CREATE_TABLE.match(statement)
+        if m:
+            table = _name(m.group(1))
+            try:
+                db.execute("INSERT INTO information_schema_tables (TABLE_NAME) VALUES (?)", (table,))
+            except sqlite3.IntegrityError:
+                raise ProgrammingError(f"There is already an object named '{table}' in the database.") from None
+            body = _paren_body(statement, m.end() - 1)
+            columns = [d for d in _split_top_level(body, ",") if d.split()[0].upper() not in _NOT_COLUMN]
+            self._add_columns(table, columns, 1)
+            return
+        m = _ALTER_ADD.match(statement)
+        if m:
+            table = _name(m.group(1))
+            position = db.execute("SELECT COUNT(*) FROM information_schema_columns WHERE TABLE_NAME = ?", (table,)).fetchone()[0]
+            self._add_columns(table, _split_top_level(m.group(2), ","), position + 1)
+            return
+        m = _ALTER_COLUMN.match(statement)
+        if m:
+            table = _name(m.group(1))
+            name, *values = _parse_column(m.group(2))
+            updated = db.execute(
+                "UPDATE information_schema_columns SET DATA_TYPE = ?, CHARACTER_MAXIMUM_LENGTH = ?, NUMERIC_PRECISION = ?, "
+                "NUMERIC_SCALE = ?, DATETIME_PRECISION = ?, IS_NULLABLE = ? WHERE TABLE_NAME = ? AND COLUMN_NAME = ?",
+                (*values, table, name)
+            ).rowcount
+            if not updated:
+                raise ProgrammingError(f"Invalid column name '{name}'.")
+        # Anything else (CREATE INDEX, sp_addextendedproperty, SET, ...) is accepted as is
+
+    def _add_columns(self, table, definitions, first_position):
+        rows = []
+        for offset, definition in enumerate(definitions):
+            name, *values = _parse_column(definition)
+            rows.append((table, name, first_position + offset, *values))
+        try:
+            self.connection._db.executemany("INSERT INTO information_schema_columns VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)", rows)
+        except sqlite3.IntegrityError as e:
+            raise ProgrammingError(f"Column names in each table must be unique. {e}") from None
+
+    def fetchone(self):
+        return self._rows.pop(0) if self._rows else None
+
+    def fetchall(self):
+        rows, self._rows = self._rows, []
+        return rows
+
+    def fetchmany(self, size=1):
+        rows, self._rows = self._rows[:size], self._rows[size:]
+        return rows
+
+    def close(self):
+        self._rows = []
+
+
+class Connection:
+    def __init__(self, database):
+        self.database = database
+        self.autocommit = False
+        self._db = sqlite3.connect(f"file:fake_sqlserver_{database}?mode=memory&cache=shared", uri=True,
+                                   check_same_thread=False, timeout=30)
+        self._closed = False
+
+    def _round_trip(self):
+        if self._closed:
+            raise InterfaceError("Attempt to use a closed connection.")
+        _count("round_trips")
+        if _latency:
+            time.sleep(_latency)
+
+    def cursor(self):
+        self._round_trip()
+        return Cursor(self)
+
+    def commit(self):
+        self._round_trip()
+        self._db.commit()
+
+    def rollback(self):
+        self._round_trip()
+        self._db.rollback()
+
+    def close(self):
+        if not self._closed:
+            self._db.close()
+            self._closed = True
+
+
+def connect(conn_str="", timeout=0, autocommit=False, **kwargs):
+    """Open a connection to the DATABASE= named in the connection string"""
+    m = re.search(r"DATABASE=([^;]+)", conn_str, re.I)
+    database = (m.group(1) if m else "master").upper()
+    with _stats_lock:
+        stats["connects"] += 1
+        if database not in _keepalive:
+            keeper = sqlite3.connect(f"file:fake_sqlserver_{database}?mode=memory&cache=shared", uri=True,
+                                     check_same_thread=False)
+            keeper.executescript(_SCHEMA)
+            keeper.executemany("INSERT OR IGNORE INTO sys_databases (name) VALUES (?)", [(d,) for d in _databases])
+            keeper.commit()
+            _keepalive[database] = keeper
+    if _latency:
+        time.sleep(_latency)
+    conn = Connection(database)
+    conn.autocommit = autocommit
+    return conn
+
+
+def reset():
+    """Drop every fake database and zero the counters"""
+    with _stats_lock:
+        for keeper in _keepalive.values():
+            keeper.close()
+        _keepalive.clear()
+        for key in stats:
+            stats[key] = 0
+
+
+def install(latency_ms=0.0, databases=("BENCH",)):
+    """Register this module as pyodbc (sql_pool / sql_deploy import it lazily) and return it"""
+    global _latency, _databases
+    _latency = latency_ms / 1000
+    _databases = [d.upper() for d in databases]
+    module = sys.modules[__name__]
+    sys.modules["pyodbc"] = module
+    return module
+
+
+if __name__ == "__main__":
+    # Tiny self-check: create, inspect, alter
+    install()
+    conn = connect("DATABASE=BENCH")
+    cur = conn.cursor()
+    cur.execute("CREATE TABLE ST_FN_DEMO (\n    ID BIGINT NOT NULL,\n    NAME NVARCHAR(240),\n    AMOUNT DECIMAL(18,2)\n);")
+    conn.commit()
+    cur.execute("ALTER TABLE ST_FN_DEMO ALTER COLUMN NAME NVARCHAR(MAX);")
+    print(cur.execute("SELECT * FROM INFORMATION_SCHEMA.COLUMNS WHERE TABLE_NAME IN (?)", "ST_FN_DEMO").fetchall())
+    print(stats)
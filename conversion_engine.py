@@ -0,0 +1,758 @@
+"""Vectorized Oracle → SQL Server column conversion and CREATE TABLE generation.
+
+Works on whole columns with pandas string accessors instead of iterating rows,
+so wide tables (300+ columns) and large batches convert in a single pass.
+
+The type mapping itself is declared in type_mappings.json as named profiles.
+Each profile is compiled once into a dispatch index keyed by the Oracle base
+type (e.g. VARCHAR2, NUMBER, TIMESTAMP WITH TIME ZONE) whose ordered cases
+are evaluated with np.select.
+
+How a table is stored (heap, PAGE compression, clustered columnstore,
+date partitioning) comes from the storage profiles in storage_profiles.json,
+picked per table by name pattern or row-count hint.
+"""
+import fnmatch
+import json
+import os
+import re
+import string
+import threading
+
+import numpy as np
+import pandas as pd
+
+from metrics import timed
+
+TYPE_MAPPINGS_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "type_mappings.json")
+STORAGE_PROFILES_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "storage_profiles.json")
+
+# Column names used by the Oracle docs "Columns" table (after normalization)
+COLNAME_COL = "NAME"
+DTYPE_COL = "DATATYPE"
+LENGTH_COL = "LENGTH"
+PRECISION_COL = "PRECISION"
+NOTNULL_COL = "NOT_NULL"
+COMMENTS_COL = "COMMENTS"
+
+RESULT_COLUMNS = ["COLUMN_NAME", "ORACLE_TYPE", "LENGTH", "PRECISION", "NOT_NULL", "SQL_SERVER_TYPE", "COMMENTS"]
+
+# What build_create_table emits besides the column list
+DDL_OPTIONS = {
+    "not_null": True,             # NOT NULL where the docs mark a column Not-null (primary key columns always)
+    "primary_key": True,          # clustered PRIMARY KEY from the page's Primary Key table
+    "indexes": True,              # nonclustered indexes from the page's Indexes table
+    "comments": True,             # column comments as MS_Description extended properties
+    "indexes_after_load": False,  # leave the key and indexes to build_post_load_script
+}
+DDL_SCHEMA = "dbo"
+NOT_NULL_VALUES = {"YES", "Y", "TRUE", "NOT NULL"}
+EXTENDED_PROPERTY_MAX_CHARS = 3750  # MS_Description is a sql_variant of at most 7500 bytes
+
+# Column types a clustered columnstore index cannot hold (the (MAX) types are fine from SQL Server 2017)
+COLUMNSTORE_UNSUPPORTED_TYPES = {"XML", "TEXT", "NTEXT", "IMAGE", "SQL_VARIANT", "ROWVERSION", "HIERARCHYID",
+                                 "GEOMETRY", "GEOGRAPHY"}
+ORACLE_DATE_TYPES = ("DATE", "TIMESTAMP")
+PARTITION_INTERVALS = {"month": 1, "quarter": 3, "year": 12}  # months per partition
+PARTITION_MAX = 15000  # SQL Server limit per partition function
+
+# Bytes per value in the declared maximum row size; variable-length types add a 2-byte offset,
+# (MAX) and LOB types are counted at the 8000-byte in-row limit, unknown types at 8
+FIXED_TYPE_BYTES = {"BIT": 1, "TINYINT": 1, "SMALLINT": 2, "INT": 4, "BIGINT": 8, "REAL": 4, "SMALLMONEY": 4,
+                    "MONEY": 8, "DATE": 3, "SMALLDATETIME": 4, "DATETIME": 8, "UNIQUEIDENTIFIER": 16}
+MAX_TYPE_BYTES = 8000
+UNKNOWN_TYPE_BYTES = 8
+_SQL_TYPE = re.compile(r"^(\w+)\s*(?:\(\s*(MAX|\d+)\s*(?:,\s*(\d+)\s*)?\))?")
+
+# Values a rule can test or place in its SQL template ("ascii" is true for columns the
+# profile's "ascii" section marks as single-byte text, by name or comment)
+RULE_FIELDS = ("length", "precision", "scale", "ascii")
+TEMPLATE_FIELDS = RULE_FIELDS + ("oracle_type",)
+RULE_OPERATORS = {
+    "eq": lambda v, x: v == x,
+    "ne": lambda v, x: v != x,
+    "gt": lambda v, x: v > x,
+    "gte": lambda v, x: v >= x,
+    "lt": lambda v, x: v < x,
+    "lte": lambda v, x: v <= x,
+    "missing": lambda v, x: v.isna() if x else v.notna(),
+}
+# A test value written as "{field}" compares with that field of the same column, e.g. scale <= precision
+_FIELD_REFERENCE = re.compile(r"^\{(\w+)\}$")
+
+_compiled_mappings = {}
+_storage_profiles = {}
+_compiled_lock = threading.Lock()
+
+
+# ---------- Rule Compilation ----------
+
+def _compile_case(profile_name, case):
+    """Compile one {"when": ..., "sql": ...} case into (conditions, template pieces, required fields)"""
+    conditions = []
+    for field, tests in case.get("when", {}).items():
+        if field not in RULE_FIELDS:
+            raise ValueError(f"Profile '{profile_name}': unknown rule field '{field}' (expected one of {RULE_FIELDS})")
+        for op, value in tests.items():
+            if op not in RULE_OPERATORS:
+                raise ValueError(f"Profile '{profile_name}': unknown operator '{op}' (expected one of {tuple(RULE_OPERATORS)})")
+            reference = _FIELD_REFERENCE.match(value) if isinstance(value, str) else None
+            if reference and reference.group(1) not in RULE_FIELDS:
+                raise ValueError(f"Profile '{profile_name}': unknown rule field '{value}' in '{field}' test")
+            conditions.append((field, RULE_OPERATORS[op], (reference.group(1),) if reference else value))
+
+    pieces = []
+    required = set()
+    for literal, field, _, _ in string.Formatter().parse(case["sql"]):
+        if field is not None and field not in TEMPLATE_FIELDS:
+            raise ValueError(f"Profile '{profile_name}': unknown placeholder '{{{field}}}' in '{case['sql']}'")
+        pieces.append((literal, field))
+        if field in RULE_FIELDS:
+            required.add(field)
+    return conditions, pieces, sorted(required)
+
+
+def _name_pattern(patterns):
+    """One regex matching any of the shell-style column name patterns, or None"""
+    if not patterns:
+        return None
+    return "|".join(fnmatch.translate(p.upper()) for p in patterns)
+
+
+def compile_profile(name, spec):
+    """Compile a profile spec into a dispatch index {base type: [compiled cases]}"""
+    index = {}
+    for rule in spec.get("rules", []):
+        cases = [_compile_case(name, case) for case in rule["cases"]]
+        for oracle_type in rule["types"]:
+            index[" ".join(oracle_type.upper().split())] = cases
+    ascii_spec = spec.get("ascii", {})
+    comment_pattern = ascii_spec.get("comment_pattern")
+    if comment_pattern:
+        try:
+            re.compile(comment_pattern)
+        except re.error as e:
+            raise ValueError(f"Profile '{name}': invalid ascii comment_pattern: {e}") from None
+    return {
+        "name": name,
+        "description": spec.get("description", ""),
+        "strict_sizes": bool(spec.get("strict_sizes", False)),
+        "index": index,
+        "ascii_columns": _name_pattern(ascii_spec.get("columns")),
+        "unicode_columns": _name_pattern(ascii_spec.get("unicode_columns")),
+        "ascii_comment_pattern": comment_pattern,
+    }
+
+
+def load_type_mappings(path=TYPE_MAPPINGS_FILE):
+    """Load and compile the mapping file once (recompiled only when the file changes)"""
+    mtime = os.path.getmtime(path)
+    with _compiled_lock:
+        cached = _compiled_mappings.get(path)
+        if cached and cached["mtime"] == mtime:
+            return cached
+
+        with open(path, "r", encoding="utf-8") as f:
+            spec = json.load(f)
+        compiled = {
+            "mtime": mtime,
+            "default_profile": spec["default_profile"],
+            "prefix_profiles": {k.upper(): v for k, v in spec.get("prefix_profiles", {}).items()},
+            "profiles": {name: compile_profile(name, p) for name, p in spec["profiles"].items()},
+        }
+        if compiled["default_profile"] not in compiled["profiles"]:
+            raise ValueError(f"Default profile '{compiled['default_profile']}' is not defined in {path}")
+        _compiled_mappings[path] = compiled
+        return compiled
+
+
+def list_profiles(path=TYPE_MAPPINGS_FILE):
+    """Names of the available mapping profiles"""
+    return list(load_type_mappings(path)["profiles"])
+
+
+def profile_for_prefix(prefix, path=TYPE_MAPPINGS_FILE):
+    """Profile name configured for a table prefix, or the default profile"""
+    mappings = load_type_mappings(path)
+    return mappings["prefix_profiles"].get((prefix or "").upper(), mappings["default_profile"])
+
+
+def get_profile(name=None, prefix=None, path=TYPE_MAPPINGS_FILE):
+    """Compiled profile by name, else by prefix, else the default"""
+    mappings = load_type_mappings(path)
+    name = name or profile_for_prefix(prefix, path)
+    if name not in mappings["profiles"]:
+        raise ValueError(f"Unknown type mapping profile '{name}'. Available: {list(mappings['profiles'])}")
+    return mappings["profiles"][name]
+
+
+# ---------- Storage Profiles ----------
+
+def load_storage_profiles(path=STORAGE_PROFILES_FILE):
+    """Load and check the storage profile file once (reloaded only when the file changes)"""
+    mtime = os.path.getmtime(path)
+    with _compiled_lock:
+        cached = _storage_profiles.get(path)
+        if cached and cached["mtime"] == mtime:
+            return cached
+
+        with open(path, "r", encoding="utf-8") as f:
+            spec = json.load(f)
+        profiles = spec["profiles"]
+        for name in [spec["default_profile"]] + [rule["profile"] for rule in spec.get("rules", [])]:
+            if name not in profiles:
+                raise ValueError(f"Storage profile '{name}' is not defined in {path}")
+        for name, profile in profiles.items():
+            interval = profile.get("partition", {}).get("interval", "year")
+            if interval not in PARTITION_INTERVALS:
+                raise ValueError(f"Storage profile '{name}': unknown partition interval '{interval}' "
+                                 f"(expected one of {tuple(PARTITION_INTERVALS)})")
+        loaded = {
+            "mtime": mtime,
+            "default_profile": spec["default_profile"],
+            "rules": spec.get("rules", []),
+            "table_hints": {k.upper(): v for k, v in spec.get("table_hints", {}).items()},
+            "profiles": profiles,
+        }
+        _storage_profiles[path] = loaded
+        return loaded
+
+
+def list_storage_profiles(path=STORAGE_PROFILES_FILE):
+    """Names of the available storage profiles"""
+    return list(load_storage_profiles(path)["profiles"])
+
+
+def storage_profile_for(table_name, row_count=None, path=STORAGE_PROFILES_FILE):
+    """Profile of the first rule matching the table name and row count, or the default
+
+    Without a row_count the table's "rows" hint from the file is used; rules with
+    min_rows never match a table whose size is unknown.
+    """
+    spec = load_storage_profiles(path)
+    table_name = (table_name or "").upper()
+    if row_count is None:
+        row_count = spec["table_hints"].get(table_name, {}).get("rows")
+    for rule in spec["rules"]:
+        patterns = rule.get("tables")
+        if patterns and not any(fnmatch.fnmatchcase(table_name, p.upper()) for p in patterns):
+            continue
+        if "min_rows" in rule and (row_count is None or row_count < rule["min_rows"]):
+            continue
+        return rule["profile"]
+    return spec["default_profile"]
+
+
+def get_storage_profile(name=None, table_name=None, row_count=None, partition_column=None, path=STORAGE_PROFILES_FILE):
+    """Storage profile by name, else by the rules for this table; the partition column comes
+    from the argument, else the table's hint, else the profile's preferred date columns"""
+    spec = load_storage_profiles(path)
+    name = name or storage_profile_for(table_name, row_count, path)
+    if name not in spec["profiles"]:
+        raise ValueError(f"Unknown storage profile '{name}'. Available: {list(spec['profiles'])}")
+    profile = spec["profiles"][name]
+    partition = profile.get("partition")
+    if partition:
+        hint = spec["table_hints"].get((table_name or "").upper(), {})
+        column = partition_column or hint.get("partition_column")
+        partition = {**partition, "column": column.strip().upper() if column else None}
+    return {
+        "name": name,
+        "description": profile.get("description", ""),
+        "columnstore": bool(profile.get("columnstore", False)),
+        "data_compression": profile.get("data_compression"),
+        "partition": partition,
+    }
+
+
+# ---------- Conversion ----------
+
+def normalize_column_names(columns):
+    """Upper-case header names and replace spaces/dashes with underscores"""
+    return [c.strip().upper().replace(" ", "_").replace("-", "_") for c in columns]
+
+
+def _text_column(df, col):
+    """Stripped string values of a column, or empty strings if the column is missing"""
+    if col in df.columns:
+        return df[col].astype(str).str.strip()
+    return pd.Series("", index=df.index, dtype=object)
+
+
+def _size_column(values, dtype, inline_pattern, strict_sizes=False):
+    """Numeric size from the Length/Precision column, falling back to the number in the datatype"""
+    # pd.read_html gives float columns when some cells are blank, so sizes arrive as "18.0";
+    # strict parsing (the original behaviour) only accepts plain digits
+    declared_text = values if strict_sizes else values.str.replace(r"^(\d+)\.0+$", r"\1", regex=True)
+    declared = pd.to_numeric(declared_text.where(declared_text.str.isdigit()), errors="coerce")
+    inline = pd.to_numeric(dtype.str.extract(inline_pattern, expand=False), errors="coerce")
+    return declared.fillna(inline)
+
+
+def base_types(dtype):
+    """Oracle type without size qualifiers, e.g. TIMESTAMP(6) WITH TIME ZONE → TIMESTAMP WITH TIME ZONE"""
+    return dtype.str.replace(r"\([^)]*(\)|$)", " ", regex=True).str.split().str.join(" ").fillna("")
+
+
+def ascii_columns(names, comments, profile):
+    """True for columns the profile stores as single-byte text: a name pattern or a comment
+    hint matches and the name is not one of its unicode_columns"""
+    is_ascii = pd.Series(False, index=names.index)
+    if profile.get("ascii_columns"):
+        is_ascii |= names.str.match(profile["ascii_columns"])
+    if profile.get("ascii_comment_pattern"):
+        is_ascii |= comments.str.contains(profile["ascii_comment_pattern"], case=False, regex=True)
+    if profile.get("unicode_columns"):
+        is_ascii &= ~names.str.match(profile["unicode_columns"])
+    return is_ascii
+
+
+def map_sql_types(dtype, fields, profile):
+    """Apply a compiled profile to upper-cased Oracle types; unmapped types are passed through"""
+    sqltype = dtype.to_numpy(dtype=object).copy()
+    field_text = {name: values.astype("Int64").astype(str) for name, values in fields.items()}
+    field_text["oracle_type"] = dtype
+
+    codes, uniques = pd.factorize(base_types(dtype))
+    for code, base in enumerate(uniques):
+        # Exact base type first, then its first word (TIMESTAMP WITH LOCAL TIME ZONE → TIMESTAMP)
+        cases = profile["index"].get(base) or profile["index"].get(base.split(" ")[0])
+        if not cases:
+            continue
+
+        rows = np.flatnonzero(codes == code)
+        conditions, choices = [], []
+        for tests, pieces, required in cases:
+            mask = np.ones(len(rows), dtype=bool)
+            for field in required:
+                mask &= fields[field].iloc[rows].notna().to_numpy()
+            for field, op, value in tests:
+                if isinstance(value, tuple):
+                    # Field reference; comparisons with a missing value are False
+                    value = fields[value[0]].iloc[rows].to_numpy()
+                mask &= op(fields[field].iloc[rows], value).to_numpy(dtype=bool)
+            rendered = pd.Series("", index=dtype.index[rows], dtype=object)
+            for literal, field in pieces:
+                rendered = rendered + literal
+                if field is not None:
+                    rendered = rendered + field_text[field].iloc[rows].to_numpy(dtype=object)
+            conditions.append(mask)
+            choices.append(rendered.to_numpy(dtype=object))
+
+        # np.select picks the first matching case, mirroring an if/elif chain
+        sqltype[rows] = np.select(conditions, choices, default=sqltype[rows])
+    return sqltype
+
+
+@timed("convert")
+def convert_oracle_types(df, profile=None):
+    """Convert an Oracle docs columns table into the SQL Server column mapping"""
+    profile = profile or get_profile()
+    df = df.copy()
+    df.columns = normalize_column_names(df.columns)
+    if COLNAME_COL not in df.columns or DTYPE_COL not in df.columns:
+        return pd.DataFrame()
+
+    colname = _text_column(df, COLNAME_COL)
+    keep = (colname != "") & (colname != "NAN")
+    if not keep.any():
+        return pd.DataFrame()
+    df = df[keep]
+    colname = colname[keep]
+
+    dtype = df[DTYPE_COL].astype(str).str.strip().str.upper()
+    length = _text_column(df, LENGTH_COL)
+    precision = _text_column(df, PRECISION_COL)
+
+    # Lengths only count a closed "(n)"; NUMBER precision takes the first number after "("
+    # and a "p,s" Precision value is split into precision and scale (except with strict sizes,
+    # where the original behaviour ignores it and falls back to the datatype)
+    strict = profile["strict_sizes"]
+    inline_scale = pd.to_numeric(dtype.str.extract(r"\(\s*\d+\s*,\s*(\d+)\s*\)", expand=False), errors="coerce")
+    if strict:
+        precision_digits, scale = precision, inline_scale
+    else:
+        precision_digits = precision.str.extract(r"^(\d+)\s*,\s*\d+$", expand=False).fillna(precision)
+        scale = pd.to_numeric(precision.str.extract(r"^\d+\s*,\s*(\d+)$", expand=False), errors="coerce").fillna(inline_scale)
+    fields = {
+        "length": _size_column(length, dtype, r"\((\d+)\)", strict),
+        "precision": _size_column(precision_digits, dtype, r"\((\d+)", strict),
+        "scale": scale,
+        "ascii": ascii_columns(colname.str.upper(), _text_column(df, COMMENTS_COL), profile),
+    }
+
+    result_df = pd.DataFrame({
+        "COLUMN_NAME": colname.to_numpy(dtype=object),
+        "ORACLE_TYPE": dtype.to_numpy(dtype=object),
+        "LENGTH": length.to_numpy(dtype=object),
+        "PRECISION": precision.to_numpy(dtype=object),
+        "NOT_NULL": _text_column(df, NOTNULL_COL).to_numpy(dtype=object),
+        "SQL_SERVER_TYPE": map_sql_types(dtype, fields, profile),
+        "COMMENTS": _text_column(df, COMMENTS_COL).to_numpy(dtype=object),
+    }, columns=RESULT_COLUMNS)
+    return result_df
+
+
+# ---------- DDL Generation ----------
+
+def ddl_options(options=None):
+    """DDL_OPTIONS with the given overrides"""
+    return {**DDL_OPTIONS, **(options or {})}
+
+
+def _key_plan(df, keys, options):
+    """(primary key columns or None, [(index name, unique, columns)]) for keys whose columns all exist"""
+    if keys is None or keys.empty:
+        return None, []
+    existing = set(df["COLUMN_NAME"].astype(str).str.upper())
+    primary_key = None
+    indexes = []
+    for name, kind, columns in zip(keys["NAME"], keys["TYPE"], keys["COLUMNS"]):
+        columns = [c.strip().upper() for c in str(columns).split(",") if c.strip()]
+        if not columns or not set(columns) <= existing:
+            continue
+        if kind == "PRIMARY":
+            if primary_key is None and options["primary_key"]:
+                primary_key = columns
+        elif options["indexes"]:
+            indexes.append((str(name).strip().upper(), kind == "UNIQUE", columns))
+    # Oracle often has a unique index backing the primary key; the clustered key replaces it
+    if primary_key:
+        indexes = [idx for idx in indexes if idx[2] != primary_key]
+    return primary_key, indexes
+
+
+def _not_null_mask(df, primary_key, options):
+    """True for columns declared NOT NULL: the primary key, plus doc Not-null columns if options["not_null"]"""
+    # Primary key columns must be NOT NULL, also when the key is only added after the load
+    not_null = df["COLUMN_NAME"].astype(str).str.upper().isin(primary_key or [])
+    if options["not_null"]:
+        not_null |= _text_column(df, NOTNULL_COL).str.upper().isin(NOT_NULL_VALUES)
+    return not_null
+
+
+def date_columns(df):
+    """Converted columns that were Oracle DATE / TIMESTAMP columns, in table order"""
+    oracle_base = base_types(df["ORACLE_TYPE"].astype(str).str.upper()).str.split(" ").str[0]
+    return list(df["COLUMN_NAME"][oracle_base.isin(ORACLE_DATE_TYPES)].astype(str))
+
+
+def partition_boundaries(partition):
+    """RANGE RIGHT boundary dates from the partition spec's start to end, one per interval"""
+    step = pd.DateOffset(months=PARTITION_INTERVALS[partition.get("interval", "year")])
+    bounds = pd.date_range(pd.Timestamp(partition["start"]), pd.Timestamp(partition["end"]), freq=step)
+    return [d.strftime("%Y-%m-%d") for d in bounds[:PARTITION_MAX - 1]]
+
+
+def _storage_plan(df, storage):
+    """What a storage profile (get_storage_profile) means for this table's columns"""
+    plan = {"columnstore": False, "compression": None, "partition_column": None, "partition_type": None,
+            "boundaries": [], "notes": []}
+    if not storage:
+        return plan
+    plan["compression"] = storage.get("data_compression")
+    sql_types = df["SQL_SERVER_TYPE"].astype(str).str.upper()
+
+    if storage.get("columnstore"):
+        unsupported = df["COLUMN_NAME"][sql_types.str.split("(").str[0].str.strip().isin(COLUMNSTORE_UNSUPPORTED_TYPES)]
+        if len(unsupported):
+            plan["notes"].append(f"No clustered columnstore index: unsupported type in {', '.join(unsupported.astype(str))}")
+        else:
+            plan["columnstore"] = True
+
+    partition = storage.get("partition")
+    if partition:
+        candidates = {c.upper(): c for c in date_columns(df)}
+        wanted = [c.upper() for c in partition.get("columns", [])]
+        if partition.get("column"):
+            if partition["column"] not in candidates:
+                plan["notes"].append(f"Partition column {partition['column']} is not among the DATE/TIMESTAMP columns")
+            wanted.insert(0, partition["column"])
+        column = next((candidates[c] for c in wanted if c in candidates), next(iter(candidates.values()), None))
+        if column is None:
+            plan["notes"].append("Not partitioned: the table has no DATE/TIMESTAMP column")
+        else:
+            plan["partition_column"] = column
+            plan["partition_type"] = str(df["SQL_SERVER_TYPE"][df["COLUMN_NAME"].astype(str) == column].iloc[0])
+            plan["boundaries"] = partition_boundaries(partition)
+    return plan
+
+
+def _aligned(plan, columns, unique):
+    """Unique indexes of a partitioned table can only be partitioned if they contain the partition column"""
+    return not (plan["partition_column"] and unique and plan["partition_column"].upper() not in columns)
+
+
+def _index_options(plan, aligned):
+    options = f" WITH (DATA_COMPRESSION = {plan['compression']})" if plan["compression"] else ""
+    return options + ("" if aligned else " ON [PRIMARY]")
+
+
+def _primary_key_clause(target_table, columns, plan):
+    # Clustered unless the table is a columnstore or the key cannot follow the partitioning
+    aligned = _aligned(plan, columns, True)
+    kind = "CLUSTERED" if aligned and not plan["columnstore"] else "NONCLUSTERED"
+    return f"CONSTRAINT PK_{target_table} PRIMARY KEY {kind} ({', '.join(columns)}){_index_options(plan, aligned)}"
+
+
+def _index_statements(target_table, indexes, plan):
+    return [
+        f"CREATE {'UNIQUE ' if unique else ''}NONCLUSTERED INDEX {name} ON {target_table} ({', '.join(columns)})"
+        f"{_index_options(plan, _aligned(plan, columns, unique))};"
+        for name, unique, columns in indexes
+    ]
+
+
+def _partition_statements(target_table, plan):
+    """Partition function and scheme (skipped if they exist, e.g. after the table was dropped)"""
+    function, scheme = f"PF_{target_table}", f"PS_{target_table}"
+    values = ", ".join(f"'{b}'" for b in plan["boundaries"])
+    return [
+        f"IF NOT EXISTS (SELECT 1 FROM sys.partition_functions WHERE name = N'{function}')\n"
+        f"    CREATE PARTITION FUNCTION {function} ({plan['partition_type']}) AS RANGE RIGHT FOR VALUES ({values});",
+        f"IF NOT EXISTS (SELECT 1 FROM sys.partition_schemes WHERE name = N'{scheme}')\n"
+        f"    CREATE PARTITION SCHEME {scheme} AS PARTITION {function} ALL TO ([PRIMARY]);",
+    ]
+
+
+def _comment_statements(target_table, df):
+    """sp_addextendedproperty calls adding each column comment as its MS_Description"""
+    comments = _text_column(df, "COMMENTS")
+    has_comment = ~comments.isin(["", "nan", "None", "NaN"])
+    statements = []
+    for column, comment in zip(df["COLUMN_NAME"][has_comment].astype(str), comments[has_comment]):
+        value = comment[:EXTENDED_PROPERTY_MAX_CHARS].replace("'", "''")
+        statements.append(
+            f"EXEC sys.sp_addextendedproperty @name = N'MS_Description', @value = N'{value}', "
+            f"@level0type = N'SCHEMA', @level0name = N'{DDL_SCHEMA}', @level1type = N'TABLE', @level1name = N'{target_table}', "
+            f"@level2type = N'COLUMN', @level2name = N'{column}';"
+        )
+    return statements
+
+
+@timed("generate")
+def build_create_table(table_name, df, prefix, keys=None, options=None, storage=None):
+    """Build the CREATE TABLE script for a converted column mapping
+
+    keys is the page's primary key / indexes table (doc_lookup.KEY_COLUMNS). Depending on
+    options (see DDL_OPTIONS) columns get NOT NULL, the primary key becomes a clustered
+    PRIMARY KEY, indexes become nonclustered indexes and comments MS_Description
+    extended properties. storage (get_storage_profile) adds PAGE compression, a clustered
+    columnstore index and/or a partition function and scheme on a date column.
+    """
+    if df.empty:
+        return "-- No columns to generate"
+    options = ddl_options(options)
+    target_table = f"{prefix}{table_name.upper()}"
+    primary_key, indexes = _key_plan(df, keys, options)
+    plan = _storage_plan(df, storage)
+
+    column_lines = "    " + df["COLUMN_NAME"].astype(str) + " " + df["SQL_SERVER_TYPE"].astype(str)
+    not_null = _not_null_mask(df, primary_key, options)
+    column_lines = column_lines.where(~not_null, column_lines + " NOT NULL")
+
+    lines = list(column_lines)
+    if primary_key and not options["indexes_after_load"]:
+        lines.append("    " + _primary_key_clause(target_table, primary_key, plan))
+    if plan["columnstore"]:
+        lines.append(f"    INDEX CCI_{target_table} CLUSTERED COLUMNSTORE")
+    create = f"CREATE TABLE {target_table} (\n" + ",\n".join(lines) + "\n)"
+    if plan["partition_column"]:
+        create += f" ON PS_{target_table} ({plan['partition_column']})"
+    if plan["compression"] and not plan["columnstore"]:
+        create += f" WITH (DATA_COMPRESSION = {plan['compression']})"
+
+    parts = [f"-- {note}" for note in plan["notes"]]
+    if plan["partition_column"]:
+        parts += _partition_statements(target_table, plan)
+    parts.append(create + ";")
+    if not options["indexes_after_load"]:
+        parts += _index_statements(target_table, indexes, plan)
+    if options["comments"]:
+        parts += _comment_statements(target_table, df)
+    return "\n".join(parts)
+
+
+def build_post_load_script(table_name, df, prefix, keys=None, options=None, storage=None):
+    """Primary key and index statements to run once the table is loaded ("" unless indexes_after_load)
+
+    Loading into a heap and building the clustered key and nonclustered indexes
+    afterwards is much faster than maintaining them row by row during a bulk load.
+    """
+    options = ddl_options(options)
+    if df.empty or not options["indexes_after_load"]:
+        return ""
+    target_table = f"{prefix}{table_name.upper()}"
+    primary_key, indexes = _key_plan(df, keys, options)
+    plan = _storage_plan(df, storage)
+    parts = []
+    if primary_key:
+        parts.append(f"ALTER TABLE {target_table} ADD {_primary_key_clause(target_table, primary_key, plan)};")
+    parts += _index_statements(target_table, indexes, plan)
+    return "\n".join(parts)
+
+
+# ---------- Row Width ----------
+
+def sql_type_bytes(sql_type):
+    """Bytes a value of the SQL Server type takes at its declared maximum"""
+    m = _SQL_TYPE.match(str(sql_type).strip().upper())
+    if not m:
+        return UNKNOWN_TYPE_BYTES
+    base, size, _ = m.groups()
+    if size == "MAX" or base in ("XML", "TEXT", "NTEXT", "IMAGE"):
+        return MAX_TYPE_BYTES
+    size = int(size) if size else None
+    if base in FIXED_TYPE_BYTES:
+        return FIXED_TYPE_BYTES[base]
+    if base == "FLOAT":
+        return 4 if size and size <= 24 else 8
+    if base in ("DECIMAL", "NUMERIC"):
+        precision = size or 18
+        return 5 if precision <= 9 else 9 if precision <= 19 else 13 if precision <= 28 else 17
+    if base in ("DATETIME2", "TIME", "DATETIMEOFFSET"):
+        scale = 7 if size is None else size
+        time_bytes = 3 if scale <= 2 else 4 if scale <= 4 else 5
+        return time_bytes + {"DATETIME2": 3, "TIME": 0, "DATETIMEOFFSET": 5}[base]
+    if base in ("CHAR", "BINARY"):
+        return size or 1
+    if base == "NCHAR":
+        return 2 * (size or 1)
+    if base in ("VARCHAR", "VARBINARY"):
+        return (size or 1) + 2
+    if base == "NVARCHAR":
+        return 2 * (size or 1) + 2
+    return UNKNOWN_TYPE_BYTES
+
+
+def column_bytes(sql_types):
+    """sql_type_bytes for a column of SQL Server types (each distinct type parsed once)"""
+    codes, uniques = pd.factorize(sql_types.astype(str))
+    sizes = np.array([sql_type_bytes(t) for t in uniques], dtype=np.int64)
+    return pd.Series(sizes[codes] if len(codes) else [], index=sql_types.index, dtype=np.int64)
+
+
+def compare_row_width(source_df, conv, profile, baseline=None):
+    """Per-column declared bytes of conv next to the same columns mapped with the baseline
+    profile (the default profile); SAVED_BYTES is positive where conv is smaller"""
+    baseline = baseline or get_profile()
+    base_conv = conv if baseline["name"] == profile["name"] else convert_oracle_types(source_df, baseline)
+    report = pd.DataFrame({
+        "COLUMN_NAME": conv["COLUMN_NAME"].to_numpy(dtype=object),
+        "BASELINE_TYPE": base_conv["SQL_SERVER_TYPE"].to_numpy(dtype=object),
+        "SQL_SERVER_TYPE": conv["SQL_SERVER_TYPE"].to_numpy(dtype=object),
+        "BASELINE_BYTES": column_bytes(base_conv["SQL_SERVER_TYPE"]).to_numpy(),
+        "BYTES": column_bytes(conv["SQL_SERVER_TYPE"]).to_numpy(),
+    })
+    report["SAVED_BYTES"] = report["BASELINE_BYTES"] - report["BYTES"]
+    return report
+
+
+def row_width_summary(report):
+    """{ROW_BYTES, BASELINE_ROW_BYTES, ROW_BYTES_SAVED, SAVED_PCT} of a compare_row_width report"""
+    row_bytes = int(report["BYTES"].sum())
+    baseline_bytes = int(report["BASELINE_BYTES"].sum())
+    return {
+        "ROW_BYTES": row_bytes,
+        "BASELINE_ROW_BYTES": baseline_bytes,
+        "ROW_BYTES_SAVED": baseline_bytes - row_bytes,
+        "SAVED_PCT": round((baseline_bytes - row_bytes) / baseline_bytes * 100, 1) if baseline_bytes else 0.0,
+    }
+
+
+# ---------- Schema Diff ----------
+
+# Commented-out ALTER COLUMN statements on key / index columns start with this
+SKIPPED_ALTER_MARKER = "-- SKIPPED: "
+# Default precision SQL Server applies when a type is declared without one
+_DEFAULT_TYPE_ARGS = {"DATETIME2": "(7)", "DATETIMEOFFSET": "(7)", "TIME": "(7)", "FLOAT": "", "REAL": ""}
+
+
+def normalize_sql_type(sql_type):
+    """Canonical spelling of a SQL Server type so generated and existing types compare equal"""
+    t = "".join(str(sql_type).upper().split())
+    t = t.replace("NUMERIC(", "DECIMAL(").replace("(-1)", "(MAX)")
+    if t == "NUMERIC":
+        t = "DECIMAL"
+    if t == "FLOAT(53)":
+        t = "FLOAT"
+    if t in _DEFAULT_TYPE_ARGS:
+        t += _DEFAULT_TYPE_ARGS[t]
+    return t
+
+
+def format_sql_server_type(data_type, char_length=None, numeric_precision=None, numeric_scale=None, datetime_precision=None):
+    """Rebuild a declared type from INFORMATION_SCHEMA.COLUMNS values"""
+    base = str(data_type).upper()
+    if base in ("VARCHAR", "NVARCHAR", "CHAR", "NCHAR", "VARBINARY", "BINARY"):
+        if pd.isna(char_length):
+            return base
+        return f"{base}(MAX)" if int(char_length) == -1 else f"{base}({int(char_length)})"
+    if base in ("DECIMAL", "NUMERIC"):
+        return f"DECIMAL({int(numeric_precision)},{int(numeric_scale)})"
+    if base in ("DATETIME2", "DATETIMEOFFSET", "TIME") and not pd.isna(datetime_precision):
+        return f"{base}({int(datetime_precision)})"
+    return base
+
+
+def _null_clause(not_null):
+    return "NOT NULL" if not_null else "NULL"
+
+
+def diff_columns(conv_df, existing_columns, keys=None, options=None):
+    """Compare converted columns with {COLUMN: (declared type, not null)} of the existing table
+
+    Returns (columns to add, columns to alter, columns only in SQL Server), each a list of tuples.
+    The wanted NOT NULL follows the CREATE script (keys and options as for build_create_table);
+    altered columns also carry their existing NOT NULL and whether they belong to a key or index.
+    """
+    options = ddl_options(options)
+    primary_key, indexes = _key_plan(conv_df, keys, options)
+    key_columns = set(primary_key or []).union(*(columns for _, _, columns in indexes))
+    existing = {name.upper(): column for name, column in existing_columns.items()}
+    names = conv_df["COLUMN_NAME"].astype(str).str.upper()
+    wanted = dict(zip(names, zip(conv_df["SQL_SERVER_TYPE"].astype(str), _not_null_mask(conv_df, primary_key, options))))
+
+    to_add = [(name, sql_type, bool(not_null)) for name, (sql_type, not_null) in wanted.items() if name not in existing]
+    to_alter = [
+        (name, existing[name][0], sql_type, existing[name][1], bool(not_null), name in key_columns)
+        for name, (sql_type, not_null) in wanted.items()
+        if name in existing and normalize_sql_type(existing[name][0]) != normalize_sql_type(sql_type)
+    ]
+    extra = [(name, sql_type) for name, (sql_type, _) in existing.items() if name not in wanted]
+    return to_add, to_alter, extra
+
+
+def build_alter_statements(target_table, conv_df, existing_columns, keys=None, options=None):
+    """ALTER TABLE script bringing an existing table in line with the converted columns ("" if up to date)
+
+    The table may already hold rows, so new columns are added as NULL and altered
+    columns keep their current nullability. Statements that could fail on existing
+    data are written commented out, starting with SKIPPED_ALTER_MARKER: type changes
+    on primary key / index columns and making a column NOT NULL, which needs the
+    column filled first.
+    """
+    to_add, to_alter, extra = diff_columns(conv_df, existing_columns, keys, options)
+    lines = []
+    manual = []
+    if to_add:
+        # A single ADD covers all new columns
+        lines.append(f"ALTER TABLE {target_table} ADD")
+        lines.append(",\n".join(f"    {name} {sql_type} NULL" for name, sql_type, _ in to_add) + ";")
+        manual += [(name, sql_type) for name, sql_type, not_null in to_add if not_null]
+    for name, old_type, new_type, was_not_null, not_null, is_key in to_alter:
+        statement = f"ALTER TABLE {target_table} ALTER COLUMN {name} {new_type} {_null_clause(was_not_null)};"
+        if is_key:
+            lines.append(f"{SKIPPED_ALTER_MARKER}{statement}  -- was {old_type}; part of the primary key or an index, "
+                         "drop and recreate it to change the type")
+            continue
+        lines.append(f"{statement}  -- was {old_type}")
+        if not_null and not was_not_null:
+            manual.append((name, new_type))
+    for name, sql_type in manual:
+        lines.append(f"{SKIPPED_ALTER_MARKER}ALTER TABLE {target_table} ALTER COLUMN {name} {sql_type} NOT NULL;  "
+                     "-- NOT NULL in the docs; fill the column's NULLs first")
+    if lines:
+        for name, sql_type in extra:
+            lines.append(f"-- {name} {sql_type} exists in SQL Server but not in the Oracle docs (left unchanged)")
+    return "\n".join(lines)
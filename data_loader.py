@@ -0,0 +1,411 @@
+"""Copy rows from Oracle or from CSV/Parquet extracts into the generated SQL Server tables.
+
+Rows are read in chunks and coerced to the SQL Server types generated for the
+table (the SQL_SERVER_TYPE column of convert_oracle_types). They are inserted
+with pyodbc fast_executemany, with each parameter's type and size declared
+up front from the same types. Alternatively the rows are written to a UTF-8
+BCP character file plus a format file, for loading with the bcp utility.
+pyodbc, pyarrow (Parquet) and oracledb are imported on first use.
+"""
+import os
+import re
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from decimal import ROUND_HALF_UP, Context, Decimal, InvalidOperation
+
+import numpy as np
+import pandas as pd
+
+from metrics import count, stage
+from sql_deploy import execute_script
+
+# ---------- CONFIGURATION ----------
+LOAD_BATCH_SIZE = 10000      # rows per chunk read and per executemany round trip
+LOAD_MAX_WORKERS = 4         # tables loaded in parallel (never more than the pool size)
+EXTRACT_SUFFIXES = (".parquet", ".csv", ".csv.gz")
+TRUE_VALUES = {"1", "Y", "YES", "T", "TRUE"}
+FALSE_VALUES = {"0", "N", "NO", "F", "FALSE"}
+
+# BCP character format; values containing the field terminator are rejected
+BCP_FIELD_TERMINATOR = "~|~"
+BCP_ROW_TERMINATOR = "~|~\r\n"
+BCP_FORMAT_VERSION = "14.0"
+
+INTEGER_TYPES = {"TINYINT", "SMALLINT", "INT", "BIGINT"}
+DECIMAL_TYPES = {"DECIMAL", "NUMERIC"}
+FLOAT_TYPES = {"FLOAT", "REAL", "MONEY", "SMALLMONEY"}
+DATETIME_TYPES = {"DATETIME", "DATETIME2", "SMALLDATETIME"}
+TEXT_TYPES = {"CHAR", "VARCHAR", "NCHAR", "NVARCHAR", "XML", "TEXT", "NTEXT"}
+BINARY_TYPES = {"BINARY", "VARBINARY", "IMAGE"}
+
+# pyodbc SQL type constant per SQL Server type, declared with setinputsizes
+_ODBC_TYPES = {
+    "TINYINT": "SQL_TINYINT", "SMALLINT": "SQL_SMALLINT", "INT": "SQL_INTEGER", "BIGINT": "SQL_BIGINT",
+    "DECIMAL": "SQL_DECIMAL", "NUMERIC": "SQL_NUMERIC", "FLOAT": "SQL_DOUBLE", "REAL": "SQL_REAL",
+    "MONEY": "SQL_DOUBLE", "SMALLMONEY": "SQL_DOUBLE", "BIT": "SQL_BIT", "DATE": "SQL_TYPE_DATE",
+    "DATETIME": "SQL_TYPE_TIMESTAMP", "DATETIME2": "SQL_TYPE_TIMESTAMP", "SMALLDATETIME": "SQL_TYPE_TIMESTAMP",
+    "DATETIMEOFFSET": "SQL_WVARCHAR", "CHAR": "SQL_CHAR", "VARCHAR": "SQL_VARCHAR", "NCHAR": "SQL_WCHAR",
+    "NVARCHAR": "SQL_WVARCHAR", "XML": "SQL_WVARCHAR", "TEXT": "SQL_VARCHAR", "NTEXT": "SQL_WVARCHAR",
+    "BINARY": "SQL_BINARY", "VARBINARY": "SQL_VARBINARY", "IMAGE": "SQL_VARBINARY",
+}
+_SQL_TYPE = re.compile(r"^(\w+)\s*(?:\(\s*(MAX|\d+)\s*(?:,\s*(\d+)\s*)?\))?")
+_DECIMAL_CONTEXT = Context(prec=38, rounding=ROUND_HALF_UP)  # as SQL Server rounds DECIMAL(38, s)
+
+
+# ---------- Sources ----------
+
+def find_extract(extract_dir, table_name):
+    """Path of <TABLE>.parquet / .csv / .csv.gz in the extract directory (any case), or None"""
+    try:
+        files = {name.lower(): name for name in os.listdir(extract_dir)}
+    except OSError:
+        return None
+    for suffix in EXTRACT_SUFFIXES:
+        name = files.get(f"{table_name.lower()}{suffix}")
+        if name:
+            return os.path.join(extract_dir, name)
+    return None
+
+
+def iter_extract_chunks(path, batch_size=LOAD_BATCH_SIZE):
+    """DataFrames of up to batch_size rows from a Parquet or CSV extract (CSV values as text)"""
+    if path.lower().endswith(".parquet"):
+        import pyarrow.parquet as pq
+
+        for batch in pq.ParquetFile(path).iter_batches(batch_size=batch_size):
+            yield batch.to_pandas()
+    else:
+        # Empty fields are NULL; everything else stays text until coerce_chunk
+        yield from pd.read_csv(path, chunksize=batch_size, dtype=str, keep_default_na=False, na_values=[""])
+
+
+def iter_oracle_chunks(oracle, table_name, columns, batch_size=LOAD_BATCH_SIZE):
+    """DataFrames of up to batch_size rows selected from an Oracle table with python-oracledb
+
+    oracle is {"dsn", "user", "password", optional "schema"}.
+    """
+    import oracledb
+
+    owner = f"{oracle['schema']}." if oracle.get("schema") else ""
+    select = ", ".join(f'"{c.upper()}"' for c in columns)
+    with oracledb.connect(user=oracle["user"], password=oracle["password"], dsn=oracle["dsn"]) as conn:
+        cursor = conn.cursor()
+        cursor.arraysize = batch_size
+        cursor.prefetchrows = batch_size + 1
+        cursor.execute(f"SELECT {select} FROM {owner}{table_name.upper()}")
+        while True:
+            rows = cursor.fetchmany(batch_size)
+            if not rows:
+                break
+            yield pd.DataFrame(rows, columns=columns)
+        cursor.close()
+
+
+def source_chunks(source, table_name, columns, batch_size=LOAD_BATCH_SIZE):
+    """Chunks of the table from source = {"extract_dir": ...} or {"oracle": {...}}"""
+    if source.get("oracle"):
+        return iter_oracle_chunks(source["oracle"], table_name, columns, batch_size)
+    path = find_extract(source["extract_dir"], table_name)
+    if path is None:
+        raise FileNotFoundError(f"No {'/'.join(EXTRACT_SUFFIXES)} extract for {table_name} in {source['extract_dir']}")
+    return iter_extract_chunks(path, batch_size)
+
+
+# ---------- Type Coercion ----------
+
+def load_plan(conv):
+    """[(column, base type, size, scale)] from the generated SQL_SERVER_TYPE of each column (size -1 = MAX)"""
+    plan = []
+    for column, sql_type in zip(conv["COLUMN_NAME"].astype(str), conv["SQL_SERVER_TYPE"].astype(str)):
+        m = _SQL_TYPE.match(sql_type.strip().upper())
+        base, size, scale = (m.group(1), m.group(2), m.group(3)) if m else (sql_type.upper(), None, None)
+        size = -1 if size == "MAX" else int(size) if size else None
+        plan.append((column, base, size, int(scale) if scale else None))
+    return plan
+
+
+def input_sizes(plan):
+    """setinputsizes() argument matching the generated column types"""
+    import pyodbc
+
+    sizes = []
+    for _, base, size, scale in plan:
+        odbc_type = getattr(pyodbc, _ODBC_TYPES.get(base, ""), None)
+        if odbc_type is None:
+            sizes.append(None)
+        elif base in DECIMAL_TYPES:
+            sizes.append((odbc_type, size or 18, scale or 0))
+        elif base in DATETIME_TYPES:
+            fraction = 3 if base == "DATETIME" else 0 if base == "SMALLDATETIME" else 7 if size is None else size
+            sizes.append((odbc_type, 20 + fraction if fraction else 19, fraction))
+        elif base == "DATETIMEOFFSET":
+            sizes.append((odbc_type, 34, 0))
+        elif base in TEXT_TYPES or base in BINARY_TYPES:
+            # 0 binds (MAX) / LOB columns as unbounded
+            sizes.append((odbc_type, 0 if size in (None, -1) or base in ("XML", "TEXT", "NTEXT", "IMAGE") else size, 0))
+        else:
+            sizes.append(odbc_type)
+    return sizes
+
+
+def _present(values):
+    return values.notna() & (values.astype(str).str.strip() != "")
+
+
+def _to_bool(value):
+    text = str(value).strip().upper()
+    return True if text in TRUE_VALUES else False if text in FALSE_VALUES else None
+
+
+def _to_decimal(value, quantum):
+    try:
+        number = Decimal(str(value).strip())
+        return number.quantize(quantum, context=_DECIMAL_CONTEXT) if number.is_finite() else None
+    except InvalidOperation:
+        return None
+
+
+def _to_bytes(value):
+    if isinstance(value, (bytes, bytearray, memoryview)):
+        return bytes(value)
+    text = str(value).strip()
+    try:
+        return bytes.fromhex(text[2:] if text.lower().startswith("0x") else text)
+    except ValueError:
+        return None
+
+
+def coerce_column(values, base, size, scale):
+    """Python values of one column for its SQL Server type; unconvertible values become None"""
+    present = _present(values)
+    if base in INTEGER_TYPES and values.dtype == object:
+        # Parsed from the text so 18-digit IDs never pass through float
+        text = values.astype(str).str.strip()
+        whole = values.notna() & text.str.fullmatch(r"[+-]?\d+(?:\.0*)?")
+        out = pd.Series([int(t.split(".")[0]) if ok else None for t, ok in zip(text, whole)],
+                        index=values.index, dtype=object)
+    elif base in INTEGER_TYPES:
+        numbers = pd.to_numeric(values, errors="coerce")
+        numbers = numbers.where(numbers.isna() | (numbers % 1 == 0))
+        out = numbers.astype("Int64").astype(object)
+    elif base in DECIMAL_TYPES:
+        quantum = Decimal(1).scaleb(-scale) if scale is not None else Decimal(1)
+        out = values.map(lambda v: _to_decimal(v, quantum), na_action="ignore")
+    elif base in FLOAT_TYPES:
+        out = pd.to_numeric(values, errors="coerce").astype(object)
+    elif base == "BIT":
+        out = values.map(_to_bool, na_action="ignore")
+    elif base == "DATE":
+        out = pd.to_datetime(values, errors="coerce").dt.date.astype(object)
+    elif base in DATETIME_TYPES:
+        stamps = pd.to_datetime(values, errors="coerce")
+        if getattr(stamps.dt, "tz", None) is not None:
+            stamps = stamps.dt.tz_localize(None)
+        out = stamps.astype(object)
+    elif base == "DATETIMEOFFSET":
+        out = pd.to_datetime(values, errors="coerce", utc=True).dt.strftime("%Y-%m-%d %H:%M:%S.%f +00:00").astype(object)
+    elif base in BINARY_TYPES:
+        out = values.map(_to_bytes, na_action="ignore")
+    elif base in TEXT_TYPES:
+        out = values.astype(object).where(values.isna(), values.astype(str))
+    else:
+        out = values.astype(object)
+    out = out.where(out.notna(), None).astype(object)
+    nulled = int((present & out.isna()).sum())
+    return out, nulled
+
+
+def coerce_chunk(chunk, plan):
+    """(rows as tuples, values that could not be converted, target columns missing from the source)"""
+    source_columns = {str(c).strip().upper(): c for c in chunk.columns}
+    columns, nulled, missing = [], 0, []
+    for column, base, size, scale in plan:
+        source = source_columns.get(column.upper())
+        if source is None:
+            missing.append(column)
+            columns.append(np.full(len(chunk), None, dtype=object))
+            continue
+        values, bad = coerce_column(chunk[source].reset_index(drop=True), base, size, scale)
+        columns.append(values.to_numpy(dtype=object))
+        nulled += bad
+    return list(zip(*columns)), nulled, missing
+
+
+# ---------- Loading ----------
+
+def _load_result(table_name, target_table, database_name):
+    return {"TABLE_NAME": table_name, "TARGET_TABLE": target_table, "DATABASE": database_name or "",
+            "STATUS": "FAILED", "ROWS": 0, "NULLED": 0, "SECONDS": 0.0, "MESSAGE": ""}
+
+
+def _timed_chunks(chunks, target_table):
+    """Yield the chunks, timing each read as the extract stage"""
+    chunks = iter(chunks)
+    while True:
+        with stage("extract", table=target_table):
+            chunk = next(chunks, None)
+        if chunk is None:
+            return
+        yield chunk
+
+
+def _finish_messages(result, missing):
+    if missing:
+        result["MESSAGE"] += f"Not in source (loaded as NULL): {', '.join(missing)}. "
+    if result["NULLED"]:
+        result["MESSAGE"] += f"{result['NULLED']} value(s) could not be converted and were loaded as NULL. "
+
+
+def load_table(pool, table_name, target_table, conv, chunks, database_name=None, truncate=False, post_load_sql=""):
+    """Insert the chunks into an existing table with fast_executemany, committing each chunk
+
+    Rows committed before a failure stay in the table. post_load_sql (the deferred primary
+    key / indexes) runs once every row is in.
+    """
+    result = _load_result(table_name, target_table, database_name)
+    plan = load_plan(conv)
+    started = time.perf_counter()
+    missing = []
+    try:
+        sizes = input_sizes(plan)
+        insert = (f"INSERT INTO {target_table} ({', '.join(c for c, _, _, _ in plan)}) "
+                  f"VALUES ({', '.join('?' for _ in plan)})")
+        with pool.connection() as conn:
+            cursor = conn.cursor()
+            cursor.fast_executemany = True
+            if truncate:
+                cursor.execute(f"TRUNCATE TABLE {target_table}")
+                conn.commit()
+            for chunk in _timed_chunks(chunks, target_table):
+                rows, nulled, missing = coerce_chunk(chunk, plan)
+                if not rows:
+                    continue
+                with stage("load", table=target_table, rows=len(rows)):
+                    cursor.setinputsizes(sizes)
+                    cursor.executemany(insert, rows)
+                    conn.commit()
+                count("rows_loaded", len(rows))
+                result["ROWS"] += len(rows)
+                result["NULLED"] += nulled
+            cursor.close()
+        result["STATUS"] = "LOADED"
+        if post_load_sql:
+            ok, message = execute_script(pool, post_load_sql)
+            if not ok:
+                result["STATUS"] = "POST_LOAD_FAILED"
+                result["MESSAGE"] += f"Post-load script failed: {message}. "
+    except Exception as e:
+        result["MESSAGE"] += f"{e}. "
+        if result["ROWS"]:
+            result["MESSAGE"] += f"{result['ROWS']} row(s) were committed before the error. "
+    finally:
+        result["SECONDS"] = round(time.perf_counter() - started, 2)
+    _finish_messages(result, missing)
+    result["MESSAGE"] = result["MESSAGE"].strip()
+    return result
+
+
+def _bcp_text(value, base):
+    """A coerced value as BCP character data ("" is NULL)"""
+    if value is None:
+        return ""
+    if base == "DATETIME":
+        return value.strftime("%Y-%m-%d %H:%M:%S.%f")[:-3]
+    if base in DATETIME_TYPES:
+        return value.strftime("%Y-%m-%d %H:%M:%S.%f")
+    if base == "BIT":
+        return "1" if value else "0"
+    if isinstance(value, bytes):
+        return value.hex()
+    if isinstance(value, float):
+        return repr(value)
+    return str(value)
+
+
+def bcp_format_file(plan):
+    """Non-XML bcp format file: every column as UTF-8 text ending in the BCP terminators"""
+    lines = [BCP_FORMAT_VERSION, str(len(plan))]
+    for idx, (column, _, _, _) in enumerate(plan, start=1):
+        terminator = BCP_ROW_TERMINATOR if idx == len(plan) else BCP_FIELD_TERMINATOR
+        escaped = terminator.replace("\r", "\\r").replace("\n", "\\n")
+        lines.append(f'{idx}\tSQLCHAR\t0\t0\t"{escaped}"\t{idx}\t{column}\t""')
+    return "\n".join(lines) + "\n"
+
+
+def write_bcp_files(table_name, target_table, conv, chunks, out_dir, database_name=None, server=None,
+                    batch_size=LOAD_BATCH_SIZE, username=None):
+    """Write <TARGET>.dat and <TARGET>.fmt for `bcp ... in`; the result's BCP_COMMAND loads them
+
+    The command logs in with SQL Server authentication like the rest of the tool;
+    the password is left as a <password> placeholder.
+    """
+    result = _load_result(table_name, target_table, database_name)
+    plan = load_plan(conv)
+    bases = [base for _, base, _, _ in plan]
+    started = time.perf_counter()
+    missing = []
+    os.makedirs(out_dir, exist_ok=True)
+    data_path = os.path.join(out_dir, f"{target_table}.dat")
+    format_path = os.path.join(out_dir, f"{target_table}.fmt")
+    try:
+        with open(format_path, "w", encoding="utf-8", newline="") as f:
+            f.write(bcp_format_file(plan))
+        with open(data_path, "w", encoding="utf-8", newline="") as f:
+            for chunk in _timed_chunks(chunks, target_table):
+                rows, nulled, missing = coerce_chunk(chunk, plan)
+                with stage("load", table=target_table, rows=len(rows), method="bcp"):
+                    for row in rows:
+                        fields = [_bcp_text(v, base) for v, base in zip(row, bases)]
+                        if any(BCP_FIELD_TERMINATOR in field for field in fields):
+                            raise ValueError(f"A value contains the BCP field terminator {BCP_FIELD_TERMINATOR!r}")
+                        f.write(BCP_FIELD_TERMINATOR.join(fields) + BCP_ROW_TERMINATOR)
+                count("rows_loaded", len(rows))
+                result["ROWS"] += len(rows)
+                result["NULLED"] += nulled
+        result["STATUS"] = "WRITTEN"
+        result["BCP_COMMAND"] = (
+            f'bcp {target_table} in "{data_path}" -f "{format_path}" -S {server or "<server>"} '
+            f'-d {database_name or "<database>"} -U {username or "<user>"} -P <password> -C 65001 '
+            f'-b {batch_size} -h "TABLOCK"'
+        )
+    except Exception as e:
+        result["MESSAGE"] += f"{e}. "
+    finally:
+        result["SECONDS"] = round(time.perf_counter() - started, 2)
+    _finish_messages(result, missing)
+    result["MESSAGE"] = result["MESSAGE"].strip()
+    return result
+
+
+def load_tables(pool, jobs, source, database_name=None, batch_size=LOAD_BATCH_SIZE, max_workers=LOAD_MAX_WORKERS,
+                truncate=False, run_post_load=True, bcp_dir=None, server=None, username=None):
+    """Load every generated table (batch result rows with STATUS OK) from the source, tables in parallel
+
+    With bcp_dir, BCP data and format files are written there instead of inserting
+    (server and username only go into the printed bcp commands).
+    Returns one result row per table, like the other bulk SQL Server steps.
+    """
+    jobs = [job for job in jobs if job["STATUS"] == "OK"]
+
+    def run(job):
+        conv = job["CONVERTED"]
+        try:
+            chunks = source_chunks(source, job["TABLE_NAME"], list(conv["COLUMN_NAME"].astype(str)), batch_size)
+        except (OSError, ImportError) as e:
+            result = _load_result(job["TABLE_NAME"], job["TARGET_TABLE"], database_name)
+            result["MESSAGE"] = str(e)
+            return result
+        if bcp_dir:
+            return write_bcp_files(job["TABLE_NAME"], job["TARGET_TABLE"], conv, chunks, bcp_dir,
+                                   database_name, server, batch_size, username)
+        return load_table(pool, job["TABLE_NAME"], job["TARGET_TABLE"], conv, chunks, database_name, truncate,
+                          job.get("POST_LOAD_SQL", "") if run_post_load else "")
+
+    # Each worker holds one pooled connection for its whole table
+    workers = max(1, min(max_workers, len(jobs) or 1, pool.max_size if pool is not None else max_workers))
+    results = []
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        futures = [executor.submit(run, job) for job in jobs]
+        for future in as_completed(futures):
+            results.append(future.result())
+    return results
@@ -0,0 +1,202 @@
+"""Local SQLite cache of resolved doc URLs and scraped column tables.
+
+Entries are keyed by table name and Oracle Cloud release and are evicted
+least-recently-used beyond CACHE_MAX_ENTRIES. An entry is served directly for
+CACHE_TTL_DAYS; after that it is stale and is revalidated with its page's
+ETag / Last-Modified (a 304 answer keeps it) until CACHE_KEEP_DAYS.
+"""
+import re
+import sqlite3
+import time
+from io import StringIO
+
+import pandas as pd
+
+from metrics import count, timed
+
+# ---------- CONFIGURATION ----------
+CACHE_FILE = "doc_cache.sqlite"
+CACHE_TTL_DAYS = 30
+CACHE_KEEP_DAYS = 365
+CACHE_MAX_ENTRIES = 5000
+
+
+def _cache_connect(cache_file=CACHE_FILE):
+    """Open the cache database, creating the tables on first use"""
+    conn = sqlite3.connect(cache_file, timeout=30)
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS doc_cache (
+            table_name TEXT NOT NULL,
+            release TEXT NOT NULL,
+            url TEXT NOT NULL,
+            columns_json TEXT,
+            fetched_at REAL NOT NULL,
+            last_used_at REAL NOT NULL,
+            etag TEXT,
+            last_modified TEXT,
+            keys_json TEXT,
+            confidence REAL,
+            PRIMARY KEY (table_name, release)
+        )
+    """)
+    # Caches created before revalidation / key extraction / URL scoring was added lack these columns
+    existing = {row[1] for row in conn.execute("PRAGMA table_info(doc_cache)")}
+    for column, sql_type in (("etag", "TEXT"), ("last_modified", "TEXT"), ("keys_json", "TEXT"), ("confidence", "REAL")):
+        if column not in existing:
+            conn.execute(f"ALTER TABLE doc_cache ADD COLUMN {column} {sql_type}")
+    conn.execute("CREATE TABLE IF NOT EXISTS cache_stats (name TEXT PRIMARY KEY, value INTEGER NOT NULL)")
+    return conn
+
+
+def get_release_from_url(url):
+    """Extract the Oracle Cloud release (e.g. 25A) from a docs.oracle.com URL"""
+    m = re.search(r"/(\d{2}[a-d])/", url.lower())
+    return m.group(1).upper() if m else "UNKNOWN"
+
+
+def cache_get(table_name, release=None, cache_file=CACHE_FILE):
+    """Return (url, columns DataFrame or None) for a fresh cached table, or None on a miss"""
+    entry = cache_get_entry(table_name, release, cache_file)
+    if not entry or entry["stale"]:
+        return None
+    return entry["url"], entry["columns"]
+
+
+# Its own stage: every probe is timed, including misses and stale entries that do not answer the lookup
+@timed("cache_read")
+def cache_get_entry(table_name, release=None, cache_file=CACHE_FILE):
+    """Cached entry as a dict (url, columns, keys, etag, last_modified, confidence, stale), or None on a miss
+
+    Stale entries are returned too so the caller can revalidate them. keys is None for
+    entries cached before primary keys and indexes were extracted, confidence for
+    entries cached before URL candidates were scored.
+    """
+    try:
+        conn = _cache_connect(cache_file)
+        with conn:
+            # Drop entries too old to be worth revalidating
+            conn.execute("DELETE FROM doc_cache WHERE fetched_at < ?", (time.time() - CACHE_KEEP_DAYS * 86400,))
+
+            # Without an explicit release, use the most recently fetched one
+            columns = "release, url, columns_json, fetched_at, etag, last_modified, keys_json, confidence"
+            if release:
+                row = conn.execute(
+                    f"SELECT {columns} FROM doc_cache WHERE table_name = ? AND release = ?",
+                    (table_name.upper(), release.upper())
+                ).fetchone()
+            else:
+                row = conn.execute(
+                    f"SELECT {columns} FROM doc_cache WHERE table_name = ? ORDER BY fetched_at DESC LIMIT 1",
+                    (table_name.upper(),)
+                ).fetchone()
+
+            stale = bool(row) and row[3] < time.time() - CACHE_TTL_DAYS * 86400
+            counter = "hits" if row and not stale else "misses"
+            count(f"cache_{counter}")
+            conn.execute(
+                "INSERT INTO cache_stats (name, value) VALUES (?, 1) ON CONFLICT(name) DO UPDATE SET value = value + 1",
+                (counter,)
+            )
+            if row:
+                conn.execute(
+                    "UPDATE doc_cache SET last_used_at = ? WHERE table_name = ? AND release = ?",
+                    (time.time(), table_name.upper(), row[0])
+                )
+        conn.close()
+
+        if not row:
+            return None
+        return {
+            "url": row[1],
+            "columns": pd.read_json(StringIO(row[2]), orient="table") if row[2] else None,
+            "keys": pd.read_json(StringIO(row[6]), orient="table") if row[6] else None,
+            "etag": row[4],
+            "last_modified": row[5],
+            "confidence": row[7],
+            "stale": stale,
+        }
+    except Exception:
+        return None
+
+
+def cache_contains(table_name, cache_file=CACHE_FILE):
+    """True if any entry (fresh or stale) exists for the table; does not touch the hit/miss counters"""
+    try:
+        conn = _cache_connect(cache_file)
+        row = conn.execute("SELECT 1 FROM doc_cache WHERE table_name = ? LIMIT 1", (table_name.upper(),)).fetchone()
+        conn.close()
+        return row is not None
+    except Exception:
+        return False
+
+
+def cache_put(table_name, url, columns_df=None, etag=None, last_modified=None, keys_df=None, confidence=None,
+              cache_file=CACHE_FILE):
+    """Store a resolved URL (with its confidence, scraped columns and keys tables) and evict least recently used entries"""
+    try:
+        columns_json = columns_df.to_json(orient="table", index=False) if columns_df is not None and not columns_df.empty else None
+        keys_json = keys_df.to_json(orient="table", index=False) if keys_df is not None and columns_json else None
+        now = time.time()
+        conn = _cache_connect(cache_file)
+        with conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO doc_cache (table_name, release, url, columns_json, fetched_at, last_used_at, etag, last_modified, keys_json, confidence) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (table_name.upper(), get_release_from_url(url), url, columns_json, now, now, etag, last_modified, keys_json,
+                 confidence)
+            )
+            conn.execute(
+                "DELETE FROM doc_cache WHERE rowid NOT IN (SELECT rowid FROM doc_cache ORDER BY last_used_at DESC LIMIT ?)",
+                (CACHE_MAX_ENTRIES,)
+            )
+        conn.close()
+    except Exception:
+        pass
+
+
+def cache_touch(table_name, url, cache_file=CACHE_FILE):
+    """Mark an entry as fresh again after the server answered 304 Not Modified"""
+    try:
+        now = time.time()
+        conn = _cache_connect(cache_file)
+        with conn:
+            conn.execute(
+                "UPDATE doc_cache SET fetched_at = ?, last_used_at = ? WHERE table_name = ? AND release = ?",
+                (now, now, table_name.upper(), get_release_from_url(url))
+            )
+        conn.close()
+    except Exception:
+        pass
+
+
+def cached_table_names(cache_file=CACHE_FILE):
+    """Names of all cached tables (any release, fresh or stale)"""
+    try:
+        conn = _cache_connect(cache_file)
+        names = [row[0] for row in conn.execute("SELECT DISTINCT table_name FROM doc_cache")]
+        conn.close()
+        return names
+    except Exception:
+        return []
+
+
+def get_cache_stats(cache_file=CACHE_FILE):
+    """Return hit/miss counters and the number of cached tables"""
+    try:
+        conn = _cache_connect(cache_file)
+        stats = dict(conn.execute("SELECT name, value FROM cache_stats").fetchall())
+        entries = conn.execute("SELECT COUNT(*) FROM doc_cache").fetchone()[0]
+        conn.close()
+        return stats.get("hits", 0), stats.get("misses", 0), entries
+    except Exception:
+        return 0, 0, 0
+
+
+def clear_cache(cache_file=CACHE_FILE):
+    """Remove all cached entries and reset the counters"""
+    conn = _cache_connect(cache_file)
+    with conn:
+        conn.execute("DELETE FROM doc_cache")
+        conn.execute("DELETE FROM cache_stats")
+    conn.close()
@@ -0,0 +1,623 @@
+"""Find the Oracle Cloud documentation page for a table and extract its columns table.
+
+No Streamlit here: functions return values or raise, and callers decide how to
+report problems. googleapiclient is imported only when the Custom Search API
+is actually used.
+"""
+import asyncio
+import logging
+import re
+import threading
+import time
+from collections import OrderedDict
+from contextlib import nullcontext
+from urllib.parse import urlparse
+
+import numpy as np
+import pandas as pd
+import requests
+from bs4 import BeautifulSoup
+from lxml import etree
+
+from doc_cache import get_release_from_url
+from http_client import conditional_headers, http_get, rate_limiter
+from metrics import count, stage, timed
+from quota import reserve_quota
+
+logger = logging.getLogger(__name__)
+_cse_services = threading.local()
+_page_memo = OrderedDict()
+_page_memo_lock = threading.Lock()
+
+# ---------- CONFIGURATION ----------
+DEFAULT_SEARCH_DOMAIN = "docs.oracle.com/en/cloud/saas/"
+
+# Custom Search lookup stage: table names combined into one OR query, and queries in flight
+API_GROUP_SIZE = 5
+API_MAX_CONCURRENCY = 4
+
+SKIPPED_EXTENSIONS = [".xlsx", ".pdf", ".zip", ".xml"]
+
+# Candidate ranking: points for how well a search result names the table; ties go to the newest release
+SCORE_EXACT_SLUG = 100      # the page's file name is the table name (apinvoicesall-2435.html)
+SCORE_TITLE = 50            # the result title names the table, not a longer name starting with it
+SCORE_URL_CONTAINS = 20     # the table name appears in the URL, possibly as part of a similar name
+SCORE_TABLES_GUIDE = 10     # the page is in a Tables and Views guide (/oedmf/, /oedmp/, ...)
+SCORE_OTHER_PAGE = -60      # overview / introduction style pages
+OTHER_PAGE_WORDS = ("overview", "introduction", "preface", "index", "toc")
+TABLES_GUIDE_PATTERN = re.compile(r"/oedm[a-z]/")
+SLUG_PATTERN = re.compile(r"([^/]+?)(?:-\d+)?\.html?$")
+RELEASE_PATTERN = re.compile(r"/(\d{2})([a-d])/")
+
+# Confidence recorded for a resolved URL; below CONFIDENCE_EXACT the top candidates are verified
+CONFIDENCE_INDEXED = 1.0    # from the offline index: the page itself names the table
+CONFIDENCE_EXACT = 0.95     # file name is the table name
+CONFIDENCE_VERIFIED = 0.9   # page title checked with a partial GET
+CONFIDENCE_TITLE = 0.75
+CONFIDENCE_URL = 0.5
+CONFIDENCE_GUESS = 0.2      # best remaining candidate; nothing names the table
+CONFIDENCE_REJECTED = 0.1   # its page title names something else
+VERIFY_BYTES = 16 * 1024    # start of the page read to find <title> / <h1>
+VERIFY_MAX_CANDIDATES = 3
+VERIFY_TIMEOUT = 5
+
+# Doc pages are streamed in chunks of this size while looking for the schema tables
+PAGE_CHUNK_SIZE = 64 * 1024
+# Parsed schema tables of recently fetched pages, by URL and ETag / Last-Modified (most recent kept)
+PAGE_MEMO_MAX_ENTRIES = 128
+# Primary key and indexes of a page: one row per key (TYPE PRIMARY / UNIQUE / NONUNIQUE), COLUMNS comma separated
+KEY_COLUMNS = ["NAME", "TYPE", "COLUMNS"]
+WHITESPACE = re.compile(r"\s+")
+
+
+# ---------- URL Lookup ----------
+
+def url_matches_table(table_name, url):
+    """True if the table name appears in the URL, ignoring '_' and '-'"""
+    table_name_clean = table_name.lower().replace("_", "")
+    return table_name_clean in url.lower().replace("-", "").replace("_", "")
+
+
+def _compact(text):
+    """Lower case without '_' and '-', for comparing table names with URL slugs"""
+    return text.lower().replace("_", "").replace("-", "")
+
+
+def _slug_matches_table(table_name, url):
+    """True if the page's file name (less any numeric page id suffix) is exactly the table name"""
+    m = SLUG_PATTERN.search(urlparse(url).path.lower())
+    return bool(m) and _compact(m.group(1)) == _compact(table_name)
+
+
+def _release_key(url):
+    """Sortable (year, letter) of the release in a URL, (0, '') if it has none"""
+    m = RELEASE_PATTERN.search(url.lower())
+    return (int(m.group(1)), m.group(2)) if m else (0, "")
+
+
+def score_doc_url(table_name, url, title=""):
+    """Ranking points of one search result (see the SCORE_* settings)"""
+    score = 0
+    if _slug_matches_table(table_name, url):
+        score += SCORE_EXACT_SLUG
+    elif url_matches_table(table_name, url):
+        score += SCORE_URL_CONTAINS
+    if title and _title_matches_table(table_name, title):
+        score += SCORE_TITLE
+    path = urlparse(url).path.lower()
+    if TABLES_GUIDE_PATTERN.search(path):
+        score += SCORE_TABLES_GUIDE
+    if any(word in path.rsplit("/", 1)[-1] for word in OTHER_PAGE_WORDS):
+        score += SCORE_OTHER_PAGE
+    return score
+
+
+def rank_doc_urls(table_name, candidates):
+    """(url, title) search results as dicts (url, title, score, release), best first, duplicates dropped"""
+    ranked = {}
+    for url, title in candidates:
+        if url not in ranked:
+            ranked[url] = {"url": url, "title": title, "score": score_doc_url(table_name, url, title),
+                           "release": get_release_from_url(url)}
+    return sorted(ranked.values(), key=lambda c: (c["score"], _release_key(c["url"])), reverse=True)
+
+
+def url_confidence(table_name, url, title="", verified=None):
+    """Confidence (0-1) that url is the table's own page (see the CONFIDENCE_* settings)"""
+    if verified is False:
+        return CONFIDENCE_REJECTED
+    if _slug_matches_table(table_name, url):
+        return CONFIDENCE_EXACT
+    if verified:
+        return CONFIDENCE_VERIFIED
+    if title and _title_matches_table(table_name, title):
+        return CONFIDENCE_TITLE
+    if url_matches_table(table_name, url):
+        return CONFIDENCE_URL
+    return CONFIDENCE_GUESS
+
+
+def verify_doc_url(table_name, url, timeout=VERIFY_TIMEOUT, host_limit=None):
+    """Read only the start of a page (Range request) and check its <title> / <h1> names the table
+
+    Returns True or False, or None when the page could not be read or has no title
+    in its first VERIFY_BYTES. host_limit (a semaphore) is held during the request.
+    """
+    head = b""
+    # A compressed body cut off by the range cannot be decoded, so ask for it uncompressed
+    headers = {"Range": f"bytes=0-{VERIFY_BYTES - 1}", "Accept-Encoding": "identity"}
+    try:
+        with host_limit or nullcontext(), http_get(url, headers=headers, timeout=timeout, stream=True,
+                                                   retries=0) as res:
+            if res.status_code not in (200, 206):
+                return None
+            encoding = res.encoding or "utf-8"
+            # Servers that ignore Range send the whole page; stop reading once the heading is in
+            for chunk in res.iter_content(4096):
+                head += chunk
+                if len(head) >= VERIFY_BYTES or b"</h1>" in head.lower():
+                    break
+    except requests.RequestException:
+        return None
+    count("url_verifications")
+    count("bytes_downloaded", len(head))
+    text = head[:VERIFY_BYTES].decode(encoding, errors="replace")
+    titles = [BeautifulSoup(t, "html.parser").get_text(" ") for t in
+              re.findall(r"<(?:title|h1)[^>]*>(.*?)</(?:title|h1)>", text, re.IGNORECASE | re.DOTALL)]
+    if not titles:
+        return None
+    return any(_title_matches_table(table_name, t) for t in titles)
+
+
+def pick_doc_url(table_name, candidates, verify=True, host_limit=None):
+    """Best page among (url, title) search results as a dict (url, confidence, verified), or None
+
+    A top candidate whose file name is the table name is taken as is. Otherwise the
+    first VERIFY_MAX_CANDIDATES are checked in rank order with verify_doc_url and the
+    first one titled with the table name wins; failing that the top candidate is
+    returned with its (lower) confidence. host_limit bounds the verification requests.
+    """
+    ranked = rank_doc_urls(table_name, candidates)
+    if not ranked:
+        return None
+    best = ranked[0]
+    match = {"url": best["url"], "confidence": url_confidence(table_name, best["url"], best["title"]), "verified": None}
+    if not verify or match["confidence"] >= CONFIDENCE_EXACT:
+        return match
+    for candidate in ranked[:VERIFY_MAX_CANDIDATES]:
+        verified = verify_doc_url(table_name, candidate["url"], host_limit=host_limit)
+        if verified:
+            return {"url": candidate["url"], "confidence": CONFIDENCE_VERIFIED, "verified": True}
+        if candidate is best and verified is False:
+            match.update(confidence=CONFIDENCE_REJECTED, verified=False)
+    return match
+
+
+@timed("lookup", method="google_scrape")
+def search_doc_page_scrape(table_name, timeout=10, verify=True, host_limit=None):
+    """Find the doc page by scraping Google's HTML results; pick_doc_url dict or None (raises on network errors)"""
+    # Try exact table name first, only HTML pages
+    q = f'"{table_name}" site:{DEFAULT_SEARCH_DOMAIN} filetype:html'
+    res = http_get("https://www.google.com/search", params={"q": q}, timeout=timeout)
+    soup = BeautifulSoup(res.text, "html.parser")
+
+    # Collect every doc link with its result title, then rank them all
+    candidates = []
+    for a in soup.select("a"):
+        href = a.get("href", "")
+        if DEFAULT_SEARCH_DOMAIN in href and ".html" in href:
+            m = re.search(r"https://docs\.oracle\.com[^&]+\.html", href)
+            if m:
+                url = m.group(0)
+                # Skip Excel, PDF, and other non-HTML files
+                if any(ext in url.lower() for ext in SKIPPED_EXTENSIONS):
+                    continue
+                # Skip index and overview pages
+                if any(skip in url.lower() for skip in ['index.html', 'toc.html', 'preface']):
+                    continue
+                candidates.append((url, a.get_text(" ", strip=True)))
+
+    return pick_doc_url(table_name, candidates, verify, host_limit)
+
+
+def search_doc_url_scrape(table_name, timeout=10):
+    """URL of the best doc page found by scraping Google's HTML results, or None"""
+    match = search_doc_page_scrape(table_name, timeout)
+    return match["url"] if match else None
+
+
+def get_cse_service(api_key):
+    """Custom Search service, built once per thread and API key
+
+    googleapiclient service objects share an httplib2 connection that is not
+    thread-safe, so each worker thread keeps its own.
+    """
+    services = getattr(_cse_services, "by_key", None)
+    if services is None:
+        services = _cse_services.by_key = {}
+    if api_key not in services:
+        from googleapiclient.discovery import build
+
+        services[api_key] = build("customsearch", "v1", developerKey=api_key)
+    return services[api_key]
+
+
+def _title_matches_table(table_name, title):
+    """True if the result title names the table (not a longer name that starts with it)"""
+    return re.search(rf"(?<![A-Z0-9_$#]){re.escape(table_name.upper())}(?![A-Z0-9_$#])", title.upper()) is not None
+
+
+@timed("lookup", method="custom_search")
+def search_doc_pages_api(table_names, api_key, cse_id, verify=True, host_limit=None):
+    """Look several tables up with one Custom Search OR query (raises googleapiclient HttpError)
+
+    Each table takes its best ranked result that names it (by file name, URL or title)
+    and that no better-matching table has claimed. Returns {table: pick_doc_url dict}
+    for the tables that were recognised; a single-table query falls back to the best
+    ranked result, as the per-table search always did.
+    """
+    # Search for the exact phrases, only HTML files
+    terms = " OR ".join(f'"{name}"' for name in table_names)
+    query = f'{terms} site:{DEFAULT_SEARCH_DOMAIN} filetype:html'
+    rate_limiter.wait("www.googleapis.com")
+    count("cse_queries")
+    res = get_cse_service(api_key).cse().list(q=query, cx=cse_id, num=10).execute()
+
+    # Filter and prioritize results
+    candidates = []
+    for item in res.get("items", []):
+        link = item.get("link", "")
+
+        # Must be from Oracle docs and HTML
+        if DEFAULT_SEARCH_DOMAIN not in link or not link.endswith(".html"):
+            continue
+        # Skip Excel, PDF, and other non-HTML files
+        if any(ext in link.lower() for ext in SKIPPED_EXTENSIONS):
+            continue
+        # Skip index and overview pages
+        if any(skip in link.lower() for skip in ['index.html', 'toc.html', 'preface', 'overview']):
+            continue
+        candidates.append((link, item.get("title", "")))
+
+    # Strongest (table, page) pairs first; each result page goes to at most one table
+    pairs = []
+    for name in table_names:
+        for candidate in rank_doc_urls(name, candidates):
+            if candidate["score"] >= SCORE_URL_CONTAINS or len(table_names) == 1:
+                pairs.append((candidate["score"], _release_key(candidate["url"]), name, candidate["url"], candidate["title"]))
+    pairs.sort(key=lambda p: (p[0], p[1]), reverse=True)
+    claimed = {}
+    for _, _, name, link, title in pairs:
+        if name not in claimed and link not in {c[0] for c in claimed.values()}:
+            claimed[name] = (link, title)
+    # Verification may still fall through to a lower ranked page, but never to another table's
+    taken = {link for link, _ in claimed.values()}
+    return {name: pick_doc_url(name, [c for c in candidates if c[0] == claimed[name][0] or c[0] not in taken], verify,
+                               host_limit)
+            for name in claimed}
+
+
+def search_doc_urls_api(table_names, api_key, cse_id):
+    """{table: url} for several tables from one Custom Search OR query (see search_doc_pages_api)"""
+    return {name: match["url"] for name, match in search_doc_pages_api(table_names, api_key, cse_id).items()}
+
+
+def search_doc_page_api(table_name, api_key, cse_id, host_limit=None):
+    """Find the doc page with the Google Custom Search API; pick_doc_url dict or None (raises googleapiclient HttpError)"""
+    return search_doc_pages_api([table_name], api_key, cse_id, host_limit=host_limit).get(table_name)
+
+
+def search_doc_url_api(table_name, api_key, cse_id):
+    """Find the doc page with the Google Custom Search API (raises googleapiclient HttpError)"""
+    match = search_doc_page_api(table_name, api_key, cse_id)
+    return match["url"] if match else None
+
+
+class DocUrlResolver:
+    """Async Custom Search lookup stage for many tables
+
+    Tables are grouped up to group_size per OR query, so one unit of the daily quota
+    can resolve several tables, and a table requested again while its query is still
+    in flight waits for that query instead of starting another. reserve() is called
+    once per query and returns whether a quota unit is available. host_limit bounds
+    the requests that verify the picked pages.
+    """
+
+    def __init__(self, api_key, cse_id, group_size=API_GROUP_SIZE, max_concurrency=API_MAX_CONCURRENCY,
+                 reserve=lambda: reserve_quota(1) == 1, host_limit=None):
+        self.api_key = api_key
+        self.cse_id = cse_id
+        self.host_limit = host_limit
+        self.group_size = group_size
+        self.max_concurrency = max_concurrency
+        self.reserve = reserve
+        self.queries = 0
+        self._inflight = {}
+        self._semaphore = None
+
+    async def resolve_many(self, table_names):
+        """{table: (pick_doc_url dict or None, error message)} for the given tables"""
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(self.max_concurrency)
+        loop = asyncio.get_running_loop()
+        names = list(dict.fromkeys(name.upper() for name in table_names))
+
+        new = [name for name in names if name not in self._inflight]
+        for name in new:
+            self._inflight[name] = loop.create_future()
+        futures = [self._inflight[name] for name in names]
+        tasks = [asyncio.create_task(self._run_group(new[i:i + self.group_size]))
+                 for i in range(0, len(new), self.group_size)]
+
+        results = await asyncio.gather(*futures)
+        await asyncio.gather(*tasks)
+        return dict(zip(names, results))
+
+    async def resolve(self, table_name):
+        """(pick_doc_url dict or None, error message) for one table"""
+        return (await self.resolve_many([table_name]))[table_name.upper()]
+
+    async def _run_group(self, group):
+        try:
+            async with self._semaphore:
+                if self.reserve():
+                    self.queries += 1
+                    found = await asyncio.to_thread(search_doc_pages_api, group, self.api_key, self.cse_id,
+                                                    host_limit=self.host_limit)
+                    outcome = {name: (found.get(name), "") for name in group}
+                else:
+                    # Quota used up: leave these tables to the HTML scraping fallback
+                    outcome = {name: (None, "") for name in group}
+        except Exception as e:
+            outcome = {name: (None, f"Google API search failed: {e}") for name in group}
+        for name in group:
+            self._inflight.pop(name).set_result(outcome[name])
+
+
+# ---------- Column Extraction ----------
+
+def _cell_text(cell):
+    """Cell text with runs of whitespace collapsed to one space"""
+    return WHITESPACE.sub(" ", "".join(cell.itertext())).strip()
+
+
+def _table_rows(table):
+    """(cell texts, is header row) for the rows of this table (not nested ones), colspan cells repeated"""
+    rows = []
+    for tr in table.xpath("./tr|./thead/tr|./tbody/tr|./tfoot/tr"):
+        cells = tr.xpath("./th|./td")
+        texts = []
+        for cell in cells:
+            span = cell.get("colspan", "1")
+            texts.extend([_cell_text(cell)] * (int(span) if span.isdigit() and int(span) > 0 else 1))
+        is_header = tr.getparent().tag == "thead" or (bool(cells) and all(c.tag == "th" for c in cells))
+        rows.append((texts, is_header))
+    return rows
+
+
+def _rows_to_frame(rows):
+    """DataFrame from (cells, is_header) rows, with blank cells as NaN and numeric columns inferred"""
+    header = None
+    body = []
+    for cells, is_header in rows:
+        if is_header and not body:
+            header = cells
+        else:
+            body.append(cells)
+    width = len(header) if header else max((len(r) for r in body), default=0)
+    body = [(r + [""] * width)[:width] for r in body]
+    df = pd.DataFrame(body, columns=header if header else range(width), dtype=object)
+    df = df.replace("", np.nan)
+    for pos in range(width):
+        col = df.iloc[:, pos]
+        numeric = pd.to_numeric(col, errors="coerce")
+        if numeric.notna().sum() == col.notna().sum():
+            df.isetitem(pos, numeric)
+    return df
+
+
+def _closed_tables(parser, chunks):
+    """Feed chunks to the pull parser and yield each <table> element as soon as it is closed"""
+    for chunk in chunks:
+        parser.feed(chunk)
+        for _, table in parser.read_events():
+            yield table
+    try:
+        parser.close()
+    except etree.LxmlError:
+        return  # empty or unparseable page
+    for _, table in parser.read_events():
+        yield table
+
+
+def _table_kind(headers):
+    """Which schema table these headers belong to: columns, primary_key, indexes or None"""
+    if "NAME" in headers and "DATATYPE" in headers:
+        return "columns"
+    if "INDEX" in headers and "COLUMNS" in headers:
+        return "indexes"
+    if "NAME" in headers and "COLUMNS" in headers:
+        return "primary_key"
+    return None
+
+
+def _key_columns(value):
+    """'COL_A, COL_B' (or one per line) → 'COL_A, COL_B'"""
+    return ", ".join(c.upper() for c in re.split(r"[,\s]+", str(value)) if c and c.upper() != "NAN")
+
+
+def _keys_frame(primary_key, indexes):
+    """Primary key and index tables of a page as one DataFrame of KEY_COLUMNS"""
+    rows = []
+    if primary_key is not None:
+        pk = primary_key.rename(columns=lambda c: str(c).strip().upper())
+        for name, columns in zip(pk["NAME"], pk["COLUMNS"]):
+            if _key_columns(columns):
+                rows.append((str(name).strip(), "PRIMARY", _key_columns(columns)))
+    if indexes is not None:
+        idx = indexes.rename(columns=lambda c: str(c).strip().upper())
+        uniqueness = idx["UNIQUENESS"] if "UNIQUENESS" in idx.columns else pd.Series("", index=idx.index)
+        for name, unique, columns in zip(idx["INDEX"], uniqueness, idx["COLUMNS"]):
+            if _key_columns(columns):
+                kind = "UNIQUE" if str(unique).strip().upper() == "UNIQUE" else "NONUNIQUE"
+                rows.append((str(name).strip(), kind, _key_columns(columns)))
+    return pd.DataFrame(rows, columns=KEY_COLUMNS)
+
+
+def find_schema_tables(source, encoding=None, keys=True):
+    """Locate the Columns table and, with keys, the Primary Key and Indexes tables in one pass
+
+    source is the HTML (str or bytes) or an iterable of byte chunks. Parsing stops as
+    soon as every wanted table has been read, so without keys the rest of the page
+    after the Columns table is never read. Returns a dict with columns (DataFrame or
+    None), keys (DataFrame of KEY_COLUMNS, None without keys or columns) and inspected
+    (headers of each table checked).
+    """
+    if isinstance(source, str):
+        source, encoding = [source.encode("utf-8")], "utf-8"
+    elif isinstance(source, bytes):
+        source = [source]
+    parser = etree.HTMLPullParser(events=("end",), tag="table", encoding=encoding)
+
+    wanted = ("columns", "primary_key", "indexes") if keys else ("columns",)
+    found = {}
+    inspected = []
+    for table in _closed_tables(parser, source):
+        headers = [_cell_text(th).upper() for th in table.iter("th")]
+        inspected.append(headers)
+        kind = _table_kind(headers)
+        if kind in wanted and kind not in found:
+            try:
+                found[kind] = _rows_to_frame(_table_rows(table))
+            except Exception as e:
+                logger.debug("Could not parse table %d: %s", len(inspected), e)
+        # Drop tables we are done with so long pages stay small in memory
+        table.clear(keep_tail=True)
+        if all(k in found for k in wanted):
+            break
+
+    columns = found.get("columns")
+    return {
+        "columns": columns,
+        "keys": _keys_frame(found.get("primary_key"), found.get("indexes")) if keys and columns is not None else None,
+        "inspected": inspected,
+    }
+
+
+def find_columns_table(source, encoding=None):
+    """Locate the Columns table (Name, Datatype, ...) in a doc page, reading no further
+
+    Returns (columns DataFrame or None, headers of each table inspected).
+    """
+    found = find_schema_tables(source, encoding, keys=False)
+    return found["columns"], found["inspected"]
+
+
+class _MeteredChunks:
+    """Iterates over a response's chunks, counting bytes and the time spent waiting for them"""
+
+    def __init__(self, chunks):
+        self._chunks = iter(chunks)
+        self.seconds = 0.0
+
+    def __iter__(self):
+        return self
+
+    def __next__(self):
+        started = time.perf_counter()
+        try:
+            chunk = next(self._chunks)
+        finally:
+            self.seconds += time.perf_counter() - started
+        count("bytes_downloaded", len(chunk))
+        return chunk
+
+
+def _page_memo_key(url, headers):
+    """(url, validator) for a response carrying an ETag or Last-Modified, else None"""
+    validator = headers.get("ETag") or headers.get("Last-Modified")
+    return (url, validator) if validator else None
+
+
+def _page_memo_get(key):
+    """Copy of the memoized schema tables for this page version, or None"""
+    if key is None:
+        return None
+    with _page_memo_lock:
+        memo = _page_memo.get(key)
+        if memo is None:
+            return None
+        _page_memo.move_to_end(key)
+    return {
+        "columns": memo["columns"].copy() if memo["columns"] is not None else None,
+        "keys": memo["keys"].copy() if memo["keys"] is not None else None,
+        "inspected": list(memo["inspected"]),
+    }
+
+
+def _page_memo_put(key, page, max_entries=PAGE_MEMO_MAX_ENTRIES):
+    if key is None:
+        return
+    # Callers may modify the frames they get back (column names are normalized in place)
+    memo = {
+        "columns": page["columns"].copy(),
+        "keys": page["keys"].copy() if page["keys"] is not None else None,
+        "inspected": list(page["inspected"]),
+    }
+    with _page_memo_lock:
+        _page_memo[key] = memo
+        _page_memo.move_to_end(key)
+        while len(_page_memo) > max_entries:
+            _page_memo.popitem(last=False)
+
+
+def clear_page_memo():
+    """Forget the parsed tables of previously fetched pages"""
+    with _page_memo_lock:
+        _page_memo.clear()
+
+
+def fetch_columns_table(url, timeout=15, etag=None, last_modified=None):
+    """Stream a doc page until its columns, primary key and indexes tables are read
+
+    With a cached ETag / Last-Modified the request is conditional. Returns a dict with
+    status (200, or 304 when the cached copy is still current), columns (DataFrame or None),
+    keys (see find_schema_tables), inspected (headers of each table checked) and the page's
+    etag / last_modified. The rest of the download is abandoned once the tables have been read. Time spent in
+    the parser is reported as the "parse" stage, the rest (network) as "fetch". A page version (URL plus
+    ETag / Last-Modified) parsed before in this process is not read or parsed again.
+    """
+    with stage("fetch", url=url) as fetch, \
+            http_get(url, headers=conditional_headers(etag, last_modified), timeout=timeout, stream=True) as res:
+        fetch.labels["status"] = res.status_code
+        page = {
+            "status": res.status_code,
+            "columns": None,
+            "keys": None,
+            "inspected": [],
+            "etag": res.headers.get("ETag") or etag,
+            "last_modified": res.headers.get("Last-Modified") or last_modified,
+        }
+        if res.status_code == 304:
+            return page
+        res.raise_for_status()
+        memo_key = _page_memo_key(url, res.headers)
+        memo = _page_memo_get(memo_key)
+        if memo is not None:
+            count("page_memo_hits")
+            page.update(memo)
+            return page
+        chunks = _MeteredChunks(res.iter_content(PAGE_CHUNK_SIZE))
+        with stage("parse", url=url) as parse:
+            page.update(find_schema_tables(chunks, encoding=res.encoding))
+            parse.exclude(chunks.seconds)
+        fetch.exclude(parse.seconds)
+    if page["columns"] is not None:
+        _page_memo_put(memo_key, page)
+    return page
+
+
+def scrape_columns(url, timeout=15):
+    """Columns table of a doc page (empty DataFrame if the page has none)"""
+    df = fetch_columns_table(url, timeout)["columns"]
+    return df if df is not None else pd.DataFrame()
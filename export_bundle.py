@@ -0,0 +1,170 @@
+"""Excel, SQL and zip downloads for one or many generated tables.
+
+Artifacts are written to a temp directory named after a hash of their
+content, so Streamlit reruns and repeated exports reuse the files instead of
+rebuilding them. The workbook is written with openpyxl in write-only mode,
+one row at a time, so a large batch never holds whole worksheets in memory.
+"""
+import hashlib
+import os
+import re
+import shutil
+import tempfile
+import time
+import zipfile
+
+import pandas as pd
+from openpyxl import Workbook
+
+# ---------- CONFIGURATION ----------
+EXPORT_DIR = os.path.join(tempfile.gettempdir(), "oracle_table_script_exports")
+EXPORT_KEEP = 20  # newest export folders kept; older ones are removed
+EXPORT_MIN_AGE_SECONDS = 600  # folders used more recently than this are never removed
+EXPORT_FILES = {"excel": "columns.xlsx", "sql": "create_tables.sql", "post_load": "post_load_indexes.sql",
+                "zip": "create_scripts.zip"}
+
+SUMMARY_SHEET = "Summary"
+SUMMARY_COLUMNS = ["TABLE_NAME", "TARGET_TABLE", "STATUS", "COLUMNS", "ROW_BYTES", "ROW_BYTES_SAVED", "SOURCE", "STORAGE",
+                   "URL", "CONFIDENCE", "MESSAGE", "SHEET"]
+SHEET_NAME_MAX = 31
+INVALID_SHEET_CHARS = re.compile(r"[\[\]:*?/\\]")
+
+
+def _ok(results):
+    return [r for r in results if r["STATUS"] == "OK"]
+
+
+def export_fingerprint(results):
+    """Hash of everything that ends up in the exports"""
+    digest = hashlib.sha256()
+    for r in results:
+        for key in SUMMARY_COLUMNS[:-1] + ["SQL", "POST_LOAD_SQL"]:
+            digest.update(f"{r.get(key, '')}\x1f".encode("utf-8"))
+        conv = r.get("CONVERTED")
+        if conv is not None:
+            digest.update("\x1f".join(map(str, conv.columns)).encode("utf-8"))
+            digest.update(pd.util.hash_pandas_object(conv, index=False).values.tobytes())
+        digest.update(b"\x1e")
+    return digest.hexdigest()
+
+
+def sheet_names(table_names):
+    """Unique, valid (31 characters, no []:*?/\\) worksheet names for the given tables"""
+    used = {SUMMARY_SHEET.upper()}
+    names = []
+    for table_name in table_names:
+        base = INVALID_SHEET_CHARS.sub("_", table_name)[:SHEET_NAME_MAX] or "TABLE"
+        name, n = base, 1
+        while name.upper() in used:
+            n += 1
+            suffix = f"~{n}"
+            name = base[:SHEET_NAME_MAX - len(suffix)] + suffix
+        used.add(name.upper())
+        names.append(name)
+    return names
+
+
+def _cell(value):
+    """openpyxl cannot write NaN/NA; leave those cells empty"""
+    return None if pd.isna(value) else value
+
+
+def write_excel(results, path):
+    """Summary sheet plus one sheet of converted columns per generated table"""
+    ok = _ok(results)
+    sheets = dict(zip((id(r) for r in ok), sheet_names([r["TARGET_TABLE"] for r in ok])))
+
+    wb = Workbook(write_only=True)
+    summary = wb.create_sheet(SUMMARY_SHEET)
+    summary.append(SUMMARY_COLUMNS)
+    for r in results:
+        summary.append([_cell(r.get(col)) for col in SUMMARY_COLUMNS[:-1]] + [sheets.get(id(r))])
+
+    for r in ok:
+        ws = wb.create_sheet(sheets[id(r)])
+        conv = r["CONVERTED"]
+        ws.append([str(c) for c in conv.columns])
+        for row in conv.itertuples(index=False, name=None):
+            ws.append([_cell(v) for v in row])
+    wb.save(path)
+
+
+def iter_sql_scripts(results):
+    """CREATE TABLE script of each generated table, ready to run as one batch"""
+    for r in _ok(results):
+        yield f"-- {r['TABLE_NAME']} ({r['COLUMNS']} columns)\n{r['SQL']}\nGO\n"
+
+
+def iter_post_load_scripts(results):
+    """Primary key / index script of each table whose keys are created after the load"""
+    for r in _ok(results):
+        if r.get("POST_LOAD_SQL"):
+            yield f"-- {r['TABLE_NAME']}: run after loading the data\n{r['POST_LOAD_SQL']}\nGO\n"
+
+
+def _write_parts(parts, path):
+    with open(path, "w", encoding="utf-8") as f:
+        for idx, part in enumerate(parts):
+            f.write(("\n" if idx else "") + part)
+
+
+def write_sql(results, path):
+    """All CREATE TABLE scripts in one .sql file"""
+    _write_parts(iter_sql_scripts(results), path)
+
+
+def write_post_load_sql(results, path):
+    """All post-load primary key / index scripts in one .sql file (empty if none were deferred)"""
+    _write_parts(iter_post_load_scripts(results), path)
+
+
+def write_zip(results, path):
+    """One <TABLE>_create.sql (and <TABLE>_post_load.sql) per generated table"""
+    with zipfile.ZipFile(path, "w", compression=zipfile.ZIP_DEFLATED) as zf:
+        for r in _ok(results):
+            zf.writestr(f"{r['TABLE_NAME']}_create.sql", r["SQL"])
+            if r.get("POST_LOAD_SQL"):
+                zf.writestr(f"{r['TABLE_NAME']}_post_load.sql", r["POST_LOAD_SQL"])
+
+
+WRITERS = {"excel": write_excel, "sql": write_sql, "post_load": write_post_load_sql, "zip": write_zip}
+
+
+def _prune_exports(export_dir, keep, current=None, min_age=EXPORT_MIN_AGE_SECONDS):
+    """Remove all but the newest keep export folders, sparing current and any used in the last min_age seconds"""
+    try:
+        folders = [(e.stat().st_mtime, e.path) for e in os.scandir(export_dir) if e.is_dir()]
+    except OSError:
+        return
+    folders.sort(reverse=True)
+    # Every rerun touches its folder, so a recent mtime means a session may still be reading it
+    cutoff = time.time() - min_age
+    for mtime, path in folders[keep:]:
+        if mtime < cutoff and path != current:
+            shutil.rmtree(path, ignore_errors=True)
+
+
+def build_exports(results, export_dir=EXPORT_DIR, keep=EXPORT_KEEP):
+    """Write (or reuse) the Excel, SQL and zip exports; returns {kind: path}
+
+    Each file is written under a temporary name and renamed into place, so
+    concurrent sessions exporting the same content never see a partial file.
+    """
+    folder = os.path.join(export_dir, export_fingerprint(results)[:24])
+    os.makedirs(folder, exist_ok=True)
+    paths = {}
+    for kind, file_name in EXPORT_FILES.items():
+        path = os.path.join(folder, file_name)
+        if not os.path.exists(path):
+            fd, tmp_path = tempfile.mkstemp(dir=folder, suffix=".part")
+            os.close(fd)
+            try:
+                WRITERS[kind](results, tmp_path)
+                os.replace(tmp_path, path)
+            finally:
+                if os.path.exists(tmp_path):
+                    os.remove(tmp_path)
+        paths[kind] = path
+    os.utime(folder)
+    _prune_exports(export_dir, keep, current=folder)
+    return paths
@@ -0,0 +1,125 @@
+"""Shared HTTP client for Google and docs.oracle.com requests.
+
+One pooled requests.Session is reused by every thread so connections stay
+alive between tables. Each attempt waits for its host's rate limit, and
+429/5xx responses or connection errors are retried with exponential backoff
+and jitter (a Retry-After header wins when the server sends one).
+"""
+import random
+import threading
+import time
+from email.utils import parsedate_to_datetime
+from urllib.parse import urlparse
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from metrics import count
+
+# ---------- CONFIGURATION ----------
+USER_AGENT = "Mozilla/5.0"
+HTTP_POOL_SIZE = 16            # keep-alive connections kept per host
+HTTP_RETRIES = 3               # extra attempts after the first one
+HTTP_BACKOFF_SECONDS = 0.5     # first retry delay, doubled per attempt
+HTTP_BACKOFF_MAX_SECONDS = 30
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+
+# Minimum seconds between two requests to the same host (all threads together)
+HOST_MIN_INTERVALS = {
+    "www.google.com": 1.0,
+    "www.googleapis.com": 0.1,
+    "docs.oracle.com": 0.1,
+}
+
+_session = None
+_session_lock = threading.Lock()
+
+
+class RateLimiter:
+    """Spaces out requests per host by a minimum interval, across threads"""
+
+    def __init__(self, min_intervals=None):
+        self.min_intervals = dict(min_intervals or {})
+        self._next_slot = {}
+        self._lock = threading.Lock()
+
+    def wait(self, host):
+        """Block until this host may be called again"""
+        interval = self.min_intervals.get(host, 0)
+        if interval <= 0:
+            return
+        with self._lock:
+            now = time.monotonic()
+            slot = max(now, self._next_slot.get(host, now))
+            self._next_slot[host] = slot + interval
+        if slot > now:
+            count("rate_limit_wait_seconds", slot - now)
+            time.sleep(slot - now)
+
+
+rate_limiter = RateLimiter(HOST_MIN_INTERVALS)
+
+
+def get_session():
+    """The process-wide keep-alive session (created on first use)"""
+    global _session
+    with _session_lock:
+        if _session is None:
+            session = requests.Session()
+            adapter = HTTPAdapter(pool_connections=HTTP_POOL_SIZE, pool_maxsize=HTTP_POOL_SIZE)
+            session.mount("https://", adapter)
+            session.mount("http://", adapter)
+            session.headers.update({"User-Agent": USER_AGENT, "Accept-Encoding": "gzip, deflate"})
+            _session = session
+        return _session
+
+
+def _retry_delay(attempt, response=None):
+    """Backoff before the next attempt: Retry-After if given, else exponential with full jitter"""
+    retry_after = response.headers.get("Retry-After") if response is not None else None
+    if retry_after:
+        try:
+            return min(float(retry_after), HTTP_BACKOFF_MAX_SECONDS)
+        except ValueError:
+            try:
+                return min(max(parsedate_to_datetime(retry_after).timestamp() - time.time(), 0), HTTP_BACKOFF_MAX_SECONDS)
+            except (TypeError, ValueError):
+                pass
+    return random.uniform(0, min(HTTP_BACKOFF_SECONDS * 2 ** attempt, HTTP_BACKOFF_MAX_SECONDS))
+
+
+def http_get(url, params=None, headers=None, timeout=15, stream=False, retries=HTTP_RETRIES):
+    """GET through the shared session with per-host rate limiting and retries
+
+    The last response is returned even if its status is still retryable; connection
+    errors are raised once the retries are used up.
+    """
+    host = urlparse(url).hostname or ""
+    session = get_session()
+    for attempt in range(retries + 1):
+        rate_limiter.wait(host)
+        count("http_requests")
+        if attempt:
+            count("http_retries")
+        try:
+            res = session.get(url, params=params, headers=headers, timeout=timeout, stream=stream)
+        except (requests.ConnectionError, requests.Timeout):
+            if attempt == retries:
+                raise
+            time.sleep(_retry_delay(attempt))
+            continue
+        if res.status_code not in RETRY_STATUSES or attempt == retries:
+            return res
+        delay = _retry_delay(attempt, res)
+        res.close()
+        time.sleep(delay)
+
+
+def conditional_headers(etag=None, last_modified=None):
+    """If-None-Match / If-Modified-Since headers for revalidating a cached page"""
+    headers = {}
+    if etag:
+        headers["If-None-Match"] = etag
+    if last_modified:
+        headers["If-Modified-Since"] = last_modified
+    return headers
@@ -0,0 +1,211 @@
+"""Per-stage timings and counters for the generation pipeline.
+
+    with stage("fetch", url=url):
+        ...
+    count("bytes_downloaded", len(chunk))
+
+Every finished stage is added to the process-wide totals (shown in the UI,
+exported in Prometheus text format) and logged as one JSON line on the
+"table_script.metrics" logger. Inside a trace() block the same stages and
+counters are also collected for that one run, e.g. a single table.
+"""
+import contextvars
+import functools
+import json
+import logging
+import threading
+import time
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+# ---------- CONFIGURATION ----------
+# Stages in pipeline order (others are reported after these)
+STAGES = ["index_read", "cache_read", "lookup", "fetch", "parse", "convert", "generate", "exists_check", "execute", "extract", "load"]
+METRICS_NAMESPACE = "table_script"
+
+logger = logging.getLogger("table_script.metrics")
+_current_trace = contextvars.ContextVar("metrics_trace", default=None)
+
+
+class StageTimer:
+    """Timing of one stage; labels can be added while it runs"""
+
+    def __init__(self, name, labels):
+        self.name = name
+        self.labels = labels
+        self.ok = True
+        self.seconds = 0.0
+        self._excluded = 0.0
+        self._started = time.perf_counter()
+
+    def exclude(self, seconds):
+        """Leave time spent in a nested stage out of this one"""
+        self._excluded += seconds
+
+    def stop(self):
+        self.seconds = max(time.perf_counter() - self._started - self._excluded, 0.0)
+
+
+class Metrics:
+    """Process-wide calls, errors and seconds per stage plus named counters"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        with self._lock:
+            self._stages = {}
+            self._counters = {}
+
+    def observe(self, name, seconds, ok=True):
+        with self._lock:
+            s = self._stages.setdefault(name, {"calls": 0, "errors": 0, "seconds": 0.0, "max_seconds": 0.0})
+            s["calls"] += 1
+            s["errors"] += not ok
+            s["seconds"] += seconds
+            s["max_seconds"] = max(s["max_seconds"], seconds)
+
+    def add(self, counter, n=1):
+        with self._lock:
+            self._counters[counter] = self._counters.get(counter, 0) + n
+
+    def snapshot(self):
+        """{"stages": {name: {calls, errors, seconds, max_seconds}}, "counters": {name: value}}"""
+        with self._lock:
+            stages = {name: dict(s) for name, s in self._stages.items()}
+            counters = dict(self._counters)
+        order = {name: idx for idx, name in enumerate(STAGES)}
+        return {
+            "stages": dict(sorted(stages.items(), key=lambda kv: (order.get(kv[0], len(order)), kv[0]))),
+            "counters": dict(sorted(counters.items())),
+        }
+
+    def to_prometheus(self):
+        """Totals in the Prometheus text exposition format"""
+        snap = self.snapshot()
+        ns = METRICS_NAMESPACE
+        lines = []
+        for metric, field, kind, help_text in (
+            ("stage_calls_total", "calls", "counter", "Stage executions"),
+            ("stage_errors_total", "errors", "counter", "Stage executions that raised"),
+            ("stage_seconds_total", "seconds", "counter", "Seconds spent in the stage"),
+            ("stage_seconds_max", "max_seconds", "gauge", "Slowest single execution of the stage"),
+        ):
+            lines += [f"# HELP {ns}_{metric} {help_text}", f"# TYPE {ns}_{metric} {kind}"]
+            lines += [f'{ns}_{metric}{{stage="{name}"}} {s[field]:g}' for name, s in snap["stages"].items()]
+        for counter, value in snap["counters"].items():
+            lines += [f"# TYPE {ns}_{counter}_total counter", f"{ns}_{counter}_total {value:g}"]
+        return "\n".join(lines) + "\n"
+
+
+metrics = Metrics()
+
+
+class Trace:
+    """Stages and counters of a single run"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.stages = []
+        self.counters = {}
+
+    def add_stage(self, timer):
+        with self._lock:
+            self.stages.append({"STAGE": timer.name, "SECONDS": round(timer.seconds, 4), "OK": timer.ok,
+                                **{k.upper(): v for k, v in timer.labels.items()}})
+
+    def add(self, counter, n=1):
+        with self._lock:
+            self.counters[counter] = self.counters.get(counter, 0) + n
+
+    def totals(self):
+        """Seconds per stage, summed over repeated executions"""
+        totals = {}
+        for s in self.stages:
+            totals[s["STAGE"]] = round(totals.get(s["STAGE"], 0.0) + s["SECONDS"], 4)
+        return totals
+
+
+@contextmanager
+def stage(name, **labels):
+    """Time a pipeline stage; yields its StageTimer"""
+    timer = StageTimer(name, labels)
+    try:
+        yield timer
+    except BaseException:
+        timer.ok = False
+        raise
+    finally:
+        timer.stop()
+        metrics.observe(name, timer.seconds, timer.ok)
+        current = _current_trace.get()
+        if current is not None:
+            current.add_stage(timer)
+        if logger.isEnabledFor(logging.INFO):
+            logger.info(json.dumps({"event": "stage", "stage": name, "seconds": round(timer.seconds, 4),
+                                    "ok": timer.ok, **timer.labels}, default=str))
+
+
+def timed(name, **labels):
+    """Decorator form of stage()"""
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            with stage(name, **labels):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+def count(counter, n=1):
+    """Add to a named counter (bytes_downloaded, cache_hits, http_retries, ...)"""
+    metrics.add(counter, n)
+    current = _current_trace.get()
+    if current is not None:
+        current.add(counter, n)
+
+
+@contextmanager
+def trace():
+    """Collect the stages and counters of the enclosed run (this thread / task only)"""
+    current = Trace()
+    token = _current_trace.set(current)
+    try:
+        yield current
+    finally:
+        _current_trace.reset(token)
+
+
+# ---------- Export ----------
+
+class _MetricsHandler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        if self.path.split("?", 1)[0] != "/metrics":
+            self.send_error(404)
+            return
+        body = metrics.to_prometheus().encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def serve_metrics(port, host="0.0.0.0"):
+    """Serve /metrics for Prometheus from a background thread; returns the server"""
+    server = ThreadingHTTPServer((host, port), _MetricsHandler)
+    threading.Thread(target=server.serve_forever, name="metrics-http", daemon=True).start()
+    return server
+
+
+def configure_json_logging(level=logging.INFO, stream=None):
+    """Send the metrics logger's JSON lines to stderr (or the given stream)"""
+    handler = logging.StreamHandler(stream)
+    handler.setFormatter(logging.Formatter("%(message)s"))
+    logger.addHandler(handler)
+    logger.setLevel(level)
+    logger.propagate = False
@@ -0,0 +1,253 @@
+"""Local index of known Oracle table names: suggestions, autocomplete and wildcards.
+
+Names come from the offline documentation index, the lookup cache and every
+table generated before (kept in a small SQLite file of their own), so a typo or
+a partial name is caught before any search quota or page fetch is spent:
+
+    python name_index.py suggest AP_INVOCES_ALL
+    python name_index.py expand "AP_INVOICE%"
+
+Wildcards are % or * (any run of characters) and ? (one character); _ is a
+literal, since nearly every Fusion table name contains it.
+"""
+import argparse
+import bisect
+import os
+import re
+import sqlite3
+import threading
+import time
+from collections import Counter
+
+from doc_cache import CACHE_FILE, cached_table_names
+from oracle_doc_index import INDEX_FILE, indexed_table_names
+
+# ---------- CONFIGURATION ----------
+NAME_INDEX_FILE = "table_names.sqlite"
+SUGGEST_LIMIT = 8
+EXPAND_LIMIT = 500          # most tables a single wildcard pattern expands to
+SIMILARITY_MIN = 0.5        # trigram similarity for a name to be suggested
+TYPO_SIMILARITY_MIN = 0.7   # an unknown name this close to a known one is treated as a typo
+SUBSTRING_MIN_LENGTH = 4    # shorter fragments only complete as prefixes
+
+WILDCARD_CHARS = "%*?"
+
+
+# ---------- Name Storage ----------
+
+def _names_connect(names_file=NAME_INDEX_FILE):
+    """Open the names database, creating the table on first use"""
+    conn = sqlite3.connect(names_file, timeout=30)
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS table_names (
+            table_name TEXT PRIMARY KEY,
+            last_seen_at REAL NOT NULL
+        )
+    """)
+    return conn
+
+
+def record_table_name(table_name, names_file=NAME_INDEX_FILE):
+    """Remember a table name that resolved to a documentation page"""
+    try:
+        conn = _names_connect(names_file)
+        with conn:
+            conn.execute("INSERT OR REPLACE INTO table_names (table_name, last_seen_at) VALUES (?, ?)",
+                         (table_name.upper(), time.time()))
+        conn.close()
+    except sqlite3.Error:
+        pass
+
+
+def recorded_table_names(names_file=NAME_INDEX_FILE):
+    """Names recorded by previous runs"""
+    if not os.path.exists(names_file):
+        return []
+    try:
+        conn = _names_connect(names_file)
+        names = [row[0] for row in conn.execute("SELECT table_name FROM table_names")]
+        conn.close()
+        return names
+    except sqlite3.Error:
+        return []
+
+
+# ---------- Matching ----------
+
+def is_wildcard(name):
+    """True if the name is a pattern such as AP_INVOICE% rather than a table name"""
+    return any(c in name for c in WILDCARD_CHARS)
+
+
+def wildcard_regex(pattern):
+    """Compiled regex for a %, * and ? pattern (case-insensitive, whole name)"""
+    parts = [".*" if c in "%*" else "." if c == "?" else re.escape(c) for c in pattern.upper()]
+    return re.compile("".join(parts) + r"\Z")
+
+
+def trigrams(name):
+    """Character trigrams of the name, padded so the first and last letters count as much as the rest"""
+    padded = f"  {name.upper()} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+class NameIndex:
+    """Sorted table names with a trigram index for prefix, substring and fuzzy matching"""
+
+    def __init__(self, names):
+        self.names = sorted({n.upper() for n in names if n})
+        self._known = set(self.names)
+        self._grams = {}
+        for idx, name in enumerate(self.names):
+            for gram in trigrams(name):
+                self._grams.setdefault(gram, []).append(idx)
+
+    def __len__(self):
+        return len(self.names)
+
+    def __contains__(self, name):
+        return name.upper() in self._known
+
+    def complete(self, prefix, limit=SUGGEST_LIMIT):
+        """Known names starting with the prefix, in alphabetical order"""
+        prefix = prefix.upper()
+        start = bisect.bisect_left(self.names, prefix)
+        matches = []
+        for name in self.names[start:]:
+            if not name.startswith(prefix) or len(matches) >= limit:
+                break
+            matches.append(name)
+        return matches
+
+    def similar(self, name, limit=SUGGEST_LIMIT, min_score=SIMILARITY_MIN):
+        """(name, score) of the closest known names by trigram (Dice) similarity, best first"""
+        grams = trigrams(name)
+        shared = Counter()
+        for gram in grams:
+            shared.update(self._grams.get(gram, ()))
+        scored = []
+        for idx, n in shared.items():
+            score = 2 * n / (len(grams) + len(trigrams(self.names[idx])))
+            if score >= min_score:
+                scored.append((self.names[idx], round(score, 3)))
+        scored.sort(key=lambda item: (-item[1], item[0]))
+        return scored[:limit]
+
+    def suggest(self, name, limit=SUGGEST_LIMIT):
+        """Completions, then names containing the text, then look-alikes; never the name itself"""
+        name = name.upper()
+        suggestions = [n for n in self.complete(name, limit + 1) if n != name]
+        if len(name) >= SUBSTRING_MIN_LENGTH:
+            suggestions += [n for n in self.names if name in n and n != name and n not in suggestions]
+        suggestions += [n for n, _ in self.similar(name, limit) if n != name and n not in suggestions]
+        return suggestions[:limit]
+
+    def typo_of(self, name):
+        """Known names an unknown name is most likely a misspelling of (empty if it is known or unlike any)"""
+        if name in self:
+            return []
+        return [n for n, _ in self.similar(name, min_score=TYPO_SIMILARITY_MIN)]
+
+    def expand(self, pattern, limit=EXPAND_LIMIT):
+        """Known names matching a wildcard pattern, in alphabetical order"""
+        regex = wildcard_regex(pattern)
+        # Everything before the first wildcard is a fixed prefix, so only that slice is scanned
+        fixed = re.split(r"[%*?]", pattern.upper(), maxsplit=1)[0]
+        start = bisect.bisect_left(self.names, fixed)
+        matches = []
+        for name in self.names[start:]:
+            if not name.startswith(fixed) or len(matches) >= limit:
+                break
+            if regex.match(name):
+                matches.append(name)
+        return matches
+
+
+# ---------- Shared Index ----------
+
+_index_lock = threading.Lock()
+_index_cache = {}
+
+
+def _source_stamp(paths):
+    """Modification times of the source files (and SQLite WAL files), to notice new names"""
+    stamp = []
+    for path in paths:
+        for p in (path, path + "-wal"):
+            try:
+                stamp.append(os.path.getmtime(p))
+            except OSError:
+                stamp.append(None)
+    return tuple(stamp)
+
+
+def get_name_index(names_file=NAME_INDEX_FILE, cache_file=CACHE_FILE, index_file=INDEX_FILE):
+    """Index of every known table name, rebuilt only when one of its sources has changed"""
+    key = (names_file, cache_file, index_file)
+    stamp = _source_stamp(key)
+    with _index_lock:
+        cached = _index_cache.get(key)
+        if cached and cached[0] == stamp:
+            return cached[1]
+    index = NameIndex(indexed_table_names(index_file) + cached_table_names(cache_file)
+                      + recorded_table_names(names_file))
+    with _index_lock:
+        _index_cache[key] = (stamp, index)
+    return index
+
+
+def resolve_table_names(names, index, skip_typos=True):
+    """Expand wildcard patterns and set likely typos aside; returns (tables, expanded, typos)
+
+    expanded maps each pattern to the names it matched and typos maps each
+    skipped name to the known names it resembles. Unknown names unlike any known
+    one are kept, since the index never lists every Fusion table.
+    """
+    tables, expanded, typos = [], {}, {}
+    for name in names:
+        if is_wildcard(name):
+            expanded[name] = index.expand(name)
+            candidates = expanded[name]
+        else:
+            close = index.typo_of(name) if skip_typos else []
+            if close:
+                typos[name] = close
+            candidates = [] if close else [name.upper()]
+        for table_name in candidates:
+            if table_name not in tables:
+                tables.append(table_name)
+    return tables, expanded, typos
+
+
+# ---------- Command Line ----------
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Suggest, complete or expand Oracle table names from the local name index")
+    parser.add_argument("--names", default=NAME_INDEX_FILE, help=f"recorded names file (default: {NAME_INDEX_FILE})")
+    parser.add_argument("--cache", default=CACHE_FILE, help=f"lookup cache file (default: {CACHE_FILE})")
+    parser.add_argument("--index", default=INDEX_FILE, help=f"documentation index file (default: {INDEX_FILE})")
+    sub = parser.add_subparsers(dest="command", required=True)
+    suggest = sub.add_parser("suggest", help="known names close to a (partial or misspelt) name")
+    suggest.add_argument("name")
+    expand = sub.add_parser("expand", help="known names matching a wildcard pattern such as AP_INVOICE%%")
+    expand.add_argument("pattern")
+
+    args = parser.parse_args(argv)
+    index = get_name_index(args.names, args.cache, args.index)
+    if args.command == "expand":
+        matches = index.expand(args.pattern)
+    elif args.name in index:
+        print(f"{args.name.upper()} is a known table")
+        return 0
+    else:
+        matches = index.suggest(args.name)
+    for name in matches:
+        print(name)
+    if not matches:
+        print(f"No match among {len(index)} known table name(s)")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
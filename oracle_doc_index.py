@@ -0,0 +1,254 @@
+"""Offline index of Oracle Cloud "Tables and Views" pages.
+
+Build it once from a saved copy of the guides (or by crawling them), then the
+generator looks tables up locally instead of going through a web search:
+
+    python oracle_doc_index.py build --mirror ./docs.oracle.com
+    python oracle_doc_index.py build --crawl https://docs.oracle.com/en/cloud/saas/financials/25a/oedmf/
+    python oracle_doc_index.py lookup AP_INVOICES_ALL
+"""
+import argparse
+import os
+import re
+import sqlite3
+from collections import deque
+from io import StringIO
+from urllib.parse import urljoin, urlparse
+
+import pandas as pd
+import requests
+from bs4 import BeautifulSoup
+
+from doc_lookup import find_schema_tables
+from http_client import http_get
+from metrics import count, timed
+
+# ---------- CONFIGURATION ----------
+INDEX_FILE = "doc_index.sqlite"
+DOCS_BASE_URL = "https://docs.oracle.com/"
+CRAWL_MAX_PAGES = 5000
+
+TABLE_NAME_PATTERN = re.compile(r"\b([A-Z][A-Z0-9$#]*_[A-Z0-9_$#]+)\b")
+
+
+# ---------- Page Parsing ----------
+
+def parse_table_page(html):
+    """Return (table name, columns DataFrame, keys DataFrame) for a table page, or None if it has no columns table"""
+    found = find_schema_tables(html)
+    if found["columns"] is None:
+        return None
+
+    soup = BeautifulSoup(html, "html.parser")
+    # The table name is the page heading, falling back to the <title>
+    for tag in (soup.find("h1"), soup.find("title")):
+        if tag is None:
+            continue
+        m = TABLE_NAME_PATTERN.search(tag.get_text(" ").strip().upper())
+        if m:
+            return m.group(1), found["columns"], found["keys"]
+    return None
+
+
+# ---------- Index Storage ----------
+
+def _index_connect(index_file=INDEX_FILE):
+    """Open the index database, creating the table on first use"""
+    conn = sqlite3.connect(index_file, timeout=30)
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS doc_index (
+            table_name TEXT PRIMARY KEY,
+            url TEXT NOT NULL,
+            columns_json TEXT NOT NULL,
+            keys_json TEXT
+        )
+    """)
+    # Indexes built before keys were extracted lack keys_json
+    if "keys_json" not in {row[1] for row in conn.execute("PRAGMA table_info(doc_index)")}:
+        conn.execute("ALTER TABLE doc_index ADD COLUMN keys_json TEXT")
+    return conn
+
+
+def add_to_index(conn, table_name, url, columns_df, keys_df=None):
+    """Insert or replace one table in the index"""
+    conn.execute(
+        "INSERT OR REPLACE INTO doc_index (table_name, url, columns_json, keys_json) VALUES (?, ?, ?, ?)",
+        (table_name.upper(), url, columns_df.to_json(orient="table", index=False),
+         keys_df.to_json(orient="table", index=False) if keys_df is not None else None)
+    )
+
+
+# Its own stage like doc_cache's cache_read: misses fall through to the cache and the web
+@timed("index_read")
+def lookup_table_entry(table_name, index_file=INDEX_FILE):
+    """Indexed table as a dict (url, columns, keys), or None; keys is None for tables indexed before keys were extracted"""
+    if not os.path.exists(index_file):
+        return None
+    try:
+        conn = _index_connect(index_file)
+        row = conn.execute(
+            "SELECT url, columns_json, keys_json FROM doc_index WHERE table_name = ?", (table_name.upper(),)
+        ).fetchone()
+        conn.close()
+    except sqlite3.Error:
+        return None
+    count("index_hits" if row else "index_misses")
+    if not row:
+        return None
+    return {
+        "url": row[0],
+        "columns": pd.read_json(StringIO(row[1]), orient="table"),
+        "keys": pd.read_json(StringIO(row[2]), orient="table") if row[2] else None,
+    }
+
+
+def lookup_table(table_name, index_file=INDEX_FILE):
+    """Return (url, columns DataFrame) for an indexed table, or None"""
+    entry = lookup_table_entry(table_name, index_file)
+    return (entry["url"], entry["columns"]) if entry else None
+
+
+def is_indexed(table_name, index_file=INDEX_FILE):
+    """True if the table is in the index (without loading its columns)"""
+    if not os.path.exists(index_file):
+        return False
+    try:
+        conn = _index_connect(index_file)
+        row = conn.execute("SELECT 1 FROM doc_index WHERE table_name = ?", (table_name.upper(),)).fetchone()
+        conn.close()
+    except sqlite3.Error:
+        return False
+    return row is not None
+
+
+def count_indexed_tables(index_file=INDEX_FILE):
+    """Number of tables in the index (0 if it has not been built)"""
+    if not os.path.exists(index_file):
+        return 0
+    try:
+        conn = _index_connect(index_file)
+        total = conn.execute("SELECT COUNT(*) FROM doc_index").fetchone()[0]
+        conn.close()
+        return total
+    except sqlite3.Error:
+        return 0
+
+
+def indexed_table_names(index_file=INDEX_FILE):
+    """Names of all indexed tables (empty if the index has not been built)"""
+    if not os.path.exists(index_file):
+        return []
+    try:
+        conn = _index_connect(index_file)
+        names = [row[0] for row in conn.execute("SELECT table_name FROM doc_index")]
+        conn.close()
+        return names
+    except sqlite3.Error:
+        return []
+
+
+# ---------- Index Builders ----------
+
+def mirror_path_to_url(path, mirror_dir, base_url=DOCS_BASE_URL):
+    """Map a saved page back to its docs.oracle.com URL"""
+    rel = os.path.relpath(path, mirror_dir).replace(os.sep, "/")
+    # wget-style mirrors keep the host name as the top-level folder
+    if rel.startswith("docs.oracle.com/"):
+        return "https://" + rel
+    return urljoin(base_url, rel)
+
+
+def build_from_mirror(mirror_dir, index_file=INDEX_FILE, base_url=DOCS_BASE_URL):
+    """Index every table page found under a local mirror directory"""
+    indexed = 0
+    conn = _index_connect(index_file)
+    with conn:
+        for root, _, files in os.walk(mirror_dir):
+            for name in sorted(files):
+                if not name.lower().endswith((".html", ".htm")):
+                    continue
+                path = os.path.join(root, name)
+                with open(path, "r", encoding="utf-8", errors="replace") as f:
+                    parsed = parse_table_page(f.read())
+                if parsed:
+                    table_name, columns_df, keys_df = parsed
+                    add_to_index(conn, table_name, mirror_path_to_url(path, mirror_dir, base_url), columns_df, keys_df)
+                    indexed += 1
+    conn.close()
+    return indexed
+
+
+def build_from_crawl(start_url, index_file=INDEX_FILE, max_pages=CRAWL_MAX_PAGES):
+    """Crawl the HTML pages below start_url and index every table page"""
+    prefix = start_url.rsplit("/", 1)[0] + "/"
+    queue = deque([start_url])
+    seen = {start_url}
+    indexed = 0
+
+    conn = _index_connect(index_file)
+    while queue and len(seen) <= max_pages:
+        url = queue.popleft()
+        try:
+            res = http_get(url, timeout=15)
+            res.raise_for_status()
+        except requests.RequestException as e:
+            print(f"skip {url}: {e}")
+            continue
+
+        parsed = parse_table_page(res.text)
+        if parsed:
+            table_name, columns_df, keys_df = parsed
+            with conn:
+                add_to_index(conn, table_name, url, columns_df, keys_df)
+            indexed += 1
+
+        for a in BeautifulSoup(res.text, "html.parser").select("a[href]"):
+            link = urljoin(url, a["href"]).split("#", 1)[0]
+            if link.startswith(prefix) and urlparse(link).path.endswith(".html") and link not in seen:
+                seen.add(link)
+                queue.append(link)
+    conn.close()
+    return indexed
+
+
+# ---------- Command Line ----------
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Build or query the offline Oracle table documentation index")
+    parser.add_argument("--index", default=INDEX_FILE, help=f"index file (default: {INDEX_FILE})")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    build = sub.add_parser("build", help="index a local mirror or crawl the online guide")
+    source = build.add_mutually_exclusive_group(required=True)
+    source.add_argument("--mirror", help="directory containing the saved HTML pages")
+    source.add_argument("--crawl", help="start URL of a Tables and Views guide")
+    build.add_argument("--base-url", default=DOCS_BASE_URL, help="URL the mirror directory corresponds to")
+    build.add_argument("--max-pages", type=int, default=CRAWL_MAX_PAGES, help="crawl page limit")
+
+    lookup = sub.add_parser("lookup", help="show the indexed URL and columns for a table")
+    lookup.add_argument("table_name")
+
+    args = parser.parse_args(argv)
+
+    if args.command == "build":
+        if args.mirror:
+            indexed = build_from_mirror(args.mirror, args.index, args.base_url)
+        else:
+            indexed = build_from_crawl(args.crawl, args.index, args.max_pages)
+        print(f"Indexed {indexed} table page(s); {count_indexed_tables(args.index)} table(s) in {args.index}")
+        return 0
+
+    found = lookup_table_entry(args.table_name, args.index)
+    if not found:
+        print(f"{args.table_name.upper()} is not in {args.index}")
+        return 1
+    print(found["url"])
+    print(found["columns"].to_string(index=False))
+    if found["keys"] is not None and not found["keys"].empty:
+        print()
+        print(found["keys"].to_string(index=False))
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -1,20 +1,65 @@
 import streamlit as st
-import requests
-import re
 import pandas as pd
-from bs4 import BeautifulSoup
-from io import BytesIO
-from googleapiclient.discovery import build
-from googleapiclient.errors import HttpError
-import json
+import math
+import time
 from datetime import datetime
-import os
-import pyodbc
+from batch_pipeline import (
+    BATCH_HIDDEN_COLUMNS,
+    BATCH_MAX_WORKERS,
+    load_columns,
+    parse_table_list,
+    run_batch,
+)
+from conversion_engine import (
+    DDL_OPTIONS,
+    build_alter_statements,
+    build_create_table,
+    build_post_load_script,
+    compare_row_width,
+    convert_oracle_types,
+    get_profile,
+    get_storage_profile,
+    list_profiles,
+    list_storage_profiles,
+    load_type_mappings,
+    normalize_column_names,
+    profile_for_prefix,
+    row_width_summary,
+)
+from data_loader import LOAD_BATCH_SIZE, load_tables
+from doc_cache import cache_get_entry, clear_cache, get_cache_stats
+from doc_lookup import (
+    CONFIDENCE_INDEXED,
+    CONFIDENCE_VERIFIED,
+    clear_page_memo,
+    search_doc_page_api,
+    search_doc_page_scrape,
+    url_confidence,
+)
+from export_bundle import build_exports
+from metrics import metrics, serve_metrics, trace
+from name_index import get_name_index, is_wildcard, record_table_name, resolve_table_names
+from oracle_doc_index import count_indexed_tables, lookup_table_entry
+from quota import DAILY_API_LIMIT, get_quota_usage, reserve_quota
+from sql_deploy import (
+    BULK_DEPLOY_BATCH_SIZE,
+    FAN_OUT_TIMEOUT,
+    bulk_apply_alters,
+    bulk_create_tables,
+    bulk_diff_tables,
+    execute_script,
+    fetch_table_columns,
+    deploy_to_targets,
+    has_table,
+    list_databases,
+    parse_targets,
+    run_on_pools,
+    target_matrix,
+    test_connection,
+)
+from sql_pool import ConnectionPool, build_connection_string
 
 # ---------- CONFIGURATION ----------
-DEFAULT_SEARCH_DOMAIN = "docs.oracle.com/en/cloud/saas/"
-USER_AGENT = {"User-Agent": "Mozilla/5.0"}
-
 # Default table prefix
 DEFAULT_TABLE_PREFIX = "ST_FN_"
 
@@ -27,9 +72,33 @@ SQL_SERVER = st.secrets.get("SQL_SERVER", "43.231.235.199")
 SQL_USERNAME = st.secrets.get("SQL_USERNAME", "sa")
 SQL_PASSWORD = st.secrets.get("SQL_PASSWORD", "love")
 SQL_DATABASE = st.secrets.get("SQL_DATABASE", "master")  # Default database
-
-# Counter file to track daily usage
-COUNTER_FILE = "api_usage_counter.json"
+# Fan-out deploy targets, one [LABEL=]SERVER/DATABASE per line (same credentials for all)
+SQL_TARGETS = st.secrets.get("SQL_TARGETS", "")
+
+# Oracle source for loading data (python-oracledb DSN such as host:1521/service)
+ORACLE_DSN = st.secrets.get("ORACLE_DSN", "")
+ORACLE_USER = st.secrets.get("ORACLE_USER", "")
+ORACLE_PASSWORD = st.secrets.get("ORACLE_PASSWORD", "")
+ORACLE_SCHEMA = st.secrets.get("ORACLE_SCHEMA", "")
+
+# Connection pool per server/database and how long the database list is cached
+SQL_POOL_SIZE = int(st.secrets.get("SQL_POOL_SIZE", 5))
+SQL_POOL_IDLE_SECONDS = int(st.secrets.get("SQL_POOL_IDLE_SECONDS", 300))
+DATABASE_LIST_TTL_SECONDS = 60
+# Memoized convert / DDL / row width results kept per stage, shared by all sessions
+STAGE_CACHE_MAX_ENTRIES = 256
+# Export files kept in memory for the download buttons (one entry per file of an export)
+EXPORT_CACHE_MAX_ENTRIES = 16
+
+# Port for a Prometheus /metrics endpoint (0 = off); JSON stage logs go to the "table_script.metrics" logger
+METRICS_PORT = int(st.secrets.get("METRICS_PORT", 0))
+
+# Large results: rows per page in detail views, and how often the batch progress table is redrawn
+RESULTS_PAGE_SIZE = 100
+BATCH_PROGRESS_REFRESH_SECONDS = 0.5
+BATCH_PROGRESS_ROWS = 200  # most recent tables shown while a batch is running
+BATCH_PROGRESS_COLUMNS = ["TABLE_NAME", "STATUS", "COLUMNS", "SOURCE", "STORAGE", "SECONDS", "MESSAGE"]
+AUTO_STORAGE = "auto (by table name / row count)"
 
 # Initialize session state
 if 'results_ready' not in st.session_state:
@@ -49,22 +118,52 @@ if 'selected_database' not in st.session_state:
 # Prefix persistence: default to DEFAULT_TABLE_PREFIX on first run
 if 'table_prefix' not in st.session_state:
     st.session_state.table_prefix = DEFAULT_TABLE_PREFIX
+if 'batch_results' not in st.session_state:
+    st.session_state.batch_results = None
+if 'deploy_results' not in st.session_state:
+    st.session_state.deploy_results = None
+if 'diff_results' not in st.session_state:
+    st.session_state.diff_results = None
+if 'load_results' not in st.session_state:
+    st.session_state.load_results = None
+if 'fanout_results' not in st.session_state:
+    st.session_state.fanout_results = None
+if 'batch_name_notes' not in st.session_state:
+    st.session_state.batch_name_notes = []
+if 'alter_script' not in st.session_state:
+    st.session_state.alter_script = None
+if 'alter_database' not in st.session_state:
+    st.session_state.alter_database = None
+if 'last_trace' not in st.session_state:
+    st.session_state.last_trace = None
+if 'keys_df' not in st.session_state:
+    st.session_state.keys_df = None
+if 'post_load_script' not in st.session_state:
+    st.session_state.post_load_script = None
+if 'storage' not in st.session_state:
+    st.session_state.storage = None
+if 'width_report' not in st.session_state:
+    st.session_state.width_report = None
 
 # ---------- SQL Server Functions ----------
 
+@st.cache_resource(show_spinner=False)
+def get_connection_pool(server, database):
+    """Shared connection pool for one server/database (kept across reruns and sessions)"""
+    conn_str = build_connection_string(server, database, SQL_USERNAME, SQL_PASSWORD)
+    return ConnectionPool(conn_str, max_size=SQL_POOL_SIZE, idle_timeout=SQL_POOL_IDLE_SECONDS)
+
+
+@st.cache_resource(show_spinner=False)
+def start_metrics_endpoint(port):
+    """Start the Prometheus endpoint once per process"""
+    return serve_metrics(port)
+
+
 def test_sql_connection():
     """Test SQL Server connection"""
     try:
-        conn_str = (
-            f"DRIVER={{ODBC Driver 17 for SQL Server}};"
-            f"SERVER={SQL_SERVER};"
-            f"DATABASE={SQL_DATABASE};"
-            f"UID={SQL_USERNAME};"
-            f"PWD={SQL_PASSWORD}"
-        )
-        conn = pyodbc.connect(conn_str, timeout=5)
-        conn.close()
-        return True, "Connection successful!"
+        return test_connection(get_connection_pool(SQL_SERVER, SQL_DATABASE))
     except Exception as e:
         return False, str(e)
 
@@ -74,33 +173,7 @@ def execute_sql_script(sql_script, database_name=None):
     try:
         # Use specified database or default
         db = database_name if database_name else SQL_DATABASE
-        
-        conn_str = (
-            f"DRIVER={{ODBC Driver 17 for SQL Server}};"
-            f"SERVER={SQL_SERVER};"
-            f"DATABASE={db};"
-            f"UID={SQL_USERNAME};"
-            f"PWD={SQL_PASSWORD}"
-        )
-        
-        conn = pyodbc.connect(conn_str, timeout=10)
-        cursor = conn.cursor()
-        
-        # Execute the SQL script
-        cursor.execute(sql_script)
-        conn.commit()
-        
-        cursor.close()
-        conn.close()
-        
-        return True, "Table created successfully!"
-    except pyodbc.Error as e:
-        error_message = str(e)
-        # Check if it's a table already exists error
-        if "already an object" in error_message.lower() or "already exists" in error_message.lower():
-            return False, "TABLE_EXISTS"
-        else:
-            return False, error_message
+        return execute_script(get_connection_pool(SQL_SERVER, db), sql_script)
     except Exception as e:
         return False, str(e)
 
@@ -111,58 +184,41 @@ def check_table_exists(table_name, database_name=None, prefix=None):
         # Use specified database or default
         db = database_name if database_name else SQL_DATABASE
         prefix_to_use = prefix if prefix is not None else st.session_state.get('table_prefix', DEFAULT_TABLE_PREFIX)
-        
-        conn_str = (
-            f"DRIVER={{ODBC Driver 17 for SQL Server}};"
-            f"SERVER={SQL_SERVER};"
-            f"DATABASE={db};"
-            f"UID={SQL_USERNAME};"
-            f"PWD={SQL_PASSWORD}"
-        )
-        
-        conn = pyodbc.connect(conn_str, timeout=10)
-        cursor = conn.cursor()
-        
-        # Check if table exists. Use upper-case to be consistent.
-        check_query = f"""
-        SELECT COUNT(*) 
-        FROM INFORMATION_SCHEMA.TABLES 
-        WHERE TABLE_NAME = '{(prefix_to_use + table_name).upper()}'
-        """
-        
-        cursor.execute(check_query)
-        result = cursor.fetchone()
-        
-        cursor.close()
-        conn.close()
-        
-        return result[0] > 0
+        return has_table(get_connection_pool(SQL_SERVER, db), prefix_to_use + table_name)
     except Exception as e:
         st.warning(f"Could not check if table exists: {e}")
         return False
 
 
+def run_per_database(func, database_names, parallel, *args, **kwargs):
+    """Call func(pool, *args, database_name=db, **kwargs) for each database on SQL_SERVER and collect the result rows"""
+    # Pools are looked up here, on the script thread, and handed to the workers
+    pools = {db: get_connection_pool(SQL_SERVER, db) for db in database_names}
+    return run_on_pools(func, pools, parallel, *args, **kwargs)
+
+
+def bulk_deploy(scripts, database_names, batch_size=BULK_DEPLOY_BATCH_SIZE, parallel=False):
+    """Deploy the same set of CREATE scripts to one or more databases on SQL_SERVER"""
+    return run_per_database(bulk_create_tables, database_names, parallel, scripts, batch_size=batch_size)
+
+
+def diff_existing_table(table_name, conv_df, database_name, prefix, keys=None, options=None):
+    """ALTER script for one existing table ("" if it already matches)"""
+    target = f"{prefix}{table_name}".upper()
+    existing = fetch_table_columns(get_connection_pool(SQL_SERVER, database_name), [target])
+    return build_alter_statements(target, conv_df, existing.get(target, {}), keys, options)
+
+
+@st.cache_data(ttl=DATABASE_LIST_TTL_SECONDS, show_spinner=False)
+def fetch_databases(server):
+    """Query the user databases on a server (cached briefly across reruns)"""
+    return list_databases(get_connection_pool(server, "master"))
+
+
 def get_databases():
     """Get list of databases from SQL Server"""
     try:
-        conn_str = (
-            f"DRIVER={{ODBC Driver 17 for SQL Server}};"
-            f"SERVER={SQL_SERVER};"
-            f"DATABASE=master;"
-            f"UID={SQL_USERNAME};"
-            f"PWD={SQL_PASSWORD}"
-        )
-        
-        conn = pyodbc.connect(conn_str, timeout=5)
-        cursor = conn.cursor()
-        
-        cursor.execute("SELECT name FROM sys.databases WHERE name NOT IN ('master', 'tempdb', 'model', 'msdb') ORDER BY name")
-        databases = [row[0] for row in cursor.fetchall()]
-        
-        cursor.close()
-        conn.close()
-        
-        return databases
+        return fetch_databases(SQL_SERVER)
     except Exception as e:
         st.error(f"Error fetching databases: {e}")
         return []
@@ -170,288 +226,203 @@ def get_databases():
 
 # ---------- API Usage Tracking ----------
 
-def load_usage_counter():
-    """Load the API usage counter from file"""
-    if os.path.exists(COUNTER_FILE):
-        with open(COUNTER_FILE, 'r') as f:
-            data = json.load(f)
-            return data.get('count', 0), data.get('date', '')
-    return 0, ''
-
-
-def save_usage_counter(count):
-    """Save the API usage counter to file"""
-    today = datetime.now().strftime('%Y-%m-%d')
-    with open(COUNTER_FILE, 'w') as f:
-        json.dump({'count': count, 'date': today}, f)
-
-
-def check_and_update_counter():
-    """Check if we can make API call and update counter"""
-    count, last_date = load_usage_counter()
-    today = datetime.now().strftime('%Y-%m-%d')
-
-    # Reset counter if it's a new day
-    if last_date != today:
-        count = 0
-
-    # Check if limit reached
-    if count >= 100:
-        st.error("🚫 Daily API limit reached (100/100 searches used).")
-        st.warning("⏰ Please come back tomorrow. The counter will reset at midnight.")
-        st.info(f"📅 Current date: {today}")
+def check_and_update_counter(verbose=True):
+    """Reserve one API call from today's shared quota"""
+    if not reserve_quota(1):
+        if verbose:
+            st.error(f"🚫 Daily API limit reached ({DAILY_API_LIMIT}/{DAILY_API_LIMIT} searches used).")
+            st.warning("⏰ Falling back to HTML scraping. The quota resets at midnight.")
+            st.info(f"📅 Current date: {datetime.now().strftime('%Y-%m-%d')}")
         return False
-
-    # Increment counter
-    count += 1
-    save_usage_counter(count)
-    st.info(f"📊 API Usage: {count}/100 searches used today")
+    if verbose:
+        st.info(f"📊 API Usage: {get_quota_usage()['used']}/{DAILY_API_LIMIT} searches used today")
     return True
 
 
 # ---------- Utility Functions ----------
 
-def get_oracle_doc_url_scrape(table_name):
-    """Fallback Google HTML scraping"""
-    # Try exact table name first, only HTML pages
-    q = f'"{table_name}" site:docs.oracle.com/en/cloud/saas/ filetype:html'
+def get_oracle_doc_page_scrape(table_name, verbose=True):
+    """Fallback Google HTML scraping; best ranked page as a dict (url, confidence, verified) or None"""
     try:
-        res = requests.get("https://www.google.com/search", params={"q": q}, headers=USER_AGENT, timeout=10)
-        soup = BeautifulSoup(res.text, "html.parser")
-
-        # Look for links containing the table name
-        candidates = []
-        for a in soup.select("a"):
-            href = a.get("href", "")
-            if "docs.oracle.com/en/cloud/saas/" in href and ".html" in href:
-                m = re.search(r"https://docs\.oracle\.com[^&]+\.html", href)
-                if m:
-                    url = m.group(0)
-                    # Skip Excel, PDF, and other non-HTML files
-                    if any(ext in url.lower() for ext in ['.xlsx', '.pdf', '.zip', '.xml']):
-                        continue
-                    # Skip index and overview pages
-                    if any(skip in url.lower() for skip in ['index.html', 'toc.html', 'preface']):
-                        continue
-
-                    # Calculate match score
-                    table_name_clean = table_name.lower().replace("_", "")
-                    url_lower = url.lower()
-
-                    # Exact match in URL gets highest score
-                    if table_name_clean in url_lower.replace("-", "").replace("_", ""):
-                        return url
-
-                    candidates.append(url)
-
-        # Return first candidate if found
-        if candidates:
-            return candidates[0]
-
+        return search_doc_page_scrape(table_name)
     except Exception as e:
-        st.warning(f"HTML scraping failed: {e}")
+        if verbose:
+            st.warning(f"HTML scraping failed: {e}")
     return None
 
 
-def get_oracle_doc_url_api(table_name, api_key, cse_id):
+def get_oracle_doc_page_api(table_name, api_key, cse_id, verbose=True):
     """Google Custom Search API version"""
     try:
-        service = build("customsearch", "v1", developerKey=api_key)
-        # Search for exact phrase, only HTML files
-        query = f'"{table_name}" site:docs.oracle.com/en/cloud/saas/ filetype:html'
-        res = service.cse().list(q=query, cx=cse_id, num=10).execute()
+        return search_doc_page_api(table_name, api_key, cse_id)
+    except Exception as e:
+        if verbose and "quota" in str(e).lower():
+            st.error("🚫 Google API quota exceeded. The daily limit has been reached.")
+            st.warning("⏰ Please come back tomorrow or use the HTML scraping method (toggle off the API option).")
+        raise e
 
-        # Filter and prioritize results
-        candidates = []
-        for item in res.get("items", []):
-            link = item.get("link", "")
 
-            # Must be from Oracle docs and HTML
-            if "docs.oracle.com/en/cloud/saas/" not in link or not link.endswith(".html"):
-                continue
+def scrape_columns(table_name, url, verbose=True, stale_entry=None, confidence=None):
+    """Extract the columns and keys tables from the Oracle doc page (revalidating a stale cache entry) and cache them
 
-            # Skip Excel, PDF, and other non-HTML files
-            if any(ext in link.lower() for ext in ['.xlsx', '.pdf', '.zip', '.xml']):
-                continue
+    Returns (columns DataFrame, keys DataFrame or None).
+    """
+    try:
+        df, page = load_columns(table_name, url, stale_entry, confidence)
+        if page["status"] == 304:
+            if verbose:
+                st.info("♻️ Page unchanged since it was cached (304 Not Modified) - using cached column details")
+            return df, page["keys"]
+
+        # Debug: Show the tables checked before the columns table was found
+        if verbose:
+            st.info(f"Checked {len(page['inspected'])} table(s) on the page")
+            for idx, headers in enumerate(page["inspected"]):
+                st.write(f"Table {idx + 1} headers: {headers}")
 
-            # Skip index and overview pages
-            if any(skip in link.lower() for skip in ['index.html', 'toc.html', 'preface', 'overview']):
-                continue
+        if df.empty:
+            if verbose:
+                st.error("❌ No suitable columns table found")
+            return df, None
+        if verbose:
+            st.success("✅ Found columns table")
+            st.write(f"Shape: {df.shape}, Columns: {list(df.columns)}")
+            st.write(f"Primary key / indexes found: {0 if page['keys'] is None else len(page['keys'])}")
+        return df, page["keys"]
+    except Exception as e:
+        if verbose:
+            st.error(f"Error scraping columns: {e}")
+        return pd.DataFrame(), None
 
-            # Check if table name appears in URL (clean comparison)
-            table_name_clean = table_name.lower().replace("_", "")
-            url_clean = link.lower().replace("-", "").replace("_", "")
 
-            # Exact match gets returned immediately
-            if table_name_clean in url_clean:
-                return link
+# ---------- Memoized Stages ----------
+# Keyed on the content of their inputs; the type_mappings.json mtime is part of the key
+# so an edited mapping file is never served from stale results.
 
-            candidates.append(link)
+@st.cache_data(max_entries=STAGE_CACHE_MAX_ENTRIES, show_spinner=False)
+def convert_columns_cached(df, profile_name, mappings_mtime):
+    """convert_oracle_types for a columns table and profile"""
+    return convert_oracle_types(df, get_profile(profile_name))
 
-        # Return first valid candidate
-        if candidates:
-            return candidates[0]
 
-        return None
+@st.cache_data(max_entries=STAGE_CACHE_MAX_ENTRIES, show_spinner=False)
+def build_scripts_cached(table_name, conv, prefix, keys, options, storage):
+    """(CREATE TABLE script, post-load key / index script) for converted columns"""
+    return (build_create_table(table_name, conv, prefix, keys, options, storage),
+            build_post_load_script(table_name, conv, prefix, keys, options, storage))
 
-    except HttpError as e:
-        if "quota" in str(e).lower():
-            st.error("🚫 Google API quota exceeded. The daily limit has been reached.")
-            st.warning("⏰ Please come back tomorrow or use the HTML scraping method (toggle off the API option).")
-        raise e
-    return None
 
+@st.cache_data(max_entries=STAGE_CACHE_MAX_ENTRIES, show_spinner=False)
+def row_width_cached(df, conv, profile_name, mappings_mtime):
+    """compare_row_width of converted columns against the default profile"""
+    return compare_row_width(df, conv, get_profile(profile_name))
 
-def scrape_columns(url):
-    """Extract the columns table from the Oracle doc page"""
-    try:
-        res = requests.get(url, headers=USER_AGENT, timeout=15)
-        soup = BeautifulSoup(res.text, "html.parser")
-
-        # Debug: Show all tables found
-        tables = soup.find_all("table")
-        st.info(f"Found {len(tables)} table(s) on the page")
-
-        # Try multiple strategies to find the columns table
-        for idx, t in enumerate(tables):
-            headers = [th.get_text().strip().upper() for th in t.find_all("th")]
-            st.write(f"Table {idx + 1} headers: {headers}")
-
-            # Look specifically for the Columns table (has Name, Datatype, Length, etc.)
-            if "NAME" in headers and "DATATYPE" in headers:
-                try:
-                    df = pd.read_html(str(t))[0]
-                    st.success(f"✅ Found columns table (Table {idx + 1})")
-                    st.write(f"Shape: {df.shape}, Columns: {list(df.columns)}")
-                    return df
-                except Exception as e:
-                    st.warning(f"Could not parse table {idx + 1}: {e}")
-                    continue
-
-        st.error("❌ No suitable columns table found")
-        return pd.DataFrame()
-    except Exception as e:
-        st.error(f"Error scraping columns: {e}")
-        return pd.DataFrame()
 
+def clear_stage_caches():
+    """Drop every memoized stage result (after clearing the lookup cache)"""
+    for cached_func in (convert_columns_cached, build_scripts_cached, row_width_cached, read_export_file):
+        cached_func.clear()
+    clear_page_memo()
 
-def convert_datatypes(df):
-    """Convert Oracle data types → SQL Server types"""
-    st.write("🔍 **Original DataFrame:**")
-    st.dataframe(df.head(10))
 
-    # Normalize column names
-    df.columns = [c.strip().upper().replace(" ", "_").replace("-", "_") for c in df.columns]
-    st.write(f"📋 Normalized columns: {list(df.columns)}")
+def convert_datatypes(df, verbose=True, profile_name=None):
+    """Convert Oracle data types → SQL Server types using a mapping profile (default: by prefix)"""
+    if verbose:
+        st.write("🔍 **Original DataFrame:**")
+        st.dataframe(df.head(10))
 
-    # The Oracle docs have these exact column names
-    colname_col = "NAME"
-    dtype_col = "DATATYPE"
-    length_col = "LENGTH"
-    precision_col = "PRECISION"
-    notnull_col = "NOT_NULL"
-    comments_col = "COMMENTS"
+    # Normalize column names
+    df.columns = normalize_column_names(df.columns)
+    if verbose:
+        st.write(f"📋 Normalized columns: {list(df.columns)}")
 
     # Verify columns exist
-    if colname_col not in df.columns or dtype_col not in df.columns:
-        st.error(f"❌ Required columns missing. Found: {list(df.columns)}")
+    if "NAME" not in df.columns or "DATATYPE" not in df.columns:
+        if verbose:
+            st.error(f"❌ Required columns missing. Found: {list(df.columns)}")
         return pd.DataFrame()
 
-    st.write(f"🎯 Using columns - Name: {colname_col}, Type: {dtype_col}, Length: {length_col}")
+    profile = get_profile(profile_name, prefix=st.session_state.get('table_prefix', DEFAULT_TABLE_PREFIX))
+    if verbose:
+        st.write(f"🎯 Using columns - Name: NAME, Type: DATATYPE, Length: LENGTH | Mapping profile: {profile['name']}")
 
-    converted = []
-    for _, row in df.iterrows():
-        colname = str(row.get(colname_col, "")).strip()
-        dtype = str(row.get(dtype_col, "")).strip().upper()
-        length = str(row.get(length_col, "")).strip() if length_col in df.columns else ""
-        precision = str(row.get(precision_col, "")).strip() if precision_col in df.columns else ""
-        notnull = str(row.get(notnull_col, "")).strip() if notnull_col in df.columns else ""
-        comments = str(row.get(comments_col, "")).strip() if comments_col in df.columns else ""
+    result_df = convert_columns_cached(df, profile["name"], load_type_mappings()["mtime"])
+    if verbose:
+        st.write("✅ **Converted Data Types:**")
+        st.dataframe(result_df)
+    return result_df
 
-        if not colname or colname == "NAN":
-            continue
 
-        sqltype = dtype
+def generate_sql(table_name, df, prefix=None, keys=None, options=None, storage=None):
+    """Build CREATE TABLE SQL (with keys, indexes and comments per options, storage per profile) and the post-load script
 
-        # VARCHAR conversion with exact rules
-        if "VARCHAR" in dtype:
-            # Try to get length from the Length column first
-            n = None
-            if length and length.isdigit():
-                n = int(length)
-            else:
-                # Try to extract from datatype itself (e.g., VARCHAR2(64))
-                m = re.search(r"\((\d+)\)", dtype)
-                if m:
-                    n = int(m.group(1))
-
-            if n == 1:
-                sqltype = "VARCHAR(1)"
-            elif n and 2 <= n <= 240:
-                sqltype = "NVARCHAR(240)"
-            elif n and n > 240:
-                sqltype = f"NVARCHAR({n})"
-            else:
-                sqltype = "NVARCHAR(240)"
-
-        # NUMBER conversion with exact rules
-        elif "NUMBER" in dtype:
-            # Try to get precision
-            prec = None
-            if precision and precision.isdigit():
-                prec = int(precision)
-            else:
-                # Try to extract from datatype itself (e.g., NUMBER(10))
-                m = re.search(r"\((\d+)", dtype)
-                if m:
-                    prec = int(m.group(1))
+    Uses the provided prefix (or the session prefix); returns (create script, post-load script).
+    """
+    prefix_to_use = prefix if prefix is not None else st.session_state.get('table_prefix', DEFAULT_TABLE_PREFIX)
+    return build_scripts_cached(table_name, df, prefix_to_use, keys, options, storage)
 
-            if prec and prec > 4:
-                sqltype = "BIGINT"
-            else:
-                sqltype = "FLOAT"
 
-        # DATE conversion
-        elif "DATE" in dtype:
-            sqltype = "DATETIME"
+def show_table_diff(table_name, database_name, prefix):
+    """Compare an existing table with the generated columns and keep the ALTER script for the apply step"""
+    try:
+        alter_sql = diff_existing_table(table_name, st.session_state.conv_df, database_name, prefix,
+                                        st.session_state.keys_df, ddl_opts)
+    except Exception as e:
+        st.warning(f"Could not compare with the existing table: {e}")
+        st.warning("⚠️ Please search for another table or drop the existing table first.")
+        return
 
-        # TIMESTAMP conversion
-        elif "TIMESTAMP" in dtype:
-            sqltype = "DATETIME"
+    if alter_sql:
+        st.session_state.alter_script = alter_sql
+        st.session_state.alter_database = database_name
+    else:
+        st.success("✅ The existing table already matches the generated columns - nothing to change.")
+        st.info("💡 Tip: Click '🔄 Start New Search' above to search for a different table.")
 
-        # Keep original if no match
-        else:
-            sqltype = dtype
-
-        converted.append({
-            "COLUMN_NAME": colname,
-            "ORACLE_TYPE": dtype,
-            "LENGTH": length if length else "",
-            "PRECISION": precision if precision else "",
-            "NOT_NULL": notnull if notnull else "",
-            "SQL_SERVER_TYPE": sqltype,
-            "COMMENTS": comments if comments else ""
-        })
-
-    result_df = pd.DataFrame(converted)
-    st.write("✅ **Converted Data Types:**")
-    st.dataframe(result_df)
-    return result_df
 
+def show_paginated(df, key, page_size=RESULTS_PAGE_SIZE):
+    """Render one page of a DataFrame at a time so large results are not all sent to the browser"""
+    total = len(df)
+    if total <= page_size:
+        st.dataframe(df, use_container_width=True)
+        return
+    pages = math.ceil(total / page_size)
+    page = st.number_input(f"Page (1-{pages}):", min_value=1, max_value=pages, value=1, key=f"{key}_page")
+    start = (int(page) - 1) * page_size
+    st.dataframe(df.iloc[start:start + page_size], use_container_width=True)
+    st.caption(f"Rows {start + 1}-{min(start + page_size, total)} of {total}")
 
-def generate_sql(table_name, df, prefix=None):
-    """Build CREATE TABLE SQL using provided prefix (or session prefix)"""
-    if df.empty:
-        return "-- No columns to generate"
 
-    prefix_to_use = prefix if prefix is not None else st.session_state.get('table_prefix', DEFAULT_TABLE_PREFIX)
-    lines = [f"CREATE TABLE {prefix_to_use}{table_name.upper()} ("]
-    for _, r in df.iterrows():
-        lines.append(f"    {r['COLUMN_NAME']} {r['SQL_SERVER_TYPE']},")
-    if len(lines) > 1:
-        lines[-1] = lines[-1].rstrip(",")
-    lines.append(");")
-    return "\n".join(lines)
+def stage_totals_frame(stages):
+    """Calls, errors, total/average/max seconds per stage from metrics.snapshot()["stages"]"""
+    df = pd.DataFrame.from_dict(stages, orient="index").rename_axis("STAGE").reset_index()
+    df["avg_seconds"] = df["seconds"] / df["calls"]
+    return df.rename(columns=str.upper).round(4)
+
+
+def use_table_name(name):
+    """Put a suggested table name into the table name input"""
+    st.session_state.table_name_input = name
+
+
+def send_to_batch(names):
+    """Replace the batch mode table list with the names a wildcard pattern matched"""
+    st.session_state.batch_text = "\n".join(names)
+
+
+@st.cache_resource(max_entries=EXPORT_CACHE_MAX_ENTRIES, show_spinner=False)
+def read_export_file(path):
+    """Bytes of an export file; the path holds the content fingerprint, so reruns share one copy"""
+    with open(path, "rb") as f:
+        return f.read()
+
+
+def read_export(exports, kind, results):
+    """Bytes of a prebuilt export for st.download_button, rebuilt if its folder was pruned meanwhile"""
+    try:
+        return read_export_file(exports[kind])
+    except FileNotFoundError:
+        return read_export_file(build_exports(results)[kind])
 
 
 # ---------- Streamlit UI ----------
@@ -479,6 +450,11 @@ with st.expander("🔌 SQL Server Connection", expanded=False):
                 st.info(f"Connected to: {SQL_SERVER}")
             else:
                 st.error(f"❌ Connection failed: {message}")
+    pool_stats = get_connection_pool(SQL_SERVER, SQL_DATABASE).stats()
+    st.caption(
+        f"Connection pool ({SQL_DATABASE}): {pool_stats['idle']} idle, {pool_stats['in_use']} in use, "
+        f"max {pool_stats['max_size']} | opened {pool_stats['created']}, reused {pool_stats['reused']}"
+    )
 
 # Prefix input area
 st.write("---")
@@ -491,18 +467,110 @@ if prefix_input and not prefix_input.endswith("_"):
     st.info("Tip: it's common to end the prefix with an underscore (e.g., ST_FN_). You can omit it if you prefer.")
 # Note: we don't force an underscore; we just show helpful tip.
 
-table_name_input = st.text_input("Enter Oracle Table Name (e.g. AP_INVOICES_ALL):").strip()
+# Type mapping profile from type_mappings.json; defaults to the profile configured for the prefix
+mapping_profiles = list_profiles()
+mapping_profile = st.selectbox(
+    "Type mapping profile:",
+    options=mapping_profiles,
+    index=mapping_profiles.index(profile_for_prefix(prefix_input or st.session_state.table_prefix)),
+    help="Profiles are defined in type_mappings.json (e.g. 'standard', 'precise', 'original')."
+)
+
+# Keys, indexes, NOT NULL and comments taken from the doc page
+with st.expander("🔑 Keys, indexes and comments", expanded=False):
+    ddl_opts = {
+        "not_null": st.checkbox("NOT NULL columns", value=DDL_OPTIONS["not_null"], key="ddl_not_null"),
+        "primary_key": st.checkbox("Clustered primary key", value=DDL_OPTIONS["primary_key"], key="ddl_primary_key"),
+        "indexes": st.checkbox("Nonclustered indexes", value=DDL_OPTIONS["indexes"], key="ddl_indexes"),
+        "comments": st.checkbox("Column comments (MS_Description extended properties)", value=DDL_OPTIONS["comments"], key="ddl_comments"),
+        "indexes_after_load": st.checkbox(
+            "Create the primary key and indexes after the bulk load (separate post-load script)",
+            value=DDL_OPTIONS["indexes_after_load"], key="ddl_indexes_after_load"
+        ),
+    }
+
+# Compression, columnstore and partitioning from storage_profiles.json
+with st.expander("🧱 Storage (compression, columnstore, partitioning)", expanded=False):
+    storage_choice = st.selectbox(
+        "Storage profile:",
+        options=[AUTO_STORAGE] + list_storage_profiles(),
+        key="storage_profile",
+        help="Profiles and the name / row-count rules are defined in storage_profiles.json."
+    )
+    storage_profile = None if storage_choice == AUTO_STORAGE else storage_choice
+    row_count_hint = st.number_input("Expected row count of the table (0 = unknown, single table only):",
+                                     min_value=0, value=0, step=1000000, key="row_count_hint")
+    partition_column_input = st.text_input("Partition column (blank = automatic, single table only):",
+                                           key="partition_column").strip()
+
+table_name_input = st.text_input("Enter Oracle Table Name (e.g. AP_INVOICES_ALL):", key="table_name_input").strip()
+
+# Known table names (offline index, cache, earlier runs): catch typos and partial names before any search
+name_index = get_name_index()
+typo_matches = []
+if table_name_input and is_wildcard(table_name_input):
+    wildcard_matches = name_index.expand(table_name_input)
+    st.caption(f"🔎 {len(wildcard_matches)} known table(s) match {table_name_input.upper()}"
+               + (f": {', '.join(wildcard_matches[:10])}{' ...' if len(wildcard_matches) > 10 else ''}" if wildcard_matches else ""))
+    if wildcard_matches:
+        st.button("📦 Send to batch mode", key="wildcard_to_batch_btn", on_click=send_to_batch, args=(wildcard_matches,))
+elif table_name_input and len(name_index) and table_name_input not in name_index:
+    typo_matches = name_index.typo_of(table_name_input)
+    name_suggestions = name_index.suggest(table_name_input)
+    if name_suggestions:
+        st.caption("Did you mean:")
+        suggestion_cols = st.columns(min(len(name_suggestions), 4))
+        for idx, suggestion in enumerate(name_suggestions):
+            suggestion_cols[idx % len(suggestion_cols)].button(suggestion, key=f"suggest_{suggestion}",
+                                                               on_click=use_table_name, args=(suggestion,))
+    if typo_matches:
+        st.checkbox(f"Search for {table_name_input.upper()} anyway", key="search_anyway")
 
 use_google_api = st.toggle("Use Google Custom Search API (Free 100 queries/day)")
 
 # Show current usage if API is enabled
 if use_google_api:
-    count, last_date = load_usage_counter()
-    today = datetime.now().strftime('%Y-%m-%d')
-    if last_date == today:
-        st.info(f"📊 Current usage today: {count}/100 searches")
+    usage = get_quota_usage()
+    st.info(f"📊 Current usage today: {usage['used']}/{usage['limit']} searches ({usage['remaining']} left, shared by all sessions)")
+
+# Local cache of previous lookups
+force_refresh = st.checkbox("♻️ Force refresh (ignore the offline index and cached results)", key="force_refresh")
+show_debug = st.checkbox("🐞 Show debug output (page tables, raw and converted columns)", key="show_debug")
+with st.expander("🗃️ Local Cache", expanded=False):
+    cache_hits, cache_misses, cache_entries = get_cache_stats()
+    st.write(f"Cached tables: **{cache_entries}** | Hits: **{cache_hits}** | Misses: **{cache_misses}**")
+    st.write(f"Offline index: **{count_indexed_tables()}** table(s) (build with `python oracle_doc_index.py build --mirror <folder>`)")
+    st.write(f"Known table names for suggestions and wildcards: **{len(name_index)}**")
+    if st.button("Clear Cache", key="clear_cache_btn"):
+        clear_cache()
+        clear_stage_caches()
+        st.rerun()
+
+if METRICS_PORT:
+    start_metrics_endpoint(METRICS_PORT)
+with st.expander("⏱️ Pipeline Metrics", expanded=False):
+    snapshot = metrics.snapshot()
+    if snapshot["stages"]:
+        st.caption("All runs in this server process since start (or the last reset)")
+        st.dataframe(stage_totals_frame(snapshot["stages"]), use_container_width=True)
+        st.write(snapshot["counters"])
     else:
-        st.info(f"📊 Current usage today: 0/100 searches (counter reset)")
+        st.write("No stages recorded yet.")
+    if METRICS_PORT:
+        st.write(f"Prometheus endpoint: `http://<this host>:{METRICS_PORT}/metrics`")
+    mcol1, mcol2 = st.columns(2)
+    with mcol1:
+        st.download_button(
+            label="📥 Download Prometheus metrics",
+            data=metrics.to_prometheus().encode("utf-8"),
+            file_name="table_script_metrics.prom",
+            mime="text/plain",
+            key="download_metrics"
+        )
+    with mcol2:
+        if st.button("Reset Metrics", key="reset_metrics_btn"):
+            metrics.reset()
+            st.rerun()
 
 # Add a "Start New Search" button to reset
 if st.session_state.results_ready:
@@ -512,6 +580,11 @@ if st.session_state.results_ready:
         st.session_state.sql_script = None
         st.session_state.table_name = None
         st.session_state.doc_url = None
+        st.session_state.alter_script = None
+        st.session_state.keys_df = None
+        st.session_state.post_load_script = None
+        st.session_state.storage = None
+        st.session_state.width_report = None
         # keep the prefix in session_state so it remains as default for the next search
         st.rerun()
 
@@ -519,77 +592,128 @@ if st.button("Generate") and not st.session_state.results_ready:
     if not table_name_input:
         st.error("Please enter a table name.")
         st.stop()
+    if is_wildcard(table_name_input):
+        st.error("Wildcard patterns are generated in batch mode - use 📦 Send to batch mode.")
+        st.stop()
+    if typo_matches and not st.session_state.get("search_anyway"):
+        st.warning(f"⚠️ {table_name_input.upper()} is not a known table - did you mean {' or '.join(typo_matches[:3])}? "
+                   "Pick a suggestion or tick 'anyway' to search for it (no search quota used so far).")
+        st.stop()
 
     # Update and persist prefix chosen by user BEFORE generation
     chosen_prefix = prefix_input if prefix_input else st.session_state.table_prefix
     # Save the chosen prefix in session_state so next searches use it
     st.session_state.table_prefix = chosen_prefix
 
-    with st.spinner("🔍 Searching Oracle documentation..."):
-        url = None
-
-        # Use Google API if enabled
-        if use_google_api:
-            # Check credentials
-            if not credentials_configured:
-                st.error("❌ Please configure your Google API credentials in the code first!")
-                st.info("Edit lines 19-20 in the script to add your API key and CSE ID.")
-                st.stop()
-
-            # Check usage limit
-            if not check_and_update_counter():
+    # Stage timings of this run, shown with the results
+    with trace() as run_trace:
+        st.session_state.last_trace = run_trace
+        with st.spinner("🔍 Searching Oracle documentation..."):
+            url = None
+            match = None
+            confidence = None
+            cached_df = None
+            keys = None
+            stale_entry = None
+
+            # Offline index first, then the local cache, unless a refresh was requested
+            if not force_refresh:
+                cached = lookup_table_entry(table_name_input)
+                if cached:
+                    st.info("📚 Found in offline documentation index (no search needed)")
+                    confidence = CONFIDENCE_INDEXED
+                else:
+                    cached = cache_get_entry(table_name_input)
+                    if cached and cached["stale"]:
+                        st.info("♻️ Cached documentation link has expired - the page will be revalidated")
+                        stale_entry = cached
+                        cached = {"url": stale_entry["url"], "columns": None, "keys": None,
+                                  "confidence": stale_entry["confidence"]}
+                    elif cached:
+                        st.info("⚡ Using cached documentation link (no search quota used)")
+                    if cached:
+                        confidence = cached["confidence"]
+                if cached:
+                    url, cached_df, keys = cached["url"], cached["columns"], cached["keys"]
+                    if confidence is None:
+                        confidence = url_confidence(table_name_input, url)
+
+            # Use Google API if enabled
+            if use_google_api and not url:
+                # Check credentials
+                if not credentials_configured:
+                    st.error("❌ Please configure your Google API credentials in the code first!")
+                    st.info("Edit lines 19-20 in the script to add your API key and CSE ID.")
+                    st.stop()
+
+                # Check usage limit, then make the API call (HTML scraping below if either fails)
+                if check_and_update_counter():
+                    try:
+                        match = get_oracle_doc_page_api(table_name_input, GOOGLE_API_KEY, GOOGLE_CSE_ID)
+                    except Exception as e:
+                        st.warning(f"Google API search failed: {e}. Falling back to HTML scraping.")
+
+            # Use HTML scraping if API not used or failed
+            if not (url or match):
+                st.info("🔄 Using HTML scraping method...")
+                match = get_oracle_doc_page_scrape(table_name_input)
+            if match:
+                url, confidence = match["url"], match["confidence"]
+
+            if not url:
+                st.error("❌ No valid Oracle documentation link found.")
+                st.info(f"💡 Try searching manually at: https://docs.oracle.com/en/cloud/saas/")
+                st.info(f"🔍 Search term used: {table_name_input}")
                 st.stop()
 
-            # Make API call
-            try:
-                url = get_oracle_doc_url_api(table_name_input, GOOGLE_API_KEY, GOOGLE_CSE_ID)
-            except Exception as e:
-                st.warning(f"Google API search failed: {e}. Falling back to HTML scraping.")
-
-        # Use HTML scraping if API not used or failed
-        if not url:
-            st.info("🔄 Using HTML scraping method...")
-            url = get_oracle_doc_url_scrape(table_name_input)
-
-        if not url:
-            st.error("❌ No valid Oracle documentation link found.")
-            st.info(f"💡 Try searching manually at: https://docs.oracle.com/en/cloud/saas/")
-            st.info(f"🔍 Search term used: {table_name_input}")
-            st.stop()
-
-        # Check if table name appears in URL (remove underscores for comparison)
-        table_name_clean = table_name_input.replace("_", "").lower()
-        url_clean = url.replace("-", "").replace("_", "").lower()
-
-        if table_name_clean in url_clean:
-            st.success(f"✅ Found documentation: [{url}]({url})")
-        else:
-            st.warning(f"⚠️ Found documentation (URL doesn't contain exact table name): [{url}]({url})")
-            st.info(f"🔍 Searched for: {table_name_input}")
-            st.info("This might still be correct - Oracle URLs often have different formatting.")
-
-        st.session_state.doc_url = url
+            # Confidence comes from the page's file name / title (checked with a partial GET when unsure)
+            if confidence >= CONFIDENCE_VERIFIED:
+                st.success(f"✅ Found documentation ({confidence:.0%} confidence): [{url}]({url})")
+                record_table_name(table_name_input)
+            else:
+                st.warning(f"⚠️ Found documentation, but only {confidence:.0%} confidence it is this table's page: [{url}]({url})")
+                st.info(f"🔍 Searched for: {table_name_input}")
+                st.info("Neither the page's file name nor its title matched the table name exactly - please check the page.")
 
-    with st.spinner("📄 Extracting column details..."):
-        df = scrape_columns(url)
-        if df.empty:
-            st.error("❌ Could not find or parse the columns table on the page.")
-            st.info("Please check the URL manually to verify the table structure.")
-            st.stop()
+            st.session_state.doc_url = url
 
-        conv = convert_datatypes(df)
-        if conv.empty:
-            st.error("❌ No valid columns were converted.")
-            st.stop()
+        with st.spinner("📄 Extracting column details..."):
+            if cached_df is not None:
+                st.info("⚡ Using cached column details")
+                df = cached_df
+            else:
+                df, keys = scrape_columns(table_name_input, url, verbose=show_debug, stale_entry=stale_entry,
+                                          confidence=confidence)
+            if df.empty:
+                st.error("❌ Could not find or parse the columns table on the page.")
+                st.info("Please check the URL manually to verify the table structure.")
+                st.stop()
 
-        # Generate SQL using chosen prefix
-        sql_script = generate_sql(table_name_input, conv, prefix=st.session_state.table_prefix)
+            conv = convert_datatypes(df, verbose=show_debug, profile_name=mapping_profile)
+            if conv.empty:
+                st.error("❌ No valid columns were converted.")
+                st.stop()
 
-        # Store in session state
-        st.session_state.conv_df = conv
-        st.session_state.sql_script = sql_script
-        st.session_state.table_name = table_name_input
-        st.session_state.results_ready = True
+            storage = get_storage_profile(storage_profile, table_name_input, int(row_count_hint) or None,
+                                          partition_column_input or None)
+            st.info(f"🧱 Storage profile: **{storage['name']}** - {storage['description']}")
+
+            # Generate SQL using chosen prefix
+            sql_script, post_load_script = generate_sql(table_name_input, conv, prefix=st.session_state.table_prefix,
+                                                        keys=keys, options=ddl_opts, storage=storage)
+
+            # Store in session state
+            st.session_state.conv_df = conv
+            st.session_state.sql_script = sql_script
+            st.session_state.keys_df = keys
+            st.session_state.post_load_script = post_load_script
+            st.session_state.storage = storage["name"]
+            st.session_state.width_report = row_width_cached(
+                df, conv, get_profile(mapping_profile, prefix=st.session_state.table_prefix)["name"],
+                load_type_mappings()["mtime"]
+            )
+            st.session_state.table_name = table_name_input
+            st.session_state.results_ready = True
 
         st.success(f"✅ Successfully extracted {len(conv)} columns!")
 
@@ -601,10 +725,49 @@ if st.session_state.results_ready and st.session_state.conv_df is not None:
     if st.session_state.doc_url:
         st.info(f"📄 Source: {st.session_state.doc_url}")
 
-    # Create Excel file
-    buf = BytesIO()
-    st.session_state.conv_df.to_excel(buf, index=False, engine='openpyxl')
-    buf.seek(0)
+    with st.expander(f"📋 Converted columns ({len(st.session_state.conv_df)})", expanded=False):
+        show_paginated(st.session_state.conv_df, key="conv_df")
+
+    width_report = st.session_state.width_report
+    if width_report is not None:
+        width = row_width_summary(width_report)
+        with st.expander(f"📏 Row width: {width['ROW_BYTES']} bytes ({width['ROW_BYTES_SAVED']:+d} saved vs default profile)", expanded=False):
+            wcol1, wcol2, wcol3 = st.columns(3)
+            wcol1.metric("Declared row size", f"{width['ROW_BYTES']} B")
+            wcol2.metric("With the default profile", f"{width['BASELINE_ROW_BYTES']} B")
+            wcol3.metric("Saved", f"{width['ROW_BYTES_SAVED']} B", f"{width['SAVED_PCT']}%")
+            st.caption("Variable-length columns are counted at their declared length, (MAX) types at 8000 bytes.")
+            show_paginated(width_report, key="width_report")
+
+    keys_df = st.session_state.keys_df
+    with st.expander(f"🔑 Primary key and indexes ({0 if keys_df is None else len(keys_df)})", expanded=False):
+        if keys_df is None:
+            st.write("Not available for this entry - use ♻️ Force refresh to read them from the doc page.")
+        elif keys_df.empty:
+            st.write("The doc page lists no primary key or indexes.")
+        else:
+            st.dataframe(keys_df, use_container_width=True)
+
+    run_trace = st.session_state.last_trace
+    if run_trace is not None and run_trace.stages:
+        with st.expander(f"⏱️ Timings ({sum(run_trace.totals().values()):.2f}s in pipeline stages)", expanded=False):
+            st.dataframe(pd.DataFrame(run_trace.stages), use_container_width=True)
+            if run_trace.counters:
+                st.write(run_trace.counters)
+
+    # Reused across reruns until the table or its conversion changes
+    export_rows = [{
+        "TABLE_NAME": st.session_state.table_name.upper(),
+        "TARGET_TABLE": f"{prefix_display}{st.session_state.table_name.upper()}",
+        "STATUS": "OK",
+        "COLUMNS": len(st.session_state.conv_df),
+        "STORAGE": st.session_state.storage or "",
+        "URL": st.session_state.doc_url or "",
+        "SQL": st.session_state.sql_script,
+        "POST_LOAD_SQL": st.session_state.post_load_script or "",
+        "CONVERTED": st.session_state.conv_df,
+    }]
+    exports = build_exports(export_rows)
 
     # Download buttons and Create Table button
     col1, col2, col3 = st.columns(3)
@@ -612,7 +775,7 @@ if st.session_state.results_ready and st.session_state.conv_df is not None:
     with col1:
         st.download_button(
             label="📥 Download Excel",
-            data=buf,
+            data=read_export(exports, "excel", export_rows),
             file_name=f"{st.session_state.table_name}_columns.xlsx",
             mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
             key="download_excel"
@@ -626,6 +789,14 @@ if st.session_state.results_ready and st.session_state.conv_df is not None:
             mime="text/plain",
             key="download_sql"
         )
+        if st.session_state.post_load_script:
+            st.download_button(
+                label="🔑 Download Post-load Index Script",
+                data=st.session_state.post_load_script.encode("utf-8"),
+                file_name=f"{st.session_state.table_name}_post_load.sql",
+                mime="text/plain",
+                key="download_post_load_sql"
+            )
 
     with col3:
         # Create table button with proper state management
@@ -658,8 +829,7 @@ if st.session_state.results_ready and st.session_state.conv_df is not None:
                     
                     if table_exists:
                         st.error(f"❌ Table **{prefix_in_use}{st.session_state.table_name}** already exists in database **{selected_db}**!")
-                        st.warning("⚠️ Please search for another table or drop the existing table first.")
-                        st.info("💡 Tip: Click '🔄 Start New Search' above to search for a different table.")
+                        show_table_diff(st.session_state.table_name, selected_db, prefix_in_use)
                     else:
                         with st.spinner(f"Creating table in {selected_db}..."):
                             success, message = execute_sql_script(st.session_state.sql_script, selected_db)
@@ -691,8 +861,7 @@ if st.session_state.results_ready and st.session_state.conv_df is not None:
                     
                     if table_exists:
                         st.error(f"❌ Table **{prefix_in_use}{st.session_state.table_name}** already exists in database **master**!")
-                        st.warning("⚠️ Please search for another table or drop the existing table first.")
-                        st.info("💡 Tip: Click '🔄 Start New Search' above to search for a different table.")
+                        show_table_diff(st.session_state.table_name, "master", prefix_in_use)
                     else:
                         with st.spinner("Creating table in master database..."):
                             success, message = execute_sql_script(st.session_state.sql_script, "master")
@@ -712,3 +881,342 @@ if st.session_state.results_ready and st.session_state.conv_df is not None:
                 if st.button("❌ Cancel", key="cancel_default_btn"):
                     st.session_state.show_db_selection = False
                     st.rerun()
+
+    # Incremental changes for a table that already exists
+    if st.session_state.alter_script:
+        st.write("---")
+        st.subheader(f"🧩 Changes for existing table in **{st.session_state.alter_database}**")
+        st.code(st.session_state.alter_script, language="sql")
+
+        col_alter1, col_alter2 = st.columns([1, 4])
+
+        with col_alter1:
+            if st.button("⚙️ Apply Changes", key="apply_alter_btn"):
+                with st.spinner(f"Altering table in {st.session_state.alter_database}..."):
+                    success, message = execute_sql_script(st.session_state.alter_script, st.session_state.alter_database)
+                if success:
+                    st.success(f"✅ Table **{prefix_display}{st.session_state.table_name}** altered in database: **{st.session_state.alter_database}**")
+                    st.session_state.alter_script = None
+                    st.session_state.show_db_selection = False
+                else:
+                    st.error(f"❌ Failed to alter table: {message}")
+
+        with col_alter2:
+            if st.button("❌ Dismiss", key="dismiss_alter_btn"):
+                st.session_state.alter_script = None
+                st.rerun()
+
+# ---------- Batch Mode UI ----------
+
+st.write("---")
+st.subheader("📦 Batch Mode (multiple tables)")
+
+batch_text = st.text_area("Paste Oracle table names (one per line, or comma separated):", key="batch_text")
+batch_file = st.file_uploader("...or upload a CSV/Excel file with a TABLE_NAME column:", type=["csv", "xlsx", "xls"], key="batch_file")
+batch_workers = st.number_input("Parallel workers:", min_value=1, max_value=32, value=BATCH_MAX_WORKERS, key="batch_workers")
+batch_skip_typos = st.checkbox("Skip names that look like typos of known tables (patterns such as AP_INVOICE% are always expanded)",
+                               value=True, key="batch_skip_typos")
+
+if st.button("Generate Batch", key="generate_batch_btn"):
+    batch_tables, expanded_patterns, skipped_typos = resolve_table_names(
+        parse_table_list(batch_text, batch_file), name_index, skip_typos=batch_skip_typos
+    )
+    # Kept in session state: the page reruns once the batch is done
+    st.session_state.batch_name_notes = [f"🔎 {pattern}: {len(matches)} known table(s)" for pattern, matches in expanded_patterns.items()]
+    if skipped_typos:
+        st.session_state.batch_name_notes.append("⚠️ Skipped unknown names: " + "; ".join(
+            f"{name} (did you mean {' or '.join(close[:3])}?)" for name, close in skipped_typos.items()
+        ))
+    if not batch_tables:
+        for note in st.session_state.batch_name_notes:
+            st.warning(note)
+        st.error("Please enter or upload at least one table name.")
+        st.stop()
+
+    if use_google_api and not credentials_configured:
+        st.error("❌ Please configure your Google API credentials in the code first!")
+        st.stop()
+
+    chosen_prefix = prefix_input if prefix_input else st.session_state.table_prefix
+    st.session_state.table_prefix = chosen_prefix
+
+    st.info(f"🚀 Generating {len(batch_tables)} table(s) with {batch_workers} worker(s)...")
+    progress = st.progress(0.0)
+    counts_placeholder = st.empty()
+    status_placeholder = st.empty()
+
+    # Redraw at most every BATCH_PROGRESS_REFRESH_SECONDS, showing only the most recent tables
+    batch_results = []
+    progress_rows = []
+    status_counts = {}
+    last_render = 0.0
+    for result in run_batch(batch_tables, chosen_prefix, use_google_api, max_workers=int(batch_workers), force_refresh=force_refresh, profile_name=mapping_profile, ddl_options=ddl_opts, storage_profile=storage_profile):
+        batch_results.append(result)
+        progress_rows.append({col: result[col] for col in BATCH_PROGRESS_COLUMNS})
+        status_counts[result["STATUS"]] = status_counts.get(result["STATUS"], 0) + 1
+        done = len(batch_results)
+        if time.perf_counter() - last_render >= BATCH_PROGRESS_REFRESH_SECONDS or done == len(batch_tables):
+            progress.progress(done / len(batch_tables), text=f"{done}/{len(batch_tables)} done (last: {result['TABLE_NAME']})")
+            counts_placeholder.write(" | ".join(f"**{status}**: {count}" for status, count in sorted(status_counts.items())))
+            status_placeholder.dataframe(pd.DataFrame(progress_rows[:-BATCH_PROGRESS_ROWS - 1:-1]), use_container_width=True)
+            last_render = time.perf_counter()
+
+    # Keep the report in the original input order
+    order = {name: idx for idx, name in enumerate(batch_tables)}
+    batch_results.sort(key=lambda r: order[r["TABLE_NAME"]])
+    st.session_state.batch_results = batch_results
+    st.rerun()
+
+if st.session_state.batch_results:
+    batch_report = pd.DataFrame(st.session_state.batch_results).drop(columns=BATCH_HIDDEN_COLUMNS)
+    ok_count = int((batch_report["STATUS"] == "OK").sum())
+    st.success(f"✅ Batch finished: {ok_count}/{len(batch_report)} table(s) generated")
+    for note in st.session_state.batch_name_notes:
+        st.info(note)
+    st.write(batch_report["STATUS"].value_counts().to_dict())
+    saved_bytes = int(batch_report["ROW_BYTES_SAVED"].sum())
+    if saved_bytes:
+        st.caption(f"📏 Declared row width saved compared with the default type profile: {saved_bytes} bytes over {ok_count} table(s)")
+    show_paginated(batch_report, key="batch_report")
+
+    # Where the batch spent its time, and the slowest tables per stage
+    timings = pd.DataFrame([{"TABLE_NAME": r["TABLE_NAME"], **r["TIMINGS"]} for r in st.session_state.batch_results]).set_index("TABLE_NAME")
+    if not timings.empty and len(timings.columns):
+        with st.expander("⏱️ Stage timings", expanded=False):
+            st.dataframe(timings.agg(["sum", "mean", "max"]).T.round(3), use_container_width=True)
+            slowest = timings.sum(axis=1).sort_values(ascending=False).head(20)
+            st.write("Slowest tables (seconds in pipeline stages):")
+            st.dataframe(timings.loc[slowest.index].round(3), use_container_width=True)
+            counters = pd.DataFrame([r["COUNTERS"] for r in st.session_state.batch_results]).sum()
+            if not counters.empty:
+                st.write(counters.to_dict())
+
+    # Column details one table (and one page) at a time
+    converted_tables = [r for r in st.session_state.batch_results if r["STATUS"] == "OK"]
+    if converted_tables:
+        with st.expander("📋 Converted columns by table", expanded=False):
+            detail = st.selectbox(
+                "Table:",
+                options=range(len(converted_tables)),
+                format_func=lambda i: f"{converted_tables[i]['TARGET_TABLE']} ({converted_tables[i]['COLUMNS']} columns)",
+                key="batch_detail_table"
+            )
+            show_paginated(converted_tables[detail]["CONVERTED"], key=f"batch_detail_{detail}")
+
+    exports = build_exports(st.session_state.batch_results)
+    bcol1, bcol2, bcol3, bcol4, bcol5 = st.columns(5)
+
+    with bcol1:
+        st.download_button(
+            label="📄 Download Combined SQL",
+            data=read_export(exports, "sql", st.session_state.batch_results),
+            file_name="batch_create.sql",
+            mime="text/plain",
+            key="download_batch_sql"
+        )
+        if any(r.get("POST_LOAD_SQL") for r in st.session_state.batch_results):
+            st.download_button(
+                label="🔑 Download Post-load Index Script",
+                data=read_export(exports, "post_load", st.session_state.batch_results),
+                file_name="batch_post_load.sql",
+                mime="text/plain",
+                key="download_batch_post_load"
+            )
+
+    with bcol2:
+        st.download_button(
+            label="🗜️ Download Scripts (zip)",
+            data=read_export(exports, "zip", st.session_state.batch_results),
+            file_name="batch_create_scripts.zip",
+            mime="application/zip",
+            key="download_batch_zip"
+        )
+
+    with bcol3:
+        st.download_button(
+            label="📥 Download Excel (all tables)",
+            data=read_export(exports, "excel", st.session_state.batch_results),
+            file_name="batch_columns.xlsx",
+            mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
+            key="download_batch_excel"
+        )
+
+    with bcol4:
+        st.download_button(
+            label="📥 Download Status Report",
+            data=batch_report.to_csv(index=False).encode("utf-8"),
+            file_name="batch_status.csv",
+            mime="text/csv",
+            key="download_batch_report"
+        )
+
+    with bcol5:
+        if st.button("🧹 Clear Batch Results", key="clear_batch_btn"):
+            st.session_state.batch_results = None
+            st.session_state.deploy_results = None
+            st.session_state.diff_results = None
+            st.session_state.load_results = None
+            st.session_state.fanout_results = None
+            st.session_state.batch_name_notes = []
+            st.rerun()
+
+    # Bulk deploy of the generated scripts
+    with st.expander("🗄️ Deploy batch to SQL Server", expanded=False):
+        deploy_dbs = st.multiselect("Target database(s):", options=get_databases() or [SQL_DATABASE], key="deploy_dbs")
+        deploy_batch_size = st.number_input("Tables per transaction:", min_value=1, max_value=500, value=BULK_DEPLOY_BATCH_SIZE, key="deploy_batch_size")
+        deploy_parallel = st.checkbox("Deploy to databases in parallel", value=True, key="deploy_parallel")
+        deploy_mode = st.radio(
+            "Mode:",
+            options=["Create missing tables", "Compare existing tables (ALTER)"],
+            horizontal=True,
+            key="deploy_mode"
+        )
+
+        if deploy_mode == "Compare existing tables (ALTER)":
+            if st.button("🔍 Compare with SQL Server", key="diff_batch_btn"):
+                ok_results = [r for r in st.session_state.batch_results if r["STATUS"] == "OK"]
+                converted = {r["TARGET_TABLE"]: r["CONVERTED"] for r in ok_results}
+                if not deploy_dbs:
+                    st.error("Please select at least one database.")
+                elif not converted:
+                    st.error("There are no generated tables to compare.")
+                else:
+                    with st.spinner(f"Comparing {len(converted)} table(s) in {len(deploy_dbs)} database(s)..."):
+                        st.session_state.diff_results = run_per_database(
+                            bulk_diff_tables, deploy_dbs, deploy_parallel, converted,
+                            keys={r["TARGET_TABLE"]: r["KEYS"] for r in ok_results}, options=ddl_opts
+                        )
+
+            if st.session_state.diff_results:
+                diff_report = pd.DataFrame(st.session_state.diff_results)
+                st.write(diff_report["STATUS"].value_counts().to_dict())
+                show_paginated(diff_report.drop(columns=["ALTER_SQL"]), key="diff_report")
+
+                alter_parts = [f"-- {r['DATABASE']}.{r['TABLE_NAME']}\n{r['ALTER_SQL']}\nGO\n" for r in st.session_state.diff_results if r["ALTER_SQL"]]
+                if alter_parts:
+                    st.download_button(
+                        label="📄 Download ALTER Script",
+                        data="\n".join(alter_parts).encode("utf-8"),
+                        file_name="batch_alter.sql",
+                        mime="text/plain",
+                        key="download_batch_alter"
+                    )
+                    if st.button("⚙️ Apply ALTER statements", key="apply_alters_btn"):
+                        alter_dbs = sorted({r["DATABASE"] for r in st.session_state.diff_results if r["ALTER_SQL"]})
+                        with st.spinner(f"Altering tables in {len(alter_dbs)} database(s)..."):
+                            st.session_state.deploy_results = run_per_database(
+                                bulk_apply_alters, alter_dbs, deploy_parallel, st.session_state.diff_results,
+                                batch_size=int(deploy_batch_size)
+                            )
+                        st.session_state.diff_results = None
+
+        elif st.button("🚀 Deploy Batch", key="deploy_batch_btn"):
+            deploy_scripts = {r["TARGET_TABLE"]: r["SQL"] for r in st.session_state.batch_results if r["STATUS"] == "OK"}
+            if not deploy_dbs:
+                st.error("Please select at least one database.")
+            elif not deploy_scripts:
+                st.error("There are no generated scripts to deploy.")
+            else:
+                with st.spinner(f"Deploying {len(deploy_scripts)} table(s) to {len(deploy_dbs)} database(s)..."):
+                    st.session_state.deploy_results = bulk_deploy(
+                        deploy_scripts, deploy_dbs, batch_size=int(deploy_batch_size), parallel=deploy_parallel
+                    )
+
+        if st.session_state.deploy_results:
+            deploy_report = pd.DataFrame(st.session_state.deploy_results)
+            st.write(deploy_report["STATUS"].value_counts().to_dict())
+            show_paginated(deploy_report, key="deploy_report")
+
+    # The same tables on several servers / databases at once
+    with st.expander("🌐 Deploy to several servers", expanded=False):
+        fanout_text = st.text_area(
+            "Targets, one per line ([LABEL=]SERVER/DATABASE):",
+            value=SQL_TARGETS,
+            placeholder="dev=devsql/STAGE\neu=eu-sql/STAGE_EU",
+            key="fanout_targets"
+        )
+        st.caption(f"Every target is reached as {SQL_USERNAME} (SQL_USERNAME / SQL_PASSWORD secrets).")
+        fcol1, fcol2 = st.columns(2)
+        with fcol1:
+            fanout_check_only = st.checkbox("Only check which tables exist", value=False, key="fanout_check_only")
+        with fcol2:
+            fanout_timeout = st.number_input("Timeout per run (seconds):", min_value=10, max_value=3600, value=FAN_OUT_TIMEOUT, key="fanout_timeout")
+
+        if st.button("🔍 Check Targets" if fanout_check_only else "🌐 Deploy to Targets", key="fanout_btn"):
+            fanout_scripts = {r["TARGET_TABLE"]: r["SQL"] for r in st.session_state.batch_results if r["STATUS"] == "OK"}
+            try:
+                fanout_targets = parse_targets(fanout_text)
+            except ValueError as e:
+                fanout_targets = None
+                st.error(f"❌ {e}")
+            if fanout_targets is not None and not fanout_targets:
+                st.error("Please enter at least one target.")
+            elif fanout_targets and not fanout_scripts:
+                st.error("There are no generated scripts to deploy.")
+            elif fanout_targets:
+                target_pools = [(t, get_connection_pool(t["SERVER"], t["DATABASE"])) for t in fanout_targets]
+                with st.spinner(f"{'Checking' if fanout_check_only else 'Deploying'} {len(fanout_scripts)} table(s) on {len(fanout_targets)} target(s)..."):
+                    st.session_state.fanout_results = deploy_to_targets(
+                        fanout_scripts, target_pools, batch_size=int(deploy_batch_size),
+                        check_only=fanout_check_only, timeout=fanout_timeout
+                    )
+
+        if st.session_state.fanout_results:
+            fanout_report = pd.DataFrame(st.session_state.fanout_results)
+            st.write(fanout_report["STATUS"].value_counts().to_dict())
+            fanout_matrix = target_matrix(st.session_state.fanout_results)
+            show_paginated(fanout_matrix, key="fanout_matrix")
+            fanout_failed = fanout_report[fanout_report["STATUS"].isin(["FAILED", "TIMEOUT"])]
+            if not fanout_failed.empty:
+                st.warning(f"⚠️ {len(fanout_failed)} table/target pair(s) failed or timed out")
+                show_paginated(fanout_failed, key="fanout_failed")
+            st.download_button(
+                label="📊 Download Target Matrix (CSV)",
+                data=fanout_matrix.to_csv(index=False).encode("utf-8"),
+                file_name="target_matrix.csv",
+                mime="text/csv",
+                key="download_target_matrix"
+            )
+
+    # Copy the data into the created tables
+    with st.expander("🚚 Load data into the created tables", expanded=False):
+        load_db = st.selectbox("Target database:", options=get_databases() or [SQL_DATABASE], key="load_db")
+        load_source = st.radio(
+            "Source:",
+            options=["CSV / Parquet extracts", "Oracle"],
+            horizontal=True,
+            key="load_source"
+        )
+        if load_source == "Oracle":
+            st.caption(f"Reading from {ORACLE_USER or '?'}@{ORACLE_DSN or '?'} (ORACLE_* secrets).")
+            source = {"oracle": {"dsn": ORACLE_DSN, "user": ORACLE_USER, "password": ORACLE_PASSWORD,
+                                 "schema": ORACLE_SCHEMA}}
+        else:
+            extract_dir = st.text_input("Extract directory (<TABLE>.csv, .csv.gz or .parquet):", key="load_extract_dir")
+            source = {"extract_dir": extract_dir}
+        lcol1, lcol2 = st.columns(2)
+        with lcol1:
+            load_batch_size = st.number_input("Rows per batch:", min_value=100, max_value=200000, value=LOAD_BATCH_SIZE, step=1000, key="load_batch_size")
+            load_truncate = st.checkbox("Empty the tables first", value=False, key="load_truncate")
+        with lcol2:
+            load_workers = st.number_input("Tables in parallel:", min_value=1, max_value=SQL_POOL_SIZE, value=min(4, SQL_POOL_SIZE), key="load_workers")
+            load_post = st.checkbox("Create deferred keys/indexes after the load", value=True, key="load_post")
+        bcp_dir = st.text_input("Write bcp files to this folder instead (optional):", key="load_bcp_dir")
+
+        if st.button("🚚 Load Data", key="load_data_btn"):
+            if load_source != "Oracle" and not source["extract_dir"]:
+                st.error("Please enter the extract directory.")
+            else:
+                with st.spinner("Loading data..."):
+                    st.session_state.load_results = load_tables(
+                        None if bcp_dir else get_connection_pool(SQL_SERVER, load_db), st.session_state.batch_results,
+                        source, load_db, batch_size=int(load_batch_size), max_workers=int(load_workers),
+                        truncate=load_truncate, run_post_load=load_post, bcp_dir=bcp_dir or None, server=SQL_SERVER,
+                        username=SQL_USERNAME
+                    )
+
+        if st.session_state.load_results:
+            load_report = pd.DataFrame(st.session_state.load_results)
+            st.write(load_report["STATUS"].value_counts().to_dict())
+            st.caption(f"{int(load_report['ROWS'].sum()):,} row(s) in {load_report['SECONDS'].max():.1f}s")
+            show_paginated(load_report, key="load_report")
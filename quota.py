@@ -0,0 +1,154 @@
+"""Daily Google Custom Search quota shared by every session, batch and CLI run.
+
+Usage is kept per day in SQLite and every reservation is a single
+BEGIN IMMEDIATE transaction, so concurrent callers can never overshoot the
+limit. Batches reserve the calls they expect to need up front and hand the
+unused ones back; callers that get nothing can wait or fall back to scraping.
+"""
+import json
+import os
+import sqlite3
+import threading
+import time
+from datetime import datetime
+
+# ---------- CONFIGURATION ----------
+QUOTA_FILE = "api_quota.sqlite"
+DAILY_API_LIMIT = 100
+QUOTA_POLL_SECONDS = 30
+
+# Counter file used before the quota moved to SQLite; today's count is carried over once
+LEGACY_COUNTER_FILE = "api_usage_counter.json"
+
+
+def _today():
+    return datetime.now().strftime('%Y-%m-%d')
+
+
+def _legacy_count(day):
+    """Today's count from the old JSON counter, or 0"""
+    try:
+        with open(LEGACY_COUNTER_FILE, 'r') as f:
+            data = json.load(f)
+        return int(data.get('count', 0)) if data.get('date') == day else 0
+    except (OSError, ValueError):
+        return 0
+
+
+def _quota_connect(quota_file=QUOTA_FILE):
+    """Open the quota database in autocommit mode, creating the table on first use"""
+    conn = sqlite3.connect(quota_file, timeout=30, isolation_level=None)
+    conn.execute("CREATE TABLE IF NOT EXISTS api_quota (day TEXT PRIMARY KEY, used INTEGER NOT NULL)")
+    return conn
+
+
+def _used_today(conn, day):
+    """Calls used today (caller holds the transaction); seeds the row on first use"""
+    row = conn.execute("SELECT used FROM api_quota WHERE day = ?", (day,)).fetchone()
+    if row:
+        return row[0]
+    used = _legacy_count(day) if os.path.exists(LEGACY_COUNTER_FILE) else 0
+    conn.execute("INSERT INTO api_quota (day, used) VALUES (?, ?)", (day, used))
+    return used
+
+
+def _try_reserve(n, limit, partial, quota_file):
+    """(calls reserved, day they were counted against)"""
+    conn = _quota_connect(quota_file)
+    try:
+        conn.execute("BEGIN IMMEDIATE")
+        day = _today()
+        remaining = max(limit - _used_today(conn, day), 0)
+        granted = min(n, remaining) if partial else (n if n <= remaining else 0)
+        if granted:
+            conn.execute("UPDATE api_quota SET used = used + ? WHERE day = ?", (granted, day))
+        conn.execute("COMMIT")
+        return granted, day
+    except Exception:
+        if conn.in_transaction:
+            conn.execute("ROLLBACK")
+        raise
+    finally:
+        conn.close()
+
+
+def _reserve(n, limit, partial, wait_seconds, quota_file):
+    """reserve_quota returning (calls reserved, day they were counted against)"""
+    deadline = time.monotonic() + wait_seconds
+    while True:
+        granted, day = _try_reserve(n, limit, partial, quota_file)
+        remaining_wait = deadline - time.monotonic()
+        if granted or remaining_wait <= 0:
+            return granted, day
+        time.sleep(min(QUOTA_POLL_SECONDS, remaining_wait))
+
+
+def reserve_quota(n=1, limit=DAILY_API_LIMIT, partial=False, wait_seconds=0, quota_file=QUOTA_FILE):
+    """Atomically reserve n calls from today's quota; returns the number reserved
+
+    Without partial, it is all n or nothing (0). With partial, whatever is left up to n.
+    wait_seconds > 0 keeps polling until something can be reserved (after midnight,
+    or when another run releases calls it did not use) or the time is up.
+    """
+    return _reserve(n, limit, partial, wait_seconds, quota_file)[0]
+
+
+def release_quota(n, quota_file=QUOTA_FILE, day=None):
+    """Give back reserved calls that were not used, to the day they were reserved on (default today)"""
+    if n <= 0:
+        return
+    conn = _quota_connect(quota_file)
+    try:
+        conn.execute("UPDATE api_quota SET used = MAX(used - ?, 0) WHERE day = ?", (n, day or _today()))
+    finally:
+        conn.close()
+
+
+def get_quota_usage(limit=DAILY_API_LIMIT, quota_file=QUOTA_FILE):
+    """Today's usage as {day, used, limit, remaining}"""
+    day = _today()
+    conn = _quota_connect(quota_file)
+    try:
+        row = conn.execute("SELECT used FROM api_quota WHERE day = ?", (day,)).fetchone()
+    finally:
+        conn.close()
+    used = row[0] if row else (_legacy_count(day) if os.path.exists(LEGACY_COUNTER_FILE) else 0)
+    return {"day": day, "used": used, "limit": limit, "remaining": max(limit - used, 0)}
+
+
+class QuotaReservation:
+    """Calls reserved up front for a batch and handed out one at a time
+
+    Use as a context manager so unused calls go back to the pool at the end:
+
+        with QuotaReservation(needed, partial=True) as reservation:
+            if reservation.take():
+                ...
+    """
+
+    def __init__(self, n, partial=True, wait_seconds=0, limit=DAILY_API_LIMIT, quota_file=QUOTA_FILE):
+        self.quota_file = quota_file
+        # A batch can run past midnight; unused calls go back to the day they came from
+        self.granted, self.day = _reserve(n, limit, partial, wait_seconds, quota_file) if n > 0 else (0, None)
+        self.used = 0
+        self._lock = threading.Lock()
+
+    def take(self):
+        """Use one reserved call; False once the reservation is exhausted"""
+        with self._lock:
+            if self.used >= self.granted:
+                return False
+            self.used += 1
+            return True
+
+    def release_unused(self):
+        """Return the calls that were not taken"""
+        with self._lock:
+            unused, self.granted = self.granted - self.used, self.used
+        release_quota(unused, self.quota_file, self.day)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.release_unused()
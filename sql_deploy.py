@@ -0,0 +1,340 @@
+"""Create, compare and alter generated tables on SQL Server through a ConnectionPool.
+
+Every function takes the pool explicitly so it can run on worker threads and
+outside Streamlit. pyodbc is imported only when a statement is executed.
+run_on_targets fans the same step out to several servers / databases at once.
+"""
+from concurrent.futures import ThreadPoolExecutor, as_completed, wait
+
+import pandas as pd
+
+from conversion_engine import SKIPPED_ALTER_MARKER, build_alter_statements, format_sql_server_type
+from metrics import timed
+
+# ---------- CONFIGURATION ----------
+# CREATE statements sent per transaction, and names per existence query
+BULK_DEPLOY_BATCH_SIZE = 50
+EXISTS_QUERY_CHUNK = 1000  # stays well below SQL Server's 2100 parameter limit
+# Fan-out deploy: targets worked on at once, and seconds after which unfinished targets are reported as TIMEOUT
+FAN_OUT_MAX_WORKERS = 8
+FAN_OUT_TIMEOUT = 300
+
+
+def is_already_exists_error(error_message):
+    """True for SQL Server's "There is already an object named ..." style errors"""
+    return "already an object" in error_message.lower() or "already exists" in error_message.lower()
+
+
+def test_connection(pool, timeout=5):
+    """Run SELECT 1 on a pooled connection; returns (ok, message)"""
+    try:
+        with pool.connection(timeout=timeout) as conn:
+            cursor = conn.cursor()
+            cursor.execute("SELECT 1")
+            cursor.fetchone()
+            cursor.close()
+        return True, "Connection successful!"
+    except Exception as e:
+        return False, str(e)
+
+
+def run_script(cursor, sql_script):
+    """Execute a multi-statement script and read every result set, so an error in any statement is raised here"""
+    cursor.execute(sql_script)
+    # pyodbc only raises errors of later statements while their result sets are consumed
+    while cursor.nextset():
+        pass
+
+
+@timed("execute")
+def execute_script(pool, sql_script):
+    """Execute one script and commit; returns (ok, message) with message "TABLE_EXISTS" for duplicates"""
+    import pyodbc
+
+    try:
+        with pool.connection() as conn:
+            cursor = conn.cursor()
+            run_script(cursor, sql_script)
+            conn.commit()
+            cursor.close()
+        return True, "Table created successfully!"
+    except pyodbc.Error as e:
+        error_message = str(e)
+        if is_already_exists_error(error_message):
+            return False, "TABLE_EXISTS"
+        return False, error_message
+    except Exception as e:
+        return False, str(e)
+
+
+@timed("exists_check")
+def has_table(pool, table_name):
+    """True if the (already prefixed) table exists in the pool's database"""
+    with pool.connection() as conn:
+        cursor = conn.cursor()
+        cursor.execute("SELECT COUNT(*) FROM INFORMATION_SCHEMA.TABLES WHERE TABLE_NAME = ?", table_name.upper())
+        result = cursor.fetchone()
+        cursor.close()
+    return result[0] > 0
+
+
+def list_databases(pool, timeout=5):
+    """User databases on the pool's server"""
+    with pool.connection(timeout=timeout) as conn:
+        cursor = conn.cursor()
+        cursor.execute("SELECT name FROM sys.databases WHERE name NOT IN ('master', 'tempdb', 'model', 'msdb') ORDER BY name")
+        databases = [row[0] for row in cursor.fetchall()]
+        cursor.close()
+    return databases
+
+
+@timed("exists_check")
+def find_existing_tables(pool, table_names):
+    """Return the subset of table names that already exist, using one query per chunk of names"""
+    names = sorted({name.upper() for name in table_names})
+    existing = set()
+    with pool.connection() as conn:
+        cursor = conn.cursor()
+        for start in range(0, len(names), EXISTS_QUERY_CHUNK):
+            chunk = names[start:start + EXISTS_QUERY_CHUNK]
+            placeholders = ", ".join("?" for _ in chunk)
+            cursor.execute(
+                f"SELECT UPPER(TABLE_NAME) FROM INFORMATION_SCHEMA.TABLES WHERE TABLE_NAME IN ({placeholders})",
+                *chunk
+            )
+            existing.update(row[0] for row in cursor.fetchall())
+        cursor.close()
+    return existing
+
+
+@timed("execute", method="batched")
+def execute_in_batches(pool, scripts, batch_size=BULK_DEPLOY_BATCH_SIZE):
+    """Run {table name: script} with batch_size scripts per transaction; returns {table name: (status, message)}"""
+    import pyodbc
+
+    outcome = {}
+    names = list(scripts)
+    with pool.connection() as conn:
+        cursor = conn.cursor()
+        for start in range(0, len(names), batch_size):
+            batch = names[start:start + batch_size]
+            try:
+                # One transaction for the whole batch; each script on its own so its errors surface
+                for name in batch:
+                    run_script(cursor, scripts[name])
+                conn.commit()
+                for name in batch:
+                    outcome[name] = ("DONE", "")
+            except pyodbc.Error:
+                conn.rollback()
+                # Retry one by one so the failure is reported against the right table
+                for name in batch:
+                    try:
+                        run_script(cursor, scripts[name])
+                        conn.commit()
+                        outcome[name] = ("DONE", "")
+                    except pyodbc.Error as e:
+                        conn.rollback()
+                        error_message = str(e)
+                        if is_already_exists_error(error_message):
+                            outcome[name] = ("EXISTS", "")
+                        else:
+                            outcome[name] = ("FAILED", error_message)
+        cursor.close()
+    return outcome
+
+
+def bulk_create_tables(pool, scripts, database_name, batch_size=BULK_DEPLOY_BATCH_SIZE):
+    """Create the missing tables from {table name: CREATE script}, batch_size statements per transaction"""
+    scripts = {name.upper(): sql for name, sql in scripts.items()}
+    results = {name: {"TABLE_NAME": name, "DATABASE": database_name, "STATUS": "", "MESSAGE": ""} for name in scripts}
+
+    try:
+        existing = find_existing_tables(pool, scripts)
+    except Exception as e:
+        for r in results.values():
+            r["STATUS"] = "FAILED"
+            r["MESSAGE"] = f"Could not check existing tables: {e}"
+        return list(results.values())
+
+    for name in existing:
+        results[name]["STATUS"] = "EXISTS"
+
+    missing = {name: sql for name, sql in scripts.items() if name not in existing}
+    for name, (status, message) in execute_in_batches(pool, missing, batch_size).items():
+        results[name]["STATUS"] = "CREATED" if status == "DONE" else status
+        results[name]["MESSAGE"] = message
+
+    return list(results.values())
+
+
+def bulk_check_tables(pool, table_names, database_name):
+    """Existence check only: one EXISTS / MISSING row per (already prefixed) table name"""
+    names = [name.upper() for name in table_names]
+    try:
+        existing = find_existing_tables(pool, names)
+    except Exception as e:
+        return [{"TABLE_NAME": name, "DATABASE": database_name, "STATUS": "FAILED",
+                 "MESSAGE": f"Could not check existing tables: {e}"} for name in names]
+    return [{"TABLE_NAME": name, "DATABASE": database_name, "STATUS": "EXISTS" if name in existing else "MISSING",
+             "MESSAGE": ""} for name in names]
+
+
+@timed("exists_check", method="columns")
+def fetch_table_columns(pool, table_names):
+    """Return {table name: {column: (declared type, not null)}} for the tables that exist, using one query per chunk"""
+    names = sorted({name.upper() for name in table_names})
+    columns = {}
+    with pool.connection() as conn:
+        cursor = conn.cursor()
+        for start in range(0, len(names), EXISTS_QUERY_CHUNK):
+            chunk = names[start:start + EXISTS_QUERY_CHUNK]
+            placeholders = ", ".join("?" for _ in chunk)
+            cursor.execute(
+                "SELECT UPPER(TABLE_NAME), COLUMN_NAME, DATA_TYPE, CHARACTER_MAXIMUM_LENGTH, "
+                "NUMERIC_PRECISION, NUMERIC_SCALE, DATETIME_PRECISION, IS_NULLABLE "
+                f"FROM INFORMATION_SCHEMA.COLUMNS WHERE TABLE_NAME IN ({placeholders}) "
+                "ORDER BY TABLE_NAME, ORDINAL_POSITION",
+                *chunk
+            )
+            for table, column, data_type, char_len, num_prec, num_scale, dt_prec, nullable in cursor.fetchall():
+                sql_type = format_sql_server_type(data_type, char_len, num_prec, num_scale, dt_prec)
+                columns.setdefault(table, {})[column] = (sql_type, str(nullable).upper() == "NO")
+        cursor.close()
+    return columns
+
+
+def bulk_diff_tables(pool, converted, database_name, keys=None, options=None):
+    """Diff {table name: converted columns} against the existing tables and build ALTER scripts
+
+    keys ({table name: keys table}) and options are the ones the CREATE scripts were built
+    with, so NOT NULL matches and key / index columns are left out of ALTER COLUMN.
+    """
+    keys = {name.upper(): table_keys for name, table_keys in (keys or {}).items()}
+    results = []
+    try:
+        existing = fetch_table_columns(pool, converted)
+    except Exception as e:
+        return [{"TABLE_NAME": name.upper(), "DATABASE": database_name, "STATUS": "FAILED",
+                 "MESSAGE": f"Could not read existing columns: {e}", "ALTER_SQL": ""} for name in converted]
+
+    for name, conv_df in converted.items():
+        name = name.upper()
+        if name not in existing:
+            results.append({"TABLE_NAME": name, "DATABASE": database_name, "STATUS": "MISSING", "MESSAGE": "", "ALTER_SQL": ""})
+            continue
+        alter_sql = build_alter_statements(name, conv_df, existing[name], keys.get(name), options)
+        skipped = sum(line.startswith(SKIPPED_ALTER_MARKER) for line in alter_sql.splitlines())
+        results.append({
+            "TABLE_NAME": name,
+            "DATABASE": database_name,
+            "STATUS": "CHANGES" if alter_sql else "UP_TO_DATE",
+            "MESSAGE": f"{skipped} statement(s) left commented out for a manual change" if skipped else "",
+            "ALTER_SQL": alter_sql,
+        })
+    return results
+
+
+def bulk_apply_alters(pool, diff_results, database_name, batch_size=BULK_DEPLOY_BATCH_SIZE):
+    """Execute the ALTER scripts from bulk_diff_tables for one database"""
+    scripts = {r["TABLE_NAME"]: r["ALTER_SQL"] for r in diff_results if r["DATABASE"] == database_name and r["ALTER_SQL"]}
+    return [
+        {"TABLE_NAME": name, "DATABASE": database_name, "STATUS": "ALTERED" if status == "DONE" else status, "MESSAGE": message}
+        for name, (status, message) in execute_in_batches(pool, scripts, batch_size).items()
+    ]
+
+
+def run_on_pools(func, pools, parallel, *args, **kwargs):
+    """Call func(pool, *args, database_name=db, **kwargs) for each {database: pool} and collect the result rows"""
+    results = []
+    if parallel and len(pools) > 1:
+        with ThreadPoolExecutor(max_workers=len(pools)) as executor:
+            futures = [executor.submit(func, pool, *args, database_name=db, **kwargs) for db, pool in pools.items()]
+            for future in as_completed(futures):
+                results.extend(future.result())
+    else:
+        for db, pool in pools.items():
+            results.extend(func(pool, *args, database_name=db, **kwargs))
+    return results
+
+
+# ---------- Fan-out to Several Targets ----------
+
+def parse_targets(text):
+    """Deploy targets from lines (or ; separated entries) of [LABEL=]SERVER/DATABASE
+
+    Returns dicts with TARGET (the label, or SERVER/DATABASE), SERVER and DATABASE,
+    without duplicates; raises ValueError for an entry without a database.
+    """
+    targets = []
+    for entry in (e.strip() for line in (text or "").splitlines() for e in line.split(";")):
+        if not entry or entry.startswith("#"):
+            continue
+        label, _, location = entry.rpartition("=")
+        server, _, database = location.strip().rpartition("/")
+        if not server.strip() or not database.strip():
+            raise ValueError(f"Target '{entry}' is not [LABEL=]SERVER/DATABASE")
+        target = {"TARGET": label.strip() or f"{server.strip()}/{database.strip()}",
+                  "SERVER": server.strip(), "DATABASE": database.strip()}
+        if target not in targets:
+            targets.append(target)
+    return targets
+
+
+def run_on_targets(func, target_pools, table_names, *args, max_workers=FAN_OUT_MAX_WORKERS, timeout=FAN_OUT_TIMEOUT,
+                   **kwargs):
+    """Call func(pool, *args, database_name=db, **kwargs) on every target concurrently and collect the rows
+
+    target_pools is [(target dict from parse_targets, its ConnectionPool)]; each row is tagged
+    with TARGET and SERVER. A target whose step raises gets a FAILED row per table name, and
+    one still running timeout seconds after the start a TIMEOUT row per table name (its worker
+    is left to finish in the background).
+    """
+    def tagged(target, rows):
+        return [{**row, "TARGET": target["TARGET"], "SERVER": target["SERVER"]} for row in rows]
+
+    def failed(target, status, message):
+        return tagged(target, [{"TABLE_NAME": name.upper(), "DATABASE": target["DATABASE"], "STATUS": status,
+                                "MESSAGE": message} for name in table_names])
+
+    results = []
+    if not target_pools:
+        return results
+    executor = ThreadPoolExecutor(max_workers=max(1, min(max_workers, len(target_pools))))
+    try:
+        futures = {executor.submit(func, pool, *args, database_name=target["DATABASE"], **kwargs): target
+                   for target, pool in target_pools}
+        done, _ = wait(futures, timeout=timeout)
+        for future, target in futures.items():
+            if future not in done:
+                results.extend(failed(target, "TIMEOUT", f"No answer within {timeout}s"))
+                continue
+            try:
+                results.extend(tagged(target, future.result()))
+            except Exception as e:
+                results.extend(failed(target, "FAILED", str(e)))
+    finally:
+        executor.shutdown(wait=False, cancel_futures=True)
+    return results
+
+
+def deploy_to_targets(scripts, target_pools, batch_size=BULK_DEPLOY_BATCH_SIZE, check_only=False,
+                      max_workers=FAN_OUT_MAX_WORKERS, timeout=FAN_OUT_TIMEOUT):
+    """Check and create {table name: CREATE script} on every target at once (only check with check_only)"""
+    if check_only:
+        return run_on_targets(bulk_check_tables, target_pools, list(scripts), list(scripts),
+                              max_workers=max_workers, timeout=timeout)
+    return run_on_targets(bulk_create_tables, target_pools, list(scripts), scripts, batch_size=batch_size,
+                          max_workers=max_workers, timeout=timeout)
+
+
+def target_matrix(results, targets=None):
+    """Table × target matrix of STATUS values from run_on_targets rows (targets gives the column order)"""
+    if not results:
+        return pd.DataFrame()
+    frame = pd.DataFrame(results)
+    matrix = frame.pivot_table(index="TABLE_NAME", columns="TARGET", values="STATUS", aggfunc="first", sort=False)
+    if targets:
+        matrix = matrix.reindex(columns=[t["TARGET"] for t in targets if t["TARGET"] in matrix.columns])
+    matrix.columns.name = None
+    return matrix.fillna("").reset_index()
@@ -0,0 +1,155 @@
+"""Small thread-safe pool of pyodbc connections to one SQL Server database.
+
+Connections are reused instead of paying a TCP/TDS/login handshake per call,
+checked with SELECT 1 when they have been idle for a while, and closed once
+they sit idle longer than the idle timeout. pyodbc is imported on first use.
+"""
+import threading
+import time
+from contextlib import contextmanager
+
+POOL_MAX_SIZE = 5
+POOL_IDLE_TIMEOUT = 300        # seconds before an unused connection is closed
+POOL_HEALTH_CHECK_AFTER = 30   # seconds idle before a connection is re-validated
+POOL_ACQUIRE_TIMEOUT = 30      # seconds to wait for a free connection
+
+
+def build_connection_string(server, database, username, password, driver="ODBC Driver 17 for SQL Server"):
+    """ODBC connection string for SQL Server authentication"""
+    return (
+        f"DRIVER={{{driver}}};"
+        f"SERVER={server};"
+        f"DATABASE={database};"
+        f"UID={username};"
+        f"PWD={password}"
+    )
+
+
+class ConnectionPool:
+    """Bounded pool of connections sharing one connection string"""
+
+    def __init__(self, conn_str, max_size=POOL_MAX_SIZE, idle_timeout=POOL_IDLE_TIMEOUT,
+                 health_check_after=POOL_HEALTH_CHECK_AFTER, connect_timeout=10):
+        self.conn_str = conn_str
+        self.max_size = max_size
+        self.idle_timeout = idle_timeout
+        self.health_check_after = health_check_after
+        self.connect_timeout = connect_timeout
+        self._idle = []          # [(connection, released_at)], most recently used last
+        self._in_use = 0
+        self._created = 0
+        self._reused = 0
+        self._cond = threading.Condition()
+
+    def _close(self, conn):
+        import pyodbc
+
+        try:
+            conn.close()
+        except pyodbc.Error:
+            pass
+
+    def _is_healthy(self, conn):
+        import pyodbc
+
+        try:
+            cursor = conn.cursor()
+            cursor.execute("SELECT 1")
+            cursor.fetchone()
+            cursor.close()
+            return True
+        except pyodbc.Error:
+            return False
+
+    def _evict_expired(self, now):
+        """Close idle connections past the idle timeout (caller holds the lock)"""
+        expired = [c for c, released in self._idle if now - released > self.idle_timeout]
+        self._idle = [(c, released) for c, released in self._idle if now - released <= self.idle_timeout]
+        for conn in expired:
+            self._close(conn)
+
+    def acquire(self, timeout=POOL_ACQUIRE_TIMEOUT):
+        """Take a healthy connection from the pool, opening a new one if there is room"""
+        deadline = time.monotonic() + timeout
+        with self._cond:
+            while True:
+                now = time.monotonic()
+                self._evict_expired(now)
+                if self._idle:
+                    conn, released = self._idle.pop()
+                    self._in_use += 1
+                    break
+                if self._in_use < self.max_size:
+                    conn, released = None, None
+                    self._in_use += 1
+                    break
+                remaining = deadline - now
+                if remaining <= 0:
+                    raise TimeoutError(f"No SQL Server connection available after {timeout}s (pool size {self.max_size})")
+                self._cond.wait(remaining)
+
+        # Connect / health check outside the lock so other threads are not blocked
+        try:
+            if conn is not None and time.monotonic() - released > self.health_check_after and not self._is_healthy(conn):
+                self._close(conn)
+                conn = None
+            if conn is None:
+                import pyodbc
+
+                conn = pyodbc.connect(self.conn_str, timeout=self.connect_timeout)
+                with self._cond:
+                    self._created += 1
+            else:
+                with self._cond:
+                    self._reused += 1
+            return conn
+        except Exception:
+            with self._cond:
+                self._in_use -= 1
+                self._cond.notify()
+            raise
+
+    def release(self, conn, discard=False):
+        """Return a connection to the pool (or close it if it is broken)"""
+        if not discard:
+            import pyodbc
+
+            try:
+                # Never hand out a connection with an open transaction
+                conn.rollback()
+            except pyodbc.Error:
+                discard = True
+        with self._cond:
+            self._in_use -= 1
+            if discard:
+                self._close(conn)
+            else:
+                self._idle.append((conn, time.monotonic()))
+            self._cond.notify()
+
+    @contextmanager
+    def connection(self, timeout=POOL_ACQUIRE_TIMEOUT):
+        """with pool.connection() as conn: ... — broken connections are dropped on release"""
+        conn = self.acquire(timeout)
+        try:
+            yield conn
+        finally:
+            self.release(conn)
+
+    def close_all(self):
+        """Close every idle connection"""
+        with self._cond:
+            idle, self._idle = self._idle, []
+        for conn, _ in idle:
+            self._close(conn)
+
+    def stats(self):
+        """Pool counters for display"""
+        with self._cond:
+            return {
+                "max_size": self.max_size,
+                "idle": len(self._idle),
+                "in_use": self._in_use,
+                "created": self._created,
+                "reused": self._reused,
+            }
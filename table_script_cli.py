@@ -0,0 +1,342 @@
+"""Headless Oracle → SQL Server table script generator for scripted / nightly use.
+
+    python table_script_cli.py generate --tables tables.txt --out scripts/
+    python table_script_cli.py generate --tables tables.csv --out scripts/ --prefix ST_OM_ --profile precise
+    echo AP_INVOICES_ALL | python table_script_cli.py generate --tables - --out scripts/
+    python table_script_cli.py generate --tables tables.txt --out scripts/ --log-json --metrics-file scripts/metrics.prom
+    python table_script_cli.py generate --tables tables.txt --out scripts/ --indexes-after-load --no-comments
+    python table_script_cli.py generate --tables tables.txt --out scripts/ --row-hint XLA_DISTRIBUTION_LINKS=400000000
+    echo "AP_INVOICE%" | python table_script_cli.py generate --tables - --out scripts/
+    python table_script_cli.py load --tables tables.txt --extracts extracts/ --server sqlhost --database STAGE
+    python table_script_cli.py load --tables tables.txt --oracle-dsn erp-db/FIN --oracle-user apps --bcp-out bcp/
+    python table_script_cli.py deploy --tables tables.txt --target dev=devsql/STAGE --target eu=eu-sql/STAGE_EU
+    python table_script_cli.py deploy --tables tables.txt --targets-file targets.txt --check-only --report matrix.csv
+    python table_script_cli.py quota
+
+Writes one <TABLE>_create.sql per table, batch_create.sql, batch_columns.xlsx
+(summary plus one sheet per table) and batch_status.csv. Scripts include NOT NULL,
+the clustered primary key, nonclustered indexes and column comments from the doc
+page; with --indexes-after-load the key and indexes go to <TABLE>_post_load.sql
+and batch_post_load.sql instead, to run once the data is loaded.
+Each table's storage (heap, PAGE compression, clustered columnstore, date
+partitioning) follows the rules in storage_profiles.json, by table name and
+--row-hint, unless --storage-profile names one for all tables.
+Names are checked against the local name index (name_index.py) first: patterns
+such as AP_INVOICE% expand to the known tables, and names that look like a typo
+of a known table are skipped (listing the likely names) unless --no-name-check.
+load copies the rows of already created tables from <TABLE>.csv/.parquet
+extracts or straight from Oracle (password in ORACLE_PASSWORD) into SQL Server
+(SQL_USERNAME / SQL_PASSWORD) with fast_executemany, or writes bcp files with
+--bcp-out. Use the same --prefix / --profile the tables were generated with.
+deploy generates the scripts and then checks and creates the tables on every
+[LABEL=]SERVER/DATABASE target at once (same SQL_USERNAME / SQL_PASSWORD for all),
+printing a table x target status matrix.
+--log-json prints one JSON line per pipeline stage to stderr, and --metrics-file
+writes the run's totals in Prometheus text format (e.g. for node_exporter's
+textfile collector). Google Custom Search credentials are read from GOOGLE_API_KEY / GOOGLE_CSE_ID.
+Heavy modules (pandas, requests, googleapiclient) are imported only after the
+arguments are parsed, so --help and argument errors return immediately.
+"""
+import argparse
+import os
+import sys
+
+DEFAULT_TABLE_PREFIX = "ST_FN_"
+DEFAULT_WORKERS = 8
+
+
+def read_table_names(source):
+    """Table names from a .txt/.csv/.xlsx file, or stdin for '-'"""
+    from batch_pipeline import parse_table_list
+
+    if source == "-":
+        return parse_table_list(sys.stdin.read())
+    if source.lower().endswith((".csv", ".xlsx", ".xls")):
+        return parse_table_list(uploaded_file=source)
+    with open(source, "r", encoding="utf-8") as f:
+        return parse_table_list(f.read())
+
+
+def check_table_names(table_names):
+    """Expand wildcard patterns and drop likely typos, reporting both"""
+    from name_index import get_name_index, resolve_table_names
+
+    tables, expanded, typos = resolve_table_names(table_names, get_name_index())
+    for pattern, matches in expanded.items():
+        print(f"{pattern}: {len(matches)} known table(s)" + (f" - {', '.join(matches)}" if matches else ""))
+    for name, close in typos.items():
+        print(f"{name}: skipped, not a known table - did you mean {' or '.join(close[:3])}?")
+    return tables
+
+
+def cmd_generate(args):
+    from batch_pipeline import BATCH_HIDDEN_COLUMNS, run_batch
+    from export_bundle import write_excel, write_post_load_sql, write_sql
+    from metrics import configure_json_logging, metrics
+    import pandas as pd
+
+    table_names = read_table_names(args.tables)
+    if not args.no_name_check:
+        table_names = check_table_names(table_names)
+    if not table_names:
+        print("No table names found in", args.tables, file=sys.stderr)
+        return 2
+
+    api_key = os.environ.get("GOOGLE_API_KEY", "")
+    cse_id = os.environ.get("GOOGLE_CSE_ID", "")
+    if args.use_api and not (api_key and cse_id):
+        print("--use-api needs GOOGLE_API_KEY and GOOGLE_CSE_ID in the environment", file=sys.stderr)
+        return 2
+
+    ddl_options = {
+        "not_null": not args.no_not_null,
+        "primary_key": not args.no_primary_key,
+        "indexes": not args.no_indexes,
+        "comments": not args.no_comments,
+        "indexes_after_load": args.indexes_after_load,
+    }
+    row_hints = {}
+    for hint in args.row_hint or []:
+        name, _, rows = hint.partition("=")
+        if not rows.strip().isdigit():
+            print(f"--row-hint expects TABLE=ROWS, got '{hint}'", file=sys.stderr)
+            return 2
+        row_hints[name.strip().upper()] = int(rows)
+    if args.log_json:
+        configure_json_logging()
+    os.makedirs(args.out, exist_ok=True)
+    results = []
+    for result in run_batch(table_names, args.prefix, args.use_api, max_workers=args.workers,
+                            force_refresh=args.force_refresh, profile_name=args.profile,
+                            api_key=api_key, cse_id=cse_id, quota_wait=args.quota_wait, ddl_options=ddl_options,
+                            storage_profile=args.storage_profile, row_hints=row_hints):
+        results.append(result)
+        print(f"[{len(results)}/{len(table_names)}] {result['TABLE_NAME']}: {result['STATUS']} "
+              f"({result['COLUMNS']} columns, {result['ROW_BYTES']} bytes/row, {result['SOURCE']}, "
+              f"{result['STORAGE'] or '-'}, {result['SECONDS']}s) "
+              f"{result['MESSAGE']}".rstrip())
+        if result["STATUS"] == "OK":
+            with open(os.path.join(args.out, f"{result['TABLE_NAME']}_create.sql"), "w", encoding="utf-8") as f:
+                f.write(result["SQL"])
+            if result["POST_LOAD_SQL"]:
+                with open(os.path.join(args.out, f"{result['TABLE_NAME']}_post_load.sql"), "w", encoding="utf-8") as f:
+                    f.write(result["POST_LOAD_SQL"])
+
+    # Keep the report in the original input order
+    order = {name: idx for idx, name in enumerate(table_names)}
+    results.sort(key=lambda r: order[r["TABLE_NAME"]])
+    write_sql(results, os.path.join(args.out, "batch_create.sql"))
+    write_excel(results, os.path.join(args.out, "batch_columns.xlsx"))
+    if any(r["POST_LOAD_SQL"] for r in results):
+        write_post_load_sql(results, os.path.join(args.out, "batch_post_load.sql"))
+    pd.DataFrame(results).drop(columns=BATCH_HIDDEN_COLUMNS).to_csv(os.path.join(args.out, "batch_status.csv"), index=False)
+
+    if args.metrics_file:
+        with open(args.metrics_file, "w", encoding="utf-8") as f:
+            f.write(metrics.to_prometheus())
+
+    ok_count = sum(r["STATUS"] == "OK" for r in results)
+    saved = sum(r["ROW_BYTES_SAVED"] for r in results)
+    if saved:
+        print(f"Declared row width saved compared with the default type profile: {saved} bytes over {ok_count} table(s)")
+    print(f"{ok_count}/{len(results)} table(s) generated into {args.out}")
+    return 0 if ok_count == len(results) else 1
+
+
+def cmd_load(args):
+    from batch_pipeline import run_batch
+    from data_loader import load_tables
+    from sql_pool import ConnectionPool, build_connection_string
+
+    table_names = read_table_names(args.tables)
+    if not args.no_name_check:
+        table_names = check_table_names(table_names)
+    if not table_names:
+        print("No table names found in", args.tables, file=sys.stderr)
+        return 2
+    if bool(args.extracts) == bool(args.oracle_dsn):
+        print("Give either --extracts or --oracle-dsn as the source", file=sys.stderr)
+        return 2
+    if not args.bcp_out and not (args.server and args.database):
+        print("--server and --database are needed unless --bcp-out is used", file=sys.stderr)
+        return 2
+
+    if args.oracle_dsn:
+        source = {"oracle": {"dsn": args.oracle_dsn, "user": args.oracle_user,
+                             "password": os.environ.get("ORACLE_PASSWORD", ""), "schema": args.oracle_schema}}
+    else:
+        source = {"extract_dir": args.extracts}
+
+    # The column types come from the same pipeline that generated the tables (normally from the cache)
+    jobs = []
+    for result in run_batch(table_names, args.prefix, max_workers=DEFAULT_WORKERS, profile_name=args.profile,
+                            ddl_options={"indexes_after_load": args.indexes_after_load}):
+        if result["STATUS"] != "OK":
+            print(f"{result['TABLE_NAME']}: skipped, {result['STATUS']} {result['MESSAGE']}".rstrip())
+        jobs.append(result)
+
+    pool = None
+    if not args.bcp_out:
+        conn_str = build_connection_string(args.server, args.database, os.environ.get("SQL_USERNAME", ""),
+                                           os.environ.get("SQL_PASSWORD", ""))
+        pool = ConnectionPool(conn_str, max_size=args.workers)
+    try:
+        results = load_tables(pool, jobs, source, args.database, batch_size=args.batch_size, max_workers=args.workers,
+                              truncate=args.truncate, run_post_load=args.indexes_after_load, bcp_dir=args.bcp_out,
+                              server=args.server, username=os.environ.get("SQL_USERNAME"))
+    finally:
+        if pool is not None:
+            pool.close_all()
+
+    for r in results:
+        print(f"{r['TARGET_TABLE']}: {r['STATUS']} ({r['ROWS']} rows, {r['SECONDS']}s) {r['MESSAGE']}".rstrip())
+        if r.get("BCP_COMMAND"):
+            print(f"    {r['BCP_COMMAND']}")
+    done = sum(r["STATUS"] in ("LOADED", "WRITTEN") for r in results)
+    print(f"{done}/{len(table_names)} table(s) loaded, {sum(r['ROWS'] for r in results)} row(s)")
+    return 0 if done == len(table_names) else 1
+
+
+def cmd_deploy(args):
+    from batch_pipeline import run_batch
+    from sql_deploy import deploy_to_targets, parse_targets, target_matrix
+    from sql_pool import ConnectionPool, build_connection_string
+
+    table_names = read_table_names(args.tables)
+    if not args.no_name_check:
+        table_names = check_table_names(table_names)
+    if not table_names:
+        print("No table names found in", args.tables, file=sys.stderr)
+        return 2
+    target_text = "\n".join(args.target or [])
+    if args.targets_file:
+        with open(args.targets_file, "r", encoding="utf-8") as f:
+            target_text += "\n" + f.read()
+    try:
+        targets = parse_targets(target_text)
+    except ValueError as e:
+        print(e, file=sys.stderr)
+        return 2
+    if not targets:
+        print("Give at least one --target or a --targets-file", file=sys.stderr)
+        return 2
+
+    scripts = {}
+    for result in run_batch(table_names, args.prefix, max_workers=DEFAULT_WORKERS, profile_name=args.profile,
+                            storage_profile=args.storage_profile):
+        if result["STATUS"] == "OK":
+            scripts[result["TARGET_TABLE"]] = result["SQL"]
+        else:
+            print(f"{result['TABLE_NAME']}: skipped, {result['STATUS']} {result['MESSAGE']}".rstrip())
+    if not scripts:
+        print("No scripts were generated", file=sys.stderr)
+        return 1
+
+    username, password = os.environ.get("SQL_USERNAME", ""), os.environ.get("SQL_PASSWORD", "")
+    target_pools = [(t, ConnectionPool(build_connection_string(t["SERVER"], t["DATABASE"], username, password),
+                                       connect_timeout=args.connect_timeout)) for t in targets]
+    try:
+        results = deploy_to_targets(scripts, target_pools, batch_size=args.batch_size, check_only=args.check_only,
+                                    timeout=args.timeout)
+    finally:
+        for _, pool in target_pools:
+            pool.close_all()
+
+    matrix = target_matrix(results, targets)
+    print(matrix.to_string(index=False))
+    for r in results:
+        if r["MESSAGE"]:
+            print(f"{r['TARGET']} {r['TABLE_NAME']}: {r['STATUS']} {r['MESSAGE']}")
+    if args.report:
+        matrix.to_csv(args.report, index=False)
+    failed = sum(r["STATUS"] in ("FAILED", "TIMEOUT") for r in results)
+    print(f"{len(scripts)} table(s) x {len(targets)} target(s): {failed} failed")
+    return 0 if not failed else 1
+
+
+def cmd_quota(args):
+    from quota import get_quota_usage
+
+    usage = get_quota_usage()
+    print(f"{usage['day']}: {usage['used']}/{usage['limit']} Custom Search calls used, {usage['remaining']} left")
+    return 0
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Generate SQL Server CREATE TABLE scripts from Oracle Cloud documentation")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    generate = sub.add_parser("generate", help="generate scripts for a list of tables")
+    generate.add_argument("--tables", required=True, help="file with table names (.txt, .csv or .xlsx), or - for stdin")
+    generate.add_argument("--out", required=True, help="output directory")
+    generate.add_argument("--prefix", default=DEFAULT_TABLE_PREFIX, help=f"target table prefix (default: {DEFAULT_TABLE_PREFIX})")
+    generate.add_argument("--profile", help="type mapping profile from type_mappings.json (default: by prefix)")
+    generate.add_argument("--workers", type=int, default=DEFAULT_WORKERS, help=f"parallel workers (default: {DEFAULT_WORKERS})")
+    generate.add_argument("--use-api", action="store_true", help="search with the Google Custom Search API before scraping")
+    generate.add_argument("--force-refresh", action="store_true", help="ignore the offline index and the local cache")
+    generate.add_argument("--no-name-check", action="store_true",
+                          help="do not skip names that look like typos of known tables")
+    generate.add_argument("--quota-wait", type=float, default=0,
+                          help="seconds to wait for API quota before falling back to scraping (default: 0)")
+    generate.add_argument("--no-not-null", action="store_true", help="leave out NOT NULL (except on primary key columns)")
+    generate.add_argument("--no-primary-key", action="store_true", help="leave out the primary key")
+    generate.add_argument("--no-indexes", action="store_true", help="leave out the nonclustered indexes")
+    generate.add_argument("--no-comments", action="store_true", help="leave out the column comments (extended properties)")
+    generate.add_argument("--indexes-after-load", action="store_true",
+                          help="write the primary key and indexes to separate post-load scripts")
+    generate.add_argument("--storage-profile",
+                          help="storage profile from storage_profiles.json for every table (default: by name / row hint)")
+    generate.add_argument("--row-hint", action="append", metavar="TABLE=ROWS",
+                          help="expected row count of a table, used to pick its storage profile (repeatable)")
+    generate.add_argument("--log-json", action="store_true", help="log each pipeline stage as a JSON line on stderr")
+    generate.add_argument("--metrics-file", help="write stage timings and counters here in Prometheus text format")
+
+    load = sub.add_parser("load", help="copy rows from extracts or Oracle into the generated tables")
+    load.add_argument("--tables", required=True, help="file with table names (.txt, .csv or .xlsx), or - for stdin")
+    load.add_argument("--prefix", default=DEFAULT_TABLE_PREFIX, help=f"target table prefix (default: {DEFAULT_TABLE_PREFIX})")
+    load.add_argument("--profile", help="type mapping profile the tables were generated with (default: by prefix)")
+    load.add_argument("--no-name-check", action="store_true",
+                      help="do not skip names that look like typos of known tables")
+    load.add_argument("--extracts", help="directory of <TABLE>.csv / .csv.gz / .parquet extracts")
+    load.add_argument("--oracle-dsn", help="read from Oracle instead (python-oracledb DSN, e.g. host/service)")
+    load.add_argument("--oracle-user", help="Oracle user (password from ORACLE_PASSWORD)")
+    load.add_argument("--oracle-schema", help="Oracle schema owning the tables")
+    load.add_argument("--server", help="SQL Server host (credentials from SQL_USERNAME / SQL_PASSWORD)")
+    load.add_argument("--database", help="SQL Server database holding the tables")
+    load.add_argument("--batch-size", type=int, default=10000, help="rows per insert batch (default: 10000)")
+    load.add_argument("--workers", type=int, default=4, help="tables loaded in parallel (default: 4)")
+    load.add_argument("--truncate", action="store_true", help="empty each table before loading it")
+    load.add_argument("--indexes-after-load", action="store_true",
+                      help="the tables were generated with --indexes-after-load: create the key and indexes afterwards")
+    load.add_argument("--bcp-out", help="write bcp data and format files here instead of inserting")
+
+    deploy = sub.add_parser("deploy", help="create the tables on several servers / databases at once")
+    deploy.add_argument("--tables", required=True, help="file with table names (.txt, .csv or .xlsx), or - for stdin")
+    deploy.add_argument("--target", action="append", metavar="[LABEL=]SERVER/DATABASE",
+                        help="deploy target (repeatable)")
+    deploy.add_argument("--targets-file", help="file with one [LABEL=]SERVER/DATABASE target per line")
+    deploy.add_argument("--prefix", default=DEFAULT_TABLE_PREFIX, help=f"target table prefix (default: {DEFAULT_TABLE_PREFIX})")
+    deploy.add_argument("--profile", help="type mapping profile from type_mappings.json (default: by prefix)")
+    deploy.add_argument("--storage-profile", help="storage profile for every table (default: by name / row hint)")
+    deploy.add_argument("--no-name-check", action="store_true",
+                        help="do not skip names that look like typos of known tables")
+    deploy.add_argument("--check-only", action="store_true", help="only report which tables exist on each target")
+    deploy.add_argument("--batch-size", type=int, default=50, help="CREATE statements per transaction (default: 50)")
+    deploy.add_argument("--timeout", type=float, default=300, help="seconds before unfinished targets count as TIMEOUT (default: 300)")
+    deploy.add_argument("--connect-timeout", type=int, default=10, help="login timeout per connection in seconds (default: 10)")
+    deploy.add_argument("--report", help="write the table x target matrix to this CSV file")
+
+    sub.add_parser("quota", help="show today's Custom Search API usage")
+
+    args = parser.parse_args(argv)
+    if args.command == "quota":
+        return cmd_quota(args)
+    if args.command == "load":
+        return cmd_load(args)
+    if args.command == "deploy":
+        return cmd_deploy(args)
+    return cmd_generate(args)
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())